@@ -0,0 +1,448 @@
+import os
+import json
+import time
+import shutil
+import threading
+import contextlib
+from typing import Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class CohortArchive:
+    """
+    Архив результатов по группам (cohort) и семестрам (semester) для
+    сравнения запусков без повторного чтения .xlsx. Каждый запуск - раздел
+    "<root>/<группа>/<семестр>/" только на добавление:
+        - grades.npy, tests.npy - нормализованные матрицы оценок и оценок
+        тестов (студенты x вопросы, как в createTableGradesStudents);
+        - students/<колонка>.npy - колонки по студентам: Sum, Average X,
+        Round X, LSI и то же для тестов с префиксом "Tests ";
+        - questions/<колонка>.npy - колонки по вопросам: Max, Sum, Average,
+        Average X, то же для тестов и LTI;
+        - students.json - имена студентов;
+        - record.json - запись индекса раздела.
+    Индекс index.jsonl (строка на раздел) хранит группу, семестр, вопросы и
+    имена колонок, поэтому запрос выбирает разделы по индексу и открывает
+    через np.load(mmap_mode="r") только нужные колонки. Добавление идёт под
+    блокировкой файла index.lock (между процессами), а разделы, которые 
+    успели переименовать, но не дописали в индекс, при открытии архива 
+    восстанавливаются в индекс по их record.json.
+
+    Пример использования:
+
+    ```python
+    >>> archive = CohortArchive("resource/Archive")
+    >>> archive.append(handler, "ФИИТ", "2024-1")
+    >>> archive.trend("Average 5", question=2, cohort="ФИИТ")
+    >>> archive.distribution("LTI", semester="2024")
+    ```
+    """
+
+    INDEX_FILE = "index.jsonl"
+    LOCK_FILE = "index.lock"
+    RECORD_FILE = "record.json"
+
+    def __init__(self, root: str):
+        """
+        Args:
+            - root: str - папка архива, создаётся, если её нет.
+        """
+        self.__root = root
+        self.__lock = threading.Lock()
+        self.__records = []
+        self.__indexSize = 0
+
+        os.makedirs(root, exist_ok=True)
+
+        self.recover()
+
+    @property
+    def root(self) -> str:
+        return self.__root
+
+    @contextlib.contextmanager
+    def locked(self):
+        """
+        Эксклюзивная блокировка архива на добавление между потоками и 
+        процессами: fcntl.flock (msvcrt.locking в Windows) на файле 
+        index.lock.
+        """
+        with open(os.path.join(self.__root, CohortArchive.LOCK_FILE), "a+b") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def recover(self) -> List[dict]:
+        """
+        Дописывает в индекс разделы, которых в нём нет: процесс мог упасть 
+        между переименованием раздела и записью строки индекса. Записи 
+        берутся из record.json разделов, временные папки пропускаются.
+
+        Return:
+            - Восстановленные записи.
+        """
+        recovered = []
+
+        with self.locked():
+            self.refresh()
+
+            known = {record["path"] for record in self.__records}
+
+            for cohort in sorted(os.listdir(self.__root)):
+                if not os.path.isdir(os.path.join(self.__root, cohort)):
+                    continue
+
+                for semester in sorted(os.listdir(os.path.join(self.__root, cohort))):
+                    file = os.path.join(self.__root, cohort, semester, CohortArchive.RECORD_FILE)
+
+                    if ".tmp-" in semester or os.path.join(cohort, semester) in known or not os.path.isfile(file):
+                        continue
+
+                    with open(file, encoding="utf-8") as record:
+                        recovered.append(json.load(record))
+
+            if recovered:
+                self.__writeIndex(recovered)
+
+        self.refresh()
+
+        return recovered
+
+    def __writeIndex(self, records: List[dict]) -> None:
+        """
+        Дописывает строки индекса одной записью. Недописанная последняя 
+        строка (процесс упал на записи) сначала отрезается, её раздел 
+        восстанавливает recover. Вызывается под locked().
+        """
+        with open(os.path.join(self.__root, CohortArchive.INDEX_FILE), "a+b") as index:
+            size = index.seek(0, os.SEEK_END)
+
+            if size != 0:
+                index.seek(size - 1)
+
+                if index.read(1) != b"\n":
+                    index.seek(0)
+                    index.truncate(index.read().rfind(b"\n") + 1)
+
+            index.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8"))
+            index.flush()
+            os.fsync(index.fileno())
+
+    def refresh(self) -> None:
+        """
+        Дочитывает индекс, если в него добавили разделы (в том числе из
+        другого процесса). Читаются только новые строки.
+        """
+        file = os.path.join(self.__root, CohortArchive.INDEX_FILE)
+
+        if not os.path.isfile(file):
+            return
+
+        with self.__lock:
+            if os.path.getsize(file) == self.__indexSize:
+                return
+
+            # Индекс укоротили (отрезали недописанную строку) - читается заново
+            if os.path.getsize(file) < self.__indexSize:
+                self.__records = []
+                self.__indexSize = 0
+
+            with open(file, "rb") as index:
+                index.seek(self.__indexSize)
+                content = index.read()
+
+            # Последняя строка может быть ещё не дописана
+            end = content.rfind(b"\n") + 1
+
+            for line in content[:end].splitlines():
+                if line.strip():
+                    self.__records.append(json.loads(line))
+
+            self.__indexSize += end
+
+    @staticmethod
+    def checkName(name: str) -> str:
+        """
+        Проверяет, что имя группы или семестра можно использовать как папку.
+        """
+        name = str(name)
+
+        if name in ("", ".", "..") or "/" in name or "\\" in name:
+            raise BadNameHeaders(f"Имя '{name}' нельзя использовать для раздела архива")
+
+        return name
+
+    def append(self, handler, cohort: str, semester: str, source: str = "") -> dict:
+        """
+        Добавляет запуск TableHandler разделом (cohort, semester). Таблицы
+        считаются один раз, раздел вместе с record.json пишется во временную
+        папку. Под блокировкой locked() папка переименовывается, и 
+        дописывается строка индекса, поэтому недописанный раздел в запросы 
+        не попадает, а раздел без строки индекса восстановит recover.
+
+        Args:
+            - handler: TableHandler - обработчик запуска.
+            - cohort: str - группа ("ФИИТ", "ИБАС" и тд).
+            - semester: str - семестр ("2024-1" и тд).
+            - source: str = "" - исходный файл, сохраняется в индексе.
+
+        Raise:
+            - FileExistsError, если раздел уже есть.
+        Return:
+            - Запись индекса раздела.
+        """
+        cohort = CohortArchive.checkName(cohort)
+        semester = CohortArchive.checkName(semester)
+
+        self.refresh()
+
+        if self.partitions(cohort, semester, exact=True):
+            raise FileExistsError(f"Раздел {cohort}/{semester} уже есть в архиве")
+
+        policy = handler.policy
+
+        namesColumns = ["Sum", policy.nameAverage, policy.nameRound]
+        namesRows = ['Max', 'Sum', 'Average', policy.nameAverage]
+
+        grades = handler.createTableGradesStudentsToView("Students", namesColumns, namesRows)
+        tests = handler.createTableGradesTestToView("Students", namesColumns, namesRows)
+        lsiLti = handler.createTableLtiLsti("Students", ["LSI", "LTI"])
+
+        countStudents = grades.shape[0] - len(namesRows)
+        questions = [x for x in grades.columns[1:] if x not in namesColumns]
+        questionsTests = [x for x in tests.columns[1:] if x not in namesColumns]
+
+        columnsStudents = {}
+        columnsQuestions = {}
+
+        for prefix, table, headers in (("", grades, questions), ("Tests ", tests, questionsTests)):
+            for name in namesColumns:
+                columnsStudents[prefix + name] = table[name].iloc[:countStudents].to_numpy(dtype=float)
+            for position, name in enumerate(namesRows):
+                columnsQuestions[prefix + name] = table[headers].iloc[countStudents + position].to_numpy(dtype=float)
+
+        columnsStudents["LSI"] = lsiLti["LSI"].iloc[:countStudents].to_numpy(dtype=float)
+        columnsQuestions["LTI"] = lsiLti.iloc[countStudents][[str(x) for x in range(1, len(questions) + 1)]].to_numpy(dtype=float)
+
+        path = os.path.join(cohort, semester)
+        final = os.path.join(self.__root, path)
+        temporary = f"{final}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        if os.path.exists(final):
+            raise FileExistsError(f"Раздел {final} уже существует")
+
+        record = {"cohort": cohort,
+                  "semester": semester,
+                  "path": path,
+                  "source": source,
+                  "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "students": countStudents,
+                  "questions": [str(x) for x in questions],
+                  "questionsTests": [str(x) for x in questionsTests],
+                  "policy": [policy.gradeConverted, policy.roundFactor],
+                  "columnsStudents": list(columnsStudents),
+                  "columnsQuestions": list(columnsQuestions)}
+
+        os.makedirs(os.path.join(temporary, "students"))
+        os.makedirs(os.path.join(temporary, "questions"))
+
+        try:
+            np.save(os.path.join(temporary, "grades.npy"), grades[questions].iloc[:countStudents].to_numpy(dtype=float))
+            np.save(os.path.join(temporary, "tests.npy"), tests[questionsTests].iloc[:countStudents].to_numpy(dtype=float))
+
+            for name, values in columnsStudents.items():
+                np.save(os.path.join(temporary, "students", f"{name}.npy"), values)
+            for name, values in columnsQuestions.items():
+                np.save(os.path.join(temporary, "questions", f"{name}.npy"), values)
+
+            with open(os.path.join(temporary, "students.json"), "w", encoding="utf-8") as file:
+                json.dump([str(x) for x in grades["Students"].iloc[:countStudents]], file, ensure_ascii=False)
+
+            with open(os.path.join(temporary, CohortArchive.RECORD_FILE), "w", encoding="utf-8") as file:
+                json.dump(record, file, ensure_ascii=False)
+
+            with self.locked():
+                self.refresh()
+
+                if self.partitions(cohort, semester, exact=True) or os.path.exists(final):
+                    raise FileExistsError(f"Раздел {cohort}/{semester} уже есть в архиве")
+
+                os.rename(temporary, final)
+                self.__writeIndex([record])
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+        self.refresh()
+
+        return record
+
+    def partitions(self, cohort: str = None, semester: str = None, exact: bool = False) -> List[dict]:
+        """
+        Записи индекса разделов по группе и семестру (None - все). Семестр
+        сравнивается по началу строки: semester="2024" выберет "2024-1" и
+        "2024-2"; exact=True - точное совпадение.
+        """
+        result = []
+
+        for record in self.__records:
+            if cohort is not None and record["cohort"] != cohort:
+                continue
+            if semester is not None:
+                if exact and record["semester"] != semester:
+                    continue
+                if not exact and not record["semester"].startswith(semester):
+                    continue
+            result.append(record)
+
+        return sorted(result, key=lambda x: (x["cohort"], x["semester"]))
+
+    @staticmethod
+    def levelOf(record: dict, name: str, byQuestion: bool = None) -> str:
+        """
+        Где лежит колонка name раздела: "students", "questions", "" для 
+        матриц grades и tests или None, если её нет. Sum и Average X есть и
+        по студентам, и по вопросам: byQuestion=True выбирает вопросы, 
+        False - студентов, None - студентов, если такая колонка есть.
+        """
+        if name in ("grades", "tests"):
+            return ""
+
+        if byQuestion is not True and name in record["columnsStudents"]:
+            return "students"
+
+        if byQuestion is not False and name in record["columnsQuestions"]:
+            return "questions"
+
+        return None
+
+    def load(self, record: dict, name: str, byQuestion: bool = None) -> np.ndarray:
+        """
+        Колонка раздела без чтения в память (np.memmap только для чтения).
+        name - колонка студентов или вопросов из индекса (см. levelOf), либо
+        "grades", "tests" для матриц.
+
+        Raise:
+            - Колонки нет в разделе.
+        """
+        level = CohortArchive.levelOf(record, name, byQuestion)
+
+        if level is None:
+            raise BadNameHeaders(f"Колонки {name} нет в разделе {record['path']}")
+
+        return np.load(os.path.join(self.__root, record["path"], level, f"{name}.npy"), mmap_mode="r")
+
+    def select(self, name: str, cohort: str = None, semester: str = None, byQuestion: bool = None) -> List[Tuple[dict, np.ndarray]]:
+        """
+        Подходящие разделы, в которых есть колонка name, и сама колонка.
+        """
+        self.refresh()
+
+        return [(record, self.load(record, name, byQuestion)) for record in self.partitions(cohort, semester)
+                if CohortArchive.levelOf(record, name, byQuestion) is not None]
+
+    def column(self, name: str, cohort: str = None, semester: str = None, byQuestion: bool = None) -> Dict[Tuple[str, str], np.ndarray]:
+        """
+        Колонка name всех подходящих разделов: (группа, семестр) -> значения.
+        Разделы без этой колонки пропускаются.
+        """
+        return {(record["cohort"], record["semester"]): values for record, values in self.select(name, cohort, semester, byQuestion)}
+
+    @staticmethod
+    def questionPosition(record: dict, name: str, question: int) -> int:
+        """
+        Позиция вопроса номер question в колонке вопросов name раздела: 
+        номер ищется по заголовкам раздела, как селектор-число в 
+        JobRunner.selectHeaders (заголовок начинается с "<question>."). Для
+        колонок тестов ("Tests ...") - по заголовкам оценок тестов.
+
+        Raise:
+            - Вопрос найден не один раз.
+        Return:
+            - Позиция с нуля или None, если вопроса в разделе нет.
+        """
+        headers = record["questionsTests"] if name.startswith("Tests ") else record["questions"]
+        found = [i for i, x in enumerate(headers) if x.strip().startswith(f"{question}.")]
+
+        if len(found) > 1:
+            raise BadNameHeaders(f"Вопрос №{question} найден не один раз в разделе {record['path']}")
+
+        return found[0] if found else None
+
+    def trend(self, name: str, question: int = None, cohort: str = None, semester: str = None) -> pd.DataFrame:
+        """
+        Значение по разделам в порядке семестров: с question - значение 
+        колонки вопросов для вопроса с номером question (номер из заголовка
+        "<question>. ...", см. questionPosition), без него - среднее колонки
+        по студентам. Разделы без такого вопроса пропускаются.
+
+        Raise:
+            - Колонка есть только по вопросам, а question не указан.
+            - Вопрос найден в разделе не один раз.
+        Return:
+            - pd.DataFrame с колонками cohort, semester, name.
+        """
+        rows = []
+
+        for record, values in self.select(name, cohort, semester, question is not None):
+            if question is not None:
+                position = CohortArchive.questionPosition(record, name, question)
+                if position is None:
+                    continue
+                value = float(values[position])
+            elif CohortArchive.levelOf(record, name) == "questions":
+                raise BadNameHeaders(f"{name} - колонка по вопросам, укажи question")
+            else:
+                value = float(np.mean(values)) if len(values) != 0 else float("nan")
+
+            rows.append([record["cohort"], record["semester"], value])
+
+        return pd.DataFrame(rows, columns=["cohort", "semester", name]).sort_values(["semester", "cohort"], kind="stable").reset_index(drop=True)
+
+    def distribution(self, name: str, cohort: str = None, semester: str = None, byQuestion: bool = None) -> pd.DataFrame:
+        """
+        Все значения колонки по подходящим разделам в длинном виде.
+
+        Return:
+            - pd.DataFrame с колонками cohort, semester, position (номер
+            студента или вопроса с единицы), name.
+        """
+        frames = []
+
+        for (cohortName, semesterName), values in self.column(name, cohort, semester, byQuestion).items():
+            values = np.asarray(values)
+            frames.append(pd.DataFrame({"cohort": cohortName,
+                                        "semester": semesterName,
+                                        "position": np.arange(1, len(values) + 1),
+                                        name: values}))
+
+        if not frames:
+            return pd.DataFrame(columns=["cohort", "semester", "position", name])
+
+        return pd.concat(frames, ignore_index=True)
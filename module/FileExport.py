@@ -0,0 +1,76 @@
+import os
+import errno
+import secrets
+
+
+class FileExport:
+    """
+    Запись файлов экспорта целиком или никак. Файл пишется во временный в
+    той же папке и публикуется под своим именем только готовым:
+        - os.link не перезаписывает существующий файл, поэтому из
+        нескольких потоков или процессов, пишущих один путь, файл создаёт
+        ровно один, остальные получают FileExistsError;
+        - если запись бросает исключение, временный файл удаляется, и
+        пустого или недописанного файла на месте результата не остаётся.
+
+    Пример использования:
+
+    ```python
+    >>> FileExport.writeExclusive("BRSO.png", lambda file: fig.savefig(file, format="png"))
+    ```
+    """
+
+    @staticmethod
+    def writeExclusive(fileToExport: str, write) -> None:
+        """
+        Args:
+            - fileToExport: str - путь к файлу.
+            - write - функция, которая пишет содержимое в открытый на
+            запись двоичный файл.
+
+        Raise:
+            - FileExistsError, если файл уже существует.
+            - Исключения write, файл при этом не создаётся.
+        """
+        if os.path.exists(fileToExport):
+            raise FileExistsError(f"Файл {fileToExport} уже существует")
+
+        folder, name = os.path.split(os.path.abspath(fileToExport))
+        temporary = os.path.join(folder, f".{name}.{secrets.token_hex(8)}.tmp")
+        # Права как у обычного open, с учётом umask
+        descriptor = os.open(temporary, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                write(file)
+
+            FileExport.publish(temporary, fileToExport)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @staticmethod
+    def publish(temporary: str, fileToExport: str) -> None:
+        """
+        Даёт готовому временному файлу имя fileToExport, не перезаписывая
+        существующий файл. Если временный файл остался, его удаляет 
+        вызывающий.
+        """
+        try:
+            os.link(temporary, fileToExport)
+            return
+        except FileExistsError:
+            raise FileExistsError(f"Файл {fileToExport} уже существует")
+        except OSError as error:
+            # Файловая система без жёстких ссылок
+            if error.errno not in (errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EXDEV, errno.EMLINK):
+                raise
+
+        # Имя занимается эксклюзивным созданием и атомарно заменяется готовым
+        # файлом
+        try:
+            os.close(os.open(fileToExport, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise FileExistsError(f"Файл {fileToExport} уже существует")
+
+        os.replace(temporary, fileToExport)
@@ -0,0 +1,111 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class GradingPolicy:
+    """
+    Политика оценивания: в какую шкалу конвертировать средний балл и как его
+    округлять. Заменяет константы TableHandler.GRADE_CONVERTED и
+    TableHandler.ROUND_FACTOR для отдельного обработчика.
+
+    Пример использования:
+
+    ```python
+    >>> policies = [GradingPolicy(5, 0.5), GradingPolicy(10, 0.5), GradingPolicy(100, 0.7)]
+    >>> handler.createTableGradesStudentsPolicies(policies)
+    ```
+    """
+
+    def __init__(self,
+                 gradeConverted: float = 5,
+                 roundFactor: float = 0.5,
+                 nameAverage: str = None,
+                 nameRound: str = None):
+        """
+        Args:
+            - gradeConverted: float = 5 - в какую оценку конвертировать (5, 10,
+            100 и тд).
+            - roundFactor: float = 0.5 - с какой дробной части округлять вверх.
+            - nameAverage: str = None - имя колонки среднего, по умолчанию
+            "Average {gradeConverted}".
+            - nameRound: str = None - имя колонки округления, по умолчанию
+            "Round {gradeConverted} {roundFactor}", чтобы политики с одним 
+            roundFactor и разными шкалами не совпадали по именам.
+        """
+        self.__gradeConverted = gradeConverted
+        self.__roundFactor = roundFactor
+        self.__nameAverage = nameAverage if nameAverage is not None else f"Average {gradeConverted}"
+        self.__nameRound = nameRound if nameRound is not None else f"Round {gradeConverted} {roundFactor}"
+
+    @property
+    def gradeConverted(self) -> float:
+        return self.__gradeConverted
+
+    @property
+    def roundFactor(self) -> float:
+        return self.__roundFactor
+
+    @property
+    def nameAverage(self) -> str:
+        return self.__nameAverage
+
+    @property
+    def nameRound(self) -> str:
+        return self.__nameRound
+
+    def __repr__(self) -> str:
+        return f"GradingPolicy({self.__gradeConverted}, {self.__roundFactor})"
+
+    @staticmethod
+    def roundValues(values: np.ndarray, roundFactor) -> np.ndarray:
+        """
+        Векторный TableHandler.customRound: целая часть плюс 1, если дробная
+        часть не меньше roundFactor. roundFactor может быть массивом, тогда
+        округление идёт с broadcast.
+
+        Return:
+            - Массив округлённых значений (float, NaN остаётся NaN).
+        """
+        whole = np.trunc(values)
+
+        with np.errstate(invalid="ignore"):
+            return whole + (values - whole >= roundFactor)
+
+    @staticmethod
+    def evaluate(policies: List["GradingPolicy"],
+                 values: np.ndarray,
+                 maxValues: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Считает Average и Round сразу для всех политик одним проходом по
+        вопросам: доля x / max вопроса умножается на вектор шкал политик
+        (broadcast студенты x политики) и прибавляется к сумме. Вопросы 
+        складываются последовательно, как в прежнем поколоночном цикле, 
+        поэтому результат совпадает с ним бит в бит, а временные массивы - 
+        размера студенты x политики, а не студенты x вопросы x политики.
+
+        Args:
+            - policies: List[GradingPolicy] - политики.
+            - values: np.ndarray - оценки, студенты x вопросы.
+            - maxValues: np.ndarray - максимум каждого вопроса.
+
+        Return:
+            - (Average, Round) - матрицы студенты x политики.
+        """
+        grades = np.array([x.gradeConverted for x in policies], dtype=float)
+        factors = np.array([x.roundFactor for x in policies], dtype=float)
+
+        countStudents, countQuestions = values.shape
+        averages = np.zeros((countStudents, len(policies)))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(countQuestions):
+                term = (values[:, i] / maxValues[i])[:, np.newaxis] * grades
+                term /= countQuestions
+
+                if i == 0:
+                    averages = term
+                else:
+                    averages += term
+
+        return averages, GradingPolicy.roundValues(averages, factors)
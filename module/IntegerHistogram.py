@@ -0,0 +1,193 @@
+from typing import Dict
+
+import numpy as np
+
+from .QuantileSketch import QuantileSketch as QuantileSketch
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class IntegerHistogram:
+    """
+    Точная гистограмма целых значений небольшого диапазона (оценки от 0 до
+    5, от 1 до 10 и тд): количество каждого значения в массиве от
+    наименьшего до наибольшего. Квантили и ранги точные, объединение двух
+    гистограмм - сложение массивов за O(диапазон). Диапазон не больше
+    MAX_RANGE: update за его пределы бросает ошибку, а merge отдаёт
+    QuantileSketch.
+
+    Обычно создаётся через TableHandler.sketches().
+
+    Пример использования:
+
+    ```python
+    >>> histogram = IntegerHistogram().update(grades)
+    >>> histogram.counts()
+    >>> histogram.merge(other).quantile(0.5)
+    ```
+    """
+
+    # Наибольший диапазон значений, для которого гистограмма выгоднее скетча
+    MAX_RANGE = 4096
+
+    def __init__(self):
+        self.__low = 0
+        self.__counts = np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def fits(values) -> bool:
+        """
+        Подходят ли значения для гистограммы: все целые (NaN пропускаются)
+        и диапазон не больше MAX_RANGE.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+
+        if len(values) == 0:
+            return True
+
+        return bool(np.all(np.mod(values, 1) == 0) and values.max() - values.min() < IntegerHistogram.MAX_RANGE)
+
+    @property
+    def count(self) -> int:
+        return int(self.__counts.sum())
+
+    @property
+    def size(self) -> int:
+        return len(self.__counts)
+
+    @property
+    def min(self) -> float:
+        nonzero = np.flatnonzero(self.__counts)
+        return float(self.__low + nonzero[0]) if len(nonzero) != 0 else np.nan
+
+    @property
+    def max(self) -> float:
+        nonzero = np.flatnonzero(self.__counts)
+        return float(self.__low + nonzero[-1]) if len(nonzero) != 0 else np.nan
+
+    def __span(self, low: int, size: int) -> int:
+        """
+        Длина массива после добавления size значений начиная с low.
+        """
+        if len(self.__counts) == 0:
+            return size
+        return max(self.__low + len(self.__counts), low + size) - min(self.__low, low)
+
+    def __add(self, low: int, counts: np.ndarray) -> None:
+        if len(counts) == 0:
+            return
+
+        if len(self.__counts) == 0:
+            self.__low, self.__counts = low, counts.astype(np.int64)
+            return
+
+        start = min(self.__low, low)
+        end = max(self.__low + len(self.__counts), low + len(counts))
+
+        result = np.zeros(end - start, dtype=np.int64)
+        result[self.__low - start:self.__low - start + len(self.__counts)] += self.__counts
+        result[low - start:low - start + len(counts)] += counts
+
+        self.__low, self.__counts = start, result
+
+    def update(self, values) -> "IntegerHistogram":
+        """
+        Добавляет значения одним вызовом np.bincount, NaN пропускаются.
+
+        Raise:
+            - Значения не целые.
+            - Диапазон вместе с уже добавленными больше MAX_RANGE.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+
+        if len(values) == 0:
+            return self
+
+        if not np.all(np.mod(values, 1) == 0):
+            raise BadNameHeaders("В гистограмму можно добавить только целые значения, используй QuantileSketch")
+
+        values = values.astype(np.int64)
+        low = int(values.min())
+
+        if self.__span(low, int(values.max()) - low + 1) > IntegerHistogram.MAX_RANGE:
+            raise BadNameHeaders(f"Диапазон гистограммы больше {IntegerHistogram.MAX_RANGE}, используй QuantileSketch")
+
+        self.__add(low, np.bincount(values - low))
+
+        return self
+
+    def counts(self) -> Dict[int, int]:
+        """
+        Значение -> количество, только встречавшиеся значения.
+        """
+        return {int(self.__low + x): int(self.__counts[x]) for x in np.flatnonzero(self.__counts)}
+
+    def copy(self) -> "IntegerHistogram":
+        result = IntegerHistogram()
+        result.__low = self.__low
+        result.__counts = self.__counts.copy()
+        return result
+
+    def merge(self, other):
+        """
+        Новая гистограмма по значениям обеих, исходные не меняются. С
+        QuantileSketch или если общий диапазон больше MAX_RANGE результат -
+        QuantileSketch.
+        """
+        if isinstance(other, QuantileSketch):
+            return other.merge(self)
+
+        if self.__span(other.__low, len(other.__counts)) > IntegerHistogram.MAX_RANGE:
+            return self.toQuantileSketch().merge(other)
+
+        result = self.copy()
+        result.__add(other.__low, other.__counts)
+
+        return result
+
+    def quantile(self, q):
+        """
+        Точный квантиль q (число или массив), как np.quantile с
+        method="inverted_cdf". У пустой гистограммы - NaN.
+        """
+        q = np.asarray(q, dtype=float)
+
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+
+        cumulative = np.cumsum(self.__counts)
+        target = np.maximum(np.ceil(q * cumulative[-1]), 1)
+
+        return (self.__low + np.searchsorted(cumulative, target, side="left")).astype(float)[()]
+
+    def rank(self, x):
+        """
+        Доля значений, не больших x (число или массив).
+        """
+        x = np.asarray(x, dtype=float)
+
+        if self.count == 0:
+            return np.full(x.shape, np.nan)[()]
+
+        cumulative = np.concatenate([[0], np.cumsum(self.__counts)])
+        positions = np.clip(np.floor(x) - self.__low + 1, 0, len(self.__counts)).astype(np.int64)
+
+        return (cumulative[positions] / cumulative[-1])[()]
+
+    def toQuantileSketch(self, error: float = 0.01) -> QuantileSketch:
+        """
+        Скетч с теми же значениями (для объединения с нецелыми данными).
+        """
+        nonzero = np.flatnonzero(self.__counts)
+        return QuantileSketch(error).updateCounts(self.__low + nonzero, self.__counts[nonzero])
+
+    def toDict(self) -> dict:
+        return {"type": "histogram", "low": int(self.__low), "counts": self.__counts.tolist()}
+
+    @staticmethod
+    def fromDict(state: dict) -> "IntegerHistogram":
+        result = IntegerHistogram()
+        result.__low = state["low"]
+        result.__counts = np.asarray(state["counts"], dtype=np.int64)
+        return result
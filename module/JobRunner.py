@@ -0,0 +1,335 @@
+import os
+import re
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from .TableHandler import TableHandler as TableHandler
+from .XlsxReader import XlsxReader as XlsxReader
+from .Exceptions.BadTable import BadTable as BadTable
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class JobRunner:
+    """
+    Запуск заданий научениеметрии из файла заданий (.json или .toml) без
+    ноутбука.
+
+    Пример файла заданий (.json):
+
+    ```json
+    {
+        "jobs": [
+            {
+                "name": "IBASS",
+                "table": "resource/Selection/Данные_для_научениеметрии_ИБАС_2024.xlsx",
+                "names": "headers[0]",
+                "grades": ["headers[2:5:2]", "headers[-1]"],
+                "tests": ["headers[3:6:2]", "headers[-2]"],
+                "export": {"path": "resource/IBASS",
+                           "conclusion": "conclussion.xlsx"},
+                "charts": ["BRSO", "OTS", "Popularity", "Motivation"]
+            }
+        ]
+    }
+    ```
+
+    Заголовки выбираются селекторами:
+        - "headers[i]" или "headers[a:b:c]" - индекс или срез списка
+        заголовков, как в main.ipynb;
+        - число - номер вопроса, то есть заголовок, начинающийся с "N.";
+        - любая другая строка - точное имя заголовка.
+    Относительные пути считаются от папки файла заданий.
+    """
+
+    # Графики и файлы, в которые они экспортируются
+    CHART_FILES = {"BRSO": ["BRSO.png"],
+                   "OTS": ["OTS.png"],
+                   "Benefits": ["Benefits.png"],
+                   "Popularity": ["Popularity.png"],
+                   "Motivation": ["Motivation.png", "Education.png"]}
+
+    SELECTOR_PATTERN = re.compile(r"^headers\[\s*(-?\d*)\s*(?:(:)\s*(-?\d*)\s*)?(?::\s*(-?\d*)\s*)?\]$")
+
+    @staticmethod
+    def loadJobs(pathToJobFile: str) -> List[dict]:
+        """
+        Читает файл заданий .json или .toml. Задания лежат в списке "jobs"
+        (в .toml - таблицы [[jobs]]).
+
+        Args:
+            - pathToJobFile: str - путь к файлу заданий.
+
+        Raise:
+            - Файл заданий не .json и не .toml.
+            - В файле нет заданий.
+            - У задания нет таблицы, оценок или оценок тестов.
+        Return:
+            - Список заданий с абсолютными путями.
+        """
+        extension = os.path.splitext(pathToJobFile)[1].lower()
+
+        if extension == ".json":
+            with open(pathToJobFile, encoding="utf-8") as file:
+                content = json.load(file)
+        elif extension == ".toml":
+            import tomllib
+            with open(pathToJobFile, "rb") as file:
+                content = tomllib.load(file)
+        else:
+            raise BadTable(f"Файл заданий {pathToJobFile} должен быть .json или .toml")
+
+        jobs = content.get("jobs", []) if isinstance(content, dict) else content
+
+        if len(jobs) == 0:
+            raise BadTable(f"В файле {pathToJobFile} нет заданий")
+
+        root = os.path.dirname(os.path.abspath(pathToJobFile))
+
+        result = []
+
+        for number, job in enumerate(jobs, 1):
+            for key in ["table", "grades", "tests"]:
+                if key not in job:
+                    raise BadTable(f"У задания №{number} нет ключа '{key}'")
+
+            job = dict(job)
+            job.setdefault("name", os.path.splitext(os.path.basename(job["table"]))[0])
+            job["table"] = os.path.join(root, job["table"])
+
+            export = dict(job.get("export", {}))
+            export["path"] = os.path.join(root, export.get("path", "./"))
+            job["export"] = export
+
+            result.append(job)
+
+        return result
+
+    @staticmethod
+    def selectHeaders(headers: List[str], selectors) -> List[str]:
+        """
+        Выбирает заголовки по селекторам: "headers[i]", "headers[a:b:c]",
+        номеру вопроса или точному имени.
+
+        Args:
+            - headers: List[str] - заголовки таблицы.
+            - selectors - селектор или список селекторов.
+
+        Raise:
+            - Заголовок по селектору не найден.
+        Return:
+            - Список выбранных заголовков в порядке селекторов.
+        """
+        if not isinstance(selectors, list):
+            selectors = [selectors]
+
+        result = []
+
+        for selector in selectors:
+            if isinstance(selector, bool):
+                raise BadNameHeaders(f"Неверный селектор {selector}")
+
+            if isinstance(selector, int):
+                found = [x for x in headers if isinstance(x, str) and x.strip().startswith(f"{selector}.")]
+                if len(found) != 1:
+                    raise BadNameHeaders(f"Вопрос №{selector} не найден или найден не один раз")
+                result += found
+                continue
+
+            match = JobRunner.SELECTOR_PATTERN.match(str(selector).strip())
+
+            if match is None:
+                if selector not in headers:
+                    raise BadNameHeaders(f"Заголовка '{selector}' нет в таблице")
+                result.append(selector)
+                continue
+
+            start, colon, stop, step = match.groups()
+
+            if colon is None:
+                if start == "":
+                    raise BadNameHeaders(f"Неверный селектор {selector}")
+                try:
+                    result.append(headers[int(start)])
+                except IndexError:
+                    raise BadNameHeaders(f"Селектор {selector} вне заголовков таблицы")
+            else:
+                toInt = lambda x: int(x) if x not in (None, "") else None
+                selected = headers[toInt(start):toInt(stop):toInt(step)]
+                if len(selected) == 0:
+                    raise BadNameHeaders(f"Селектор {selector} не выбрал ни одного заголовка")
+                result += selected
+
+        return result
+
+    @staticmethod
+    def resolveJob(job: dict, headers: List[str]) -> Tuple[str, List[str], List[str]]:
+        """
+        Разрешает селекторы задания в заголовки таблицы.
+
+        Return:
+            - (заголовок имён студентов, оценки студентов, оценки тестов).
+        """
+        names = ""
+
+        if "names" in job:
+            names = JobRunner.selectHeaders(headers, job["names"])
+            if len(names) != 1:
+                raise BadNameHeaders("Заголовок имён студентов должен быть один")
+            names = names[0]
+
+        grades = JobRunner.selectHeaders(headers, job["grades"])
+        tests = JobRunner.selectHeaders(headers, job["tests"])
+
+        return names, grades, tests
+
+    @staticmethod
+    def chartsOfJob(job: dict) -> List[str]:
+        """
+        Возвращает список графиков задания. По умолчанию все графики, а
+        Benefits только если в задании есть раздел "benefits".
+        """
+        charts = job.get("charts")
+
+        if charts is None:
+            charts = [x for x in JobRunner.CHART_FILES if x != "Benefits" or "benefits" in job]
+
+        for chart in charts:
+            if chart not in JobRunner.CHART_FILES:
+                raise BadNameHeaders(f"Неизвестный график {chart}, возможные: {list(JobRunner.CHART_FILES)}")
+
+        return list(charts)
+
+    @staticmethod
+    def outputFiles(job: dict) -> List[str]:
+        """
+        Возвращает все файлы, которые задание создаст.
+        """
+        export = job["export"]
+        files = [export.get("conclusion", "Сonclusion.xlsx")]
+
+        if export.get("exportOriginal", True):
+            files.append(export.get("original", "original.xlsx"))
+
+        for chart in JobRunner.chartsOfJob(job):
+            files += JobRunner.CHART_FILES[chart]
+
+        return [os.path.join(export["path"], x) for x in files]
+
+    @staticmethod
+    def validateJob(job: dict) -> str:
+        """
+        Проверяет задание без полного чтения таблицы: читается только строка
+        заголовков, проверки как в TableHandler.check_table. Дополнительно
+        проверяются графики, вопрос пособий и то, что выходных файлов ещё нет.
+
+        Raise:
+            - BadTable, BadNameHeaders, FileExistsError при ошибке в задании.
+        Return:
+            - Имя задания.
+        """
+        headersTable = XlsxReader.readHeaders(job["table"])
+
+        names, grades, tests = JobRunner.resolveJob(job, headersTable)
+
+        TableHandler.check_headers(headersTable, grades + tests, grades, tests)
+
+        charts = JobRunner.chartsOfJob(job)
+
+        if "Benefits" in charts:
+            question = job.get("benefits", {}).get("question", "17. Какими средствами обучения вы преимущественно пользовались?")
+            if question not in headersTable:
+                raise BadNameHeaders(f"Вопроса пособий '{question}' нет в таблице")
+
+        for file in JobRunner.outputFiles(job):
+            if os.path.isfile(file):
+                raise FileExistsError(f"Файл {file} уже существует")
+
+        return job["name"]
+
+    @staticmethod
+    def loadJob(job: dict) -> TableHandler:
+        """
+        Читает таблицу задания в TableHandler.
+        """
+        names, grades, tests = JobRunner.resolveJob(job, XlsxReader.readHeaders(job["table"]))
+
+        return TableHandler(job["table"], grades, tests, names)
+
+    @staticmethod
+    def runJob(job: dict) -> str:
+        """
+        Выполняет задание: таблица выводов и выбранные графики.
+
+        Return:
+            - Имя задания.
+        """
+        handler = JobRunner.loadJob(job)
+
+        export = job["export"]
+        pathForExport = export["path"]
+
+        handler.export_TableConclusion(export.get("conclusion", "Сonclusion.xlsx"),
+                                       pathForExport,
+                                       export.get("original", "original.xlsx"),
+                                       export.get("exportOriginal", True))
+
+        for chart in JobRunner.chartsOfJob(job):
+            files = [os.path.join(pathForExport, x) for x in JobRunner.CHART_FILES[chart]]
+
+            if chart == "BRSO":
+                handler.export_PngPieBRSO(files[0])
+            elif chart == "OTS":
+                handler.export_PngPieOTS(files[0])
+            elif chart == "Popularity":
+                handler.export_PngPopularityTests(files[0])
+            elif chart == "Motivation":
+                handler.export_PngMotivation(files[0], files[1])
+            elif chart == "Benefits":
+                handler.export_PngBenefits(files[0], **JobRunner.benefitsArguments(job))
+
+        return job["name"]
+
+    @staticmethod
+    def benefitsArguments(job: dict) -> dict:
+        """
+        Аргументы export_PngBenefits из раздела "benefits" задания.
+        """
+        benefits = job.get("benefits", {})
+        keys = {"question": "headerBenefitsQuestion",
+                "typesForPng": "typesBenefitsForPng",
+                "typesInTable": "typesBenefitsInTable",
+                "titleAndLabels": "titleAndLabels"}
+
+        return {keys[x]: benefits[x] for x in keys if x in benefits}
+
+    @staticmethod
+    def run(jobs: List[dict], countJobs: int = 1, validate: bool = False) -> List[Tuple[str, Exception]]:
+        """
+        Выполняет или проверяет (validate=True) задания, countJobs заданий
+        параллельно в отдельных процессах.
+
+        Args:
+            - jobs: List[dict] - задания из loadJobs.
+            - countJobs: int = 1 - количество параллельных процессов.
+            - validate: bool = False - только проверка по строке заголовков.
+
+        Return:
+            - Список (имя задания, исключение или None) в порядке заданий.
+        """
+        function = JobRunner.validateJob if validate else JobRunner.runJob
+
+        if countJobs <= 1 or len(jobs) == 1:
+            return [JobRunner._callJob(function, job) for job in jobs]
+
+        with ProcessPoolExecutor(max_workers=countJobs) as executor:
+            futures = [executor.submit(JobRunner._callJob, function, job) for job in jobs]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _callJob(function, job: dict) -> Tuple[str, Exception]:
+        try:
+            function(job)
+            return job["name"], None
+        except Exception as error:
+            return job["name"], error
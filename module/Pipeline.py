@@ -0,0 +1,279 @@
+import os
+import time
+import queue
+import threading
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from .JobRunner import JobRunner as JobRunner
+from .FileExport import FileExport as FileExport
+from .TableHandler import TableHandler as TableHandler
+
+
+class Pipeline:
+    """
+    Конвейер заданий JobRunner для запуска по нескольким таблицам. В
+    JobRunner.runJob чтение, вычисления, графики и запись файлов идут строго
+    друг за другом, здесь этапы работают одновременно:
+        - read - потоки чтения заранее читают и разбирают следующие таблицы
+        (JobRunner.loadJob), пока текущая считается;
+        - compute - таблица выводов и графики считаются в память
+        (TableHandler.export_Stream);
+        - write - потоки записи пишут готовые .xlsx и .png.
+    Между этапами очереди размера queueSize: в памяти не больше queueSize
+    прочитанных таблиц и queueSize файлов, ожидающих записи, этап, которому
+    некуда отдать результат, ждёт.
+
+    Файлы и ошибки те же, что у JobRunner.run, а после запуска в stats
+    лежит загрузка каждого этапа.
+
+    Пример использования:
+
+    ```python
+    >>> pipeline = Pipeline(countReaders=2, countWriters=2)
+    >>> results = pipeline.run(JobRunner.loadJobs("jobs.json"))
+    >>> pipeline.stats["compute"]["utilization"]
+    ```
+    """
+
+    STAGES = ("read", "compute", "write")
+
+    def __init__(self, countReaders: int = 2, countWriters: int = 2, queueSize: int = 2):
+        """
+        Args:
+            - countReaders: int = 2 - потоки чтения таблиц.
+            - countWriters: int = 2 - потоки записи файлов.
+            - queueSize: int = 2 - размер очередей между этапами.
+        """
+        self.__countReaders = max(1, countReaders)
+        self.__countWriters = max(1, countWriters)
+        self.__queueSize = max(1, queueSize)
+        self.__lock = threading.Lock()
+        self.__stats = {}
+
+    @property
+    def stats(self) -> Dict[str, dict]:
+        """
+        Загрузка этапов последнего запуска: для каждого этапа threads, items
+        (заданий или файлов), busy (секунды работы всех потоков), blocked
+        (секунды ожидания места в следующей очереди), utilization
+        (busy / (threads * seconds)); seconds - время всего запуска.
+        """
+        return {name: dict(value) if isinstance(value, dict) else value for name, value in self.__stats.items()}
+
+    @staticmethod
+    def computeJob(job: dict, handler: TableHandler) -> List[Tuple[str, object]]:
+        """
+        Этап compute: все файлы задания в памяти, как их пишет
+        JobRunner.runJob.
+
+        Return:
+            - Список (файл, pd.DataFrame или io.BytesIO с .png).
+        """
+        export = job["export"]
+        pathForExport = export["path"]
+        charts = JobRunner.chartsOfJob(job)
+
+        namesCharts = [os.path.splitext(x)[0] for chart in charts for x in JobRunner.CHART_FILES[chart]]
+
+        arguments = {}
+        benefits = JobRunner.benefitsArguments(job)
+        keys = {"headerBenefitsQuestion": "headerBenefitsQuestionInDataTable",
+                "typesBenefitsForPng": "typesBenefitsForPng",
+                "typesBenefitsInTable": "typesBenefitsInDataTable",
+                "titleAndLabels": "titleAndLabelsBenefits"}
+
+        for key, value in benefits.items():
+            arguments[keys[key]] = value
+
+        values = {}
+
+        for artifact in handler.export_Stream(None, exportBenefits="Benefits" in charts, countWorkers=1,
+                                              names=["Grades", "Tests", "LSI LTI"] + namesCharts, **arguments):
+            if not artifact.ok:
+                raise artifact.error
+            values[artifact.name] = artifact.value
+
+        files = []
+
+        if export.get("exportOriginal", True):
+            files.append((os.path.join(pathForExport, export.get("original", "original.xlsx")), handler.dataTable))
+
+        conclusion = TableHandler.createTableConclusionFromTables([values["Grades"], values["Tests"], values["LSI LTI"]])
+        files.append((os.path.join(pathForExport, export.get("conclusion", "Сonclusion.xlsx")), conclusion))
+
+        for name in namesCharts:
+            files.append((os.path.join(pathForExport, name + ".png"), values[name]))
+
+        return files
+
+    @staticmethod
+    def writeFile(file: str, value) -> None:
+        """
+        Этап write: пишет pd.DataFrame в .xlsx, io.BytesIO - как есть. Файл
+        публикуется через FileExport.writeExclusive: существующий не
+        перезаписывается, при ошибке записи файла не остаётся.
+        """
+        os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+
+        if isinstance(value, pd.DataFrame):
+            FileExport.writeExclusive(file, lambda output: value.to_excel(output, index=False, engine="openpyxl"))
+        else:
+            FileExport.writeExclusive(file, lambda output: output.write(value.getbuffer()))
+
+    def __addStats(self, stage: str, items: int, busy: float, blocked: float) -> None:
+        with self.__lock:
+            stats = self.__stats[stage]
+            stats["items"] += items
+            stats["busy"] += busy
+            stats["blocked"] += blocked
+
+    @staticmethod
+    def _put(target: queue.Queue, item) -> float:
+        """
+        Кладёт в очередь, ждёт место. Возвращает время ожидания.
+        """
+        start = time.perf_counter()
+        target.put(item)
+        return time.perf_counter() - start
+
+    def __read(self, jobs: queue.Queue, loaded: queue.Queue) -> None:
+        items, busy, blocked = 0, 0.0, 0.0
+
+        while True:
+            try:
+                number, job = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+            start = time.perf_counter()
+
+            try:
+                result = (number, JobRunner.loadJob(job), None)
+            except Exception as error:
+                result = (number, None, error)
+
+            busy += time.perf_counter() - start
+            items += 1
+            blocked += Pipeline._put(loaded, result)
+
+        self.__addStats("read", items, busy, blocked)
+
+    def __write(self, writing: queue.Queue, results: list) -> None:
+        items, busy, blocked = 0, 0.0, 0.0
+
+        while True:
+            task = writing.get()
+
+            if task is None:
+                break
+
+            number, file, value = task
+            start = time.perf_counter()
+
+            try:
+                Pipeline.writeFile(file, value)
+            except Exception as error:
+                with self.__lock:
+                    if results[number] is None:
+                        results[number] = error
+
+            busy += time.perf_counter() - start
+            items += 1
+
+        self.__addStats("write", items, busy, blocked)
+
+    def run(self, jobs: List[dict]) -> List[Tuple[str, Exception]]:
+        """
+        Выполняет задания конвейером.
+
+        Args:
+            - jobs: List[dict] - задания из JobRunner.loadJobs.
+
+        Return:
+            - Список (имя задания, исключение или None) в порядке заданий,
+            как у JobRunner.run.
+        """
+        results = [None] * len(jobs)
+
+        pending = queue.Queue()
+        for number, job in enumerate(jobs):
+            pending.put((number, job))
+
+        loaded = queue.Queue(maxsize=self.__queueSize)
+        writing = queue.Queue(maxsize=self.__queueSize)
+
+        readers = [threading.Thread(target=self.__read, args=(pending, loaded), daemon=True)
+                   for _ in range(min(self.__countReaders, max(1, len(jobs))))]
+        writers = [threading.Thread(target=self.__write, args=(writing, results), daemon=True)
+                   for _ in range(self.__countWriters)]
+
+        threads = {"read": len(readers), "compute": 1, "write": len(writers)}
+        self.__stats = {stage: {"threads": threads[stage], "items": 0, "busy": 0.0, "blocked": 0.0, "utilization": 0.0}
+                        for stage in Pipeline.STAGES}
+
+        start = time.perf_counter()
+
+        for thread in readers + writers:
+            thread.start()
+
+        busy, blocked = 0.0, 0.0
+
+        try:
+            for _ in range(len(jobs)):
+                number, handler, error = loaded.get()
+
+                if error is not None:
+                    with self.__lock:
+                        results[number] = error
+                    continue
+
+                computeStart = time.perf_counter()
+
+                try:
+                    files = Pipeline.computeJob(jobs[number], handler)
+                except Exception as error:
+                    files = []
+                    with self.__lock:
+                        results[number] = error
+
+                # Таблица больше не нужна, готовые файлы держит очередь записи
+                del handler
+
+                busy += time.perf_counter() - computeStart
+
+                for file, value in files:
+                    blocked += Pipeline._put(writing, (number, file, value))
+        finally:
+            # При прерывании оставшиеся задания не читаются, а прочитанные
+            # выбрасываются, чтобы потоки чтения не ждали место в очереди
+            while not pending.empty():
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+
+            while any(thread.is_alive() for thread in readers):
+                try:
+                    loaded.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+            for _ in writers:
+                writing.put(None)
+
+            for thread in readers + writers:
+                thread.join()
+
+        self.__addStats("compute", len(jobs), busy, blocked)
+
+        seconds = time.perf_counter() - start
+
+        for stage in Pipeline.STAGES:
+            stats = self.__stats[stage]
+            stats["utilization"] = stats["busy"] / (stats["threads"] * seconds) if seconds > 0 else 0.0
+
+        self.__stats["seconds"] = seconds
+
+        return [(job["name"], error) for job, error in zip(jobs, results)]
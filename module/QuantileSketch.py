@@ -0,0 +1,247 @@
+import math
+
+import numpy as np
+
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class QuantileSketch:
+    """
+    Приближённое распределение ограниченного размера (KLL-скетч) для
+    медиан и процентилей без полной сортировки. Значения лежат по уровням:
+    значение уровня h весит 2^h. Когда значений больше общей ёмкости уровней,
+    самый нижний переполненный уровень сортируется, и каждое второе значение
+    (начиная со случайного) поднимается на уровень выше, так что в скетче
+    остаётся O(k + log n) значений при любом n.
+
+    Ошибка - по рангу: quantile(q) возвращает значение, ранг которого
+    отличается от q не больше чем на error (с вероятностью около 99%), пока
+    скетч не сжимался, ответы точные. Скетчи разных групп, частей таблицы
+    или добавленных строк объединяются merge за O(размер скетча) без
+    исходных данных.
+
+    Обычно создаётся через TableHandler.sketches().
+
+    Пример использования:
+
+    ```python
+    >>> sketch = QuantileSketch(error=0.01)
+    >>> sketch.update(values)
+    >>> sketch.merge(other).quantile([0.25, 0.5, 0.75])
+    ```
+    """
+
+    # Ранговая ошибка KLL не больше ERROR_FACTOR / k и после сотен merge
+    ERROR_FACTOR = 2.2
+    # Ёмкость уровня относительно следующего за ним
+    CAPACITY_FACTOR = 2 / 3
+    MIN_CAPACITY = 2
+    MIN_K = 8
+
+    def __init__(self, error: float = 0.01, seed: int = 0):
+        """
+        Args:
+            - error: float = 0.01 - допустимая ошибка ранга (0.01 - 1%).
+            - seed: int = 0 - зерно выбора при сжатии, с одним зерном
+            результаты повторяются.
+
+        Raise:
+            - error не из (0, 1).
+        """
+        if not 0 < error < 1:
+            raise BadNameHeaders(f"Ошибка скетча должна быть от 0 до 1, а у тебя {error}")
+
+        self.__k = max(QuantileSketch.MIN_K, math.ceil(QuantileSketch.ERROR_FACTOR / error))
+        self.__seed = seed
+        self.__levels = [np.empty(0)]
+        self.__count = 0
+        self.__min = np.nan
+        self.__max = np.nan
+
+    @property
+    def k(self) -> int:
+        return self.__k
+
+    @property
+    def error(self) -> float:
+        return QuantileSketch.ERROR_FACTOR / self.__k
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def size(self) -> int:
+        """
+        Сколько значений хранит скетч.
+        """
+        return sum(len(x) for x in self.__levels)
+
+    @property
+    def min(self) -> float:
+        return self.__min
+
+    @property
+    def max(self) -> float:
+        return self.__max
+
+    def __capacity(self, level: int) -> int:
+        depth = len(self.__levels) - 1 - level
+        return max(QuantileSketch.MIN_CAPACITY, math.ceil(self.__k * QuantileSketch.CAPACITY_FACTOR ** depth))
+
+    def __compress(self) -> None:
+        # Сжатие ленивое: только пока значений больше общей ёмкости, и 
+        # каждый раз самого нижнего переполненного уровня. Чем больше 
+        # значений остаётся, тем меньше ошибка
+        while self.size > sum(self.__capacity(x) for x in range(len(self.__levels))):
+            level = next(x for x in range(len(self.__levels)) if len(self.__levels[x]) >= self.__capacity(x))
+
+            if level + 1 == len(self.__levels):
+                self.__levels.append(np.empty(0))
+
+            items = np.sort(self.__levels[level])
+            odd = len(items) % 2
+            offset = np.random.default_rng((self.__seed, self.__count, level)).integers(2)
+
+            self.__levels[level] = items[:odd]
+            self.__levels[level + 1] = np.concatenate([self.__levels[level + 1], items[odd + offset::2]])
+
+    def __extend(self, levels, count: int, low: float, high: float) -> None:
+        for level, items in enumerate(levels):
+            if len(items) == 0:
+                continue
+            while level >= len(self.__levels):
+                self.__levels.append(np.empty(0))
+            self.__levels[level] = np.concatenate([self.__levels[level], items])
+
+        self.__count += count
+        self.__min = np.fmin(self.__min, low)
+        self.__max = np.fmax(self.__max, high)
+
+        self.__compress()
+
+    def update(self, values) -> "QuantileSketch":
+        """
+        Добавляет значения одним вызовом, NaN пропускаются.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+
+        if len(values) != 0:
+            self.__extend([values], len(values), values.min(), values.max())
+
+        return self
+
+    def updateCounts(self, values, counts) -> "QuantileSketch":
+        """
+        Добавляет значения с количествами (например, из гистограммы) без
+        повторения: количество раскладывается по степеням двойки, и значение
+        кладётся на уровни этих степеней.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        counts = np.asarray(counts, dtype=np.int64).ravel()
+
+        keep = (counts > 0) & ~np.isnan(values)
+        values, counts = values[keep], counts[keep]
+
+        if len(values) == 0:
+            return self
+
+        levels = [values[(counts >> level) & 1 == 1] for level in range(int(counts.max()).bit_length())]
+
+        self.__extend(levels, int(counts.sum()), values.min(), values.max())
+
+        return self
+
+    def copy(self) -> "QuantileSketch":
+        result = QuantileSketch.__new__(QuantileSketch)
+        result.__k = self.__k
+        result.__seed = self.__seed
+        result.__levels = list(self.__levels)
+        result.__count = self.__count
+        result.__min = self.__min
+        result.__max = self.__max
+        return result
+
+    def merge(self, other) -> "QuantileSketch":
+        """
+        Новый скетч по значениям обоих за O(размер скетчей), исходные не
+        меняются. Точность - худшая из двух. Гистограмма IntegerHistogram
+        переводится в скетч.
+        """
+        if not isinstance(other, QuantileSketch):
+            other = other.toQuantileSketch(self.error)
+
+        result = self.copy()
+        result.__k = min(self.__k, other.__k)
+        result.__extend(other.__levels, other.__count, other.__min, other.__max)
+
+        return result
+
+    def items(self):
+        """
+        Хранимые значения по возрастанию и их веса (сумма весов - count).
+        """
+        values = np.concatenate(self.__levels)
+        weights = np.concatenate([np.full(len(x), 2 ** level, dtype=np.int64) for level, x in enumerate(self.__levels)])
+
+        order = np.argsort(values, kind="stable")
+
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        """
+        Квантиль q (от 0 до 1, число или массив): наименьшее значение, не
+        меньше которого q всех значений (как np.quantile с
+        method="inverted_cdf"). 0 и 1 - точные min и max, у пустого - NaN.
+        """
+        q = np.asarray(q, dtype=float)
+
+        if self.__count == 0:
+            return np.full(q.shape, np.nan)[()]
+
+        values, weights = self.items()
+        cumulative = np.cumsum(weights)
+
+        target = np.maximum(np.ceil(q * self.__count), 1)
+        result = values[np.minimum(np.searchsorted(cumulative, target, side="left"), len(values) - 1)]
+
+        result = np.where(q <= 0, self.__min, np.where(q >= 1, self.__max, result))
+
+        return result[()]
+
+    def rank(self, x):
+        """
+        Доля значений, не больших x (число или массив).
+        """
+        x = np.asarray(x, dtype=float)
+
+        if self.__count == 0:
+            return np.full(x.shape, np.nan)[()]
+
+        values, weights = self.items()
+        cumulative = np.concatenate([[0], np.cumsum(weights)])
+
+        return (cumulative[np.searchsorted(values, x, side="right")] / self.__count)[()]
+
+    def toDict(self) -> dict:
+        """
+        Скетч в виде словаря для json.
+        """
+        return {"type": "kll",
+                "k": self.__k,
+                "seed": self.__seed,
+                "count": self.__count,
+                "min": None if np.isnan(self.__min) else float(self.__min),
+                "max": None if np.isnan(self.__max) else float(self.__max),
+                "levels": [x.tolist() for x in self.__levels]}
+
+    @staticmethod
+    def fromDict(state: dict) -> "QuantileSketch":
+        result = QuantileSketch(QuantileSketch.ERROR_FACTOR / state["k"], state.get("seed", 0))
+        result.__k = state["k"]
+        result.__levels = [np.asarray(x, dtype=float) for x in state["levels"]] or [np.empty(0)]
+        result.__count = state["count"]
+        result.__min = np.nan if state["min"] is None else state["min"]
+        result.__max = np.nan if state["max"] is None else state["max"]
+        return result
@@ -0,0 +1,24 @@
+from typing import NamedTuple
+
+
+class ReportArtifact(NamedTuple):
+    """
+    Результат одного этапа TableHandler.export_Stream.
+
+    Поля:
+        - name: str - имя таблицы или графика ("Grades", "BRSO" и тд).
+        - value - pd.DataFrame для таблиц, io.BytesIO с .png для графиков,
+        None при ошибке.
+        - file: str - записанный файл или None, если папка не указана.
+        - error: Exception - ошибка этапа или None.
+        - seconds: float - сколько секунд прошло от запуска до готовности.
+    """
+    name: str
+    value: object
+    file: str
+    error: Exception
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,181 @@
+import os
+import re
+from typing import List
+
+import numpy as np
+from PIL import Image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .FileExport import FileExport as FileExport
+
+
+class ReportCard:
+    """
+    Шаблон индивидуального отчёта студента: слева оценки студента по
+    вопросам рядом с Max и Average группы, справа его оценки тестов, сверху
+    имя, Average, Round и LSI. Фигура, оси, подписи и столбцы группы
+    создаются один раз, для каждого студента меняются только высоты его
+    столбцов и текст, поэтому отчёт не собирает фигуру заново.
+
+    Для .png неизменная часть рисуется один раз и запоминается, на каждого 
+    студента она восстанавливается и поверх дорисовываются только его 
+    столбцы и текст (blit), без раскладки осей, делений и подписей.
+
+    Обычно используется через TableHandler.export_StudentsReports.
+    """
+
+    # Символы, которые нельзя использовать в имени файла
+    BAD_FILE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+    def __init__(self,
+                 maxGrades: np.ndarray,
+                 averageGrades: np.ndarray,
+                 maxTests: float,
+                 namesLegend: List[str] = ["Студент", "Max группы", "Average группы"],
+                 titles: List[str] = ["Оценки по вопросам", "Оценки тестов"],
+                 figsize=(10, 4.5),
+                 dpi: int = 100):
+        """
+        Args:
+            - maxGrades: np.ndarray - Max группы по каждому вопросу.
+            - averageGrades: np.ndarray - Average группы по каждому вопросу.
+            - maxTests: float - верхняя граница оси оценок тестов.
+            - namesLegend: List[str] - подписи столбцов студента и группы.
+            - titles: List[str] - заголовки левого и правого графиков.
+            - figsize, dpi - размер фигуры.
+        """
+        countQuestions = len(maxGrades)
+        x = np.arange(1, countQuestions + 1)
+        width = 0.27
+        zeros = np.zeros(countQuestions)
+
+        self.__fig = Figure(figsize=figsize, dpi=dpi)
+        self.__canvas = FigureCanvasAgg(self.__fig)
+        self.__background = None
+        axGrades, axTests = self.__fig.subplots(1, 2)
+
+        self.__barsGrades = axGrades.bar(x - width, zeros, width, color="c", label=namesLegend[0])
+        axGrades.bar(x, maxGrades, width, color="silver", label=namesLegend[1])
+        axGrades.bar(x + width, averageGrades, width, color="gold", label=namesLegend[2])
+
+        axGrades.set_title(titles[0])
+        axGrades.set_xticks(x)
+        axGrades.set_ylim(0, max(np.max(maxGrades), 1) * 1.15)
+        axGrades.grid(True, axis='y')
+        axGrades.set_axisbelow(True)
+
+        self.__barsTests = axTests.bar(x, zeros, width=0.5, color="green")
+
+        axTests.set_title(titles[1])
+        axTests.set_xticks(x)
+        axTests.set_ylim(0, max(maxTests, 1) * 1.15)
+        axTests.grid(True, axis='y')
+        axTests.set_axisbelow(True)
+
+        self.__title = self.__fig.suptitle("")
+        self.__summary = self.__fig.text(0.5, 0.9, "", ha="center")
+
+        self.__fig.legend(loc="lower center", ncol=3, fontsize="small")
+        self.__fig.subplots_adjust(top=0.8, bottom=0.17)
+
+    @property
+    def figure(self) -> Figure:
+        return self.__fig
+
+    def update(self, name: str, grades: np.ndarray, tests: np.ndarray, summary: str) -> None:
+        """
+        Подставляет данные студента в шаблон.
+
+        Args:
+            - name: str - имя студента.
+            - grades: np.ndarray - оценки студента по вопросам.
+            - tests: np.ndarray - оценки тестов студентом.
+            - summary: str - строка с Average, Round и LSI.
+        """
+        for bar, height in zip(self.__barsGrades, grades):
+            bar.set_height(height)
+
+        for bar, height in zip(self.__barsTests, tests):
+            bar.set_height(height)
+
+        self.__title.set_text(str(name))
+        self.__summary.set_text(summary)
+
+    def savePng(self, file, compressLevel: int = 1) -> None:
+        """
+        Сохраняет текущий отчёт в .png через запомненную неизменную часть.
+
+        Args:
+            - file - файл, открытый на запись в двоичном режиме, или путь.
+            - compressLevel: int = 1 - сжатие png (0-9), больше - медленнее.
+        """
+        artists = list(self.__barsGrades) + list(self.__barsTests) + [self.__title, self.__summary]
+
+        if self.__background is None:
+            for artist in artists:
+                artist.set_animated(True)
+
+            self.__canvas.draw()
+            self.__background = self.__canvas.copy_from_bbox(self.__fig.bbox)
+
+        self.__canvas.restore_region(self.__background)
+
+        for artist in artists:
+            self.__fig.draw_artist(artist)
+
+        size = self.__canvas.get_width_height()
+        image = Image.frombuffer("RGBA", size, self.__canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+        image.save(file, format="png", compress_level=compressLevel)
+
+    @staticmethod
+    def fileName(number: int, name: str, extension: str) -> str:
+        """
+        Имя файла отчёта "<номер> <имя>.<расширение>" без недопустимых символов.
+        """
+        return f"{number} {ReportCard.BAD_FILE_CHARS.sub('_', str(name)).strip('_')}.{extension}"
+
+    @staticmethod
+    def renderChunk(template: dict, chunk: dict, pathForExport: str, fileFormat: str, fileDocument: str = None) -> int:
+        """
+        Рисует отчёты части студентов одним шаблоном. Вызывается в отдельном
+        процессе, поэтому принимает только простые данные.
+
+        Args:
+            - template: dict - аргументы конструктора ReportCard.
+            - chunk: dict - "numbers", "names", "grades", "tests", "summaries".
+            - pathForExport: str - папка для файлов по студентам.
+            - fileFormat: str - "png" или "pdf".
+            - fileDocument: str = None - если указан, все отчёты части
+            пишутся страницами в этот .pdf вместо файлов по студентам.
+
+        Raise:
+            - FileExistsError, если файл уже существует.
+        Return:
+            - Количество отчётов.
+        """
+        card = ReportCard(**template)
+        rows = zip(chunk["numbers"], chunk["names"], chunk["grades"], chunk["tests"], chunk["summaries"])
+
+        if fileDocument is not None:
+            from matplotlib.backends.backend_pdf import PdfPages
+
+            def writeDocument(file):
+                with PdfPages(file) as document:
+                    for number, name, grades, tests, summary in rows:
+                        card.update(name, grades, tests, summary)
+                        document.savefig(card.figure)
+
+            FileExport.writeExclusive(fileDocument, writeDocument)
+        else:
+            for number, name, grades, tests, summary in rows:
+                card.update(name, grades, tests, summary)
+
+                if fileFormat == "png":
+                    write = card.savePng
+                else:
+                    write = lambda file: card.figure.savefig(file, format=fileFormat)
+
+                FileExport.writeExclusive(os.path.join(pathForExport, ReportCard.fileName(number, name, fileFormat)), write)
+
+        return len(chunk["numbers"])
@@ -0,0 +1,299 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .XlsxReader import XlsxReader as XlsxReader
+from .GradingPolicy import GradingPolicy as GradingPolicy
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class SparseTable:
+    """
+    Разреженная таблица студенты x вопросы в формате CSR: хранятся только
+    ненулевые ответы. В TableHandler ноль значит "нет ответа" (пустые ячейки
+    заполняются нулями, calculateAverage усредняет только ненулевые), поэтому
+    для широких анкет, где каждый отвечает на несколько вопросов из сотен,
+    Sum, Max, среднее ненулевых, Average X, Round X и LSI/LTI считаются по
+    хранимым значениям, а память и время зависят от количества ответов.
+
+    Пример использования:
+
+    ```python
+    >>> grades = SparseTable.readExcel(pathForFile, gradesStudents)
+    >>> tests = SparseTable.readExcel(pathForFile, testScope)
+    >>> grades.createTableSumAverageRound(names)
+    >>> SparseTable.createTableLtiLsti(grades, tests, names)
+    ```
+    """
+
+    def __init__(self,
+                 data: np.ndarray,
+                 indices: np.ndarray,
+                 indptr: np.ndarray,
+                 shape: Tuple[int, int],
+                 headers: List[str] = None,
+                 policy: GradingPolicy = None):
+        """
+        Args:
+            - data: np.ndarray - ненулевые значения по строкам.
+            - indices: np.ndarray - колонки значений, по возрастанию в строке.
+            - indptr: np.ndarray - начало каждой строки в data, длина
+            строки + 1.
+            - shape: Tuple[int, int] - (студенты, вопросы).
+            - headers: List[str] = None - заголовки вопросов.
+            - policy: GradingPolicy = None - политика для 
+            createTableSumAverageRound, по умолчанию GradingPolicy(). 
+            TableHandler.readSparse передаёт политику обработчика.
+        """
+        self.__data = np.asarray(data, dtype=float)
+        self.__indices = np.asarray(indices, dtype=np.int64)
+        self.__indptr = np.asarray(indptr, dtype=np.int64)
+        self.__shape = (int(shape[0]), int(shape[1]))
+        self.__headers = list(headers) if headers is not None else [str(x) for x in range(1, self.__shape[1] + 1)]
+        self.__policy = policy if policy is not None else GradingPolicy()
+
+        if len(self.__headers) != self.__shape[1]:
+            raise BadNameHeaders(f"Заголовков {len(self.__headers)}, а колонок {self.__shape[1]}")
+
+        for array in (self.__data, self.__indices, self.__indptr):
+            array.flags.writeable = False
+
+    @staticmethod
+    def fromTriplets(rows: np.ndarray,
+                     columns: np.ndarray,
+                     values: np.ndarray,
+                     shape: Tuple[int, int],
+                     headers: List[str] = None,
+                     policy: GradingPolicy = None) -> "SparseTable":
+        """
+        Собирает таблицу из троек (строка, колонка, значение). Нули, NaN и
+        бесконечности отбрасываются.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+
+        keep = (values != 0) & np.isfinite(values)
+        rows, columns, values = rows[keep], columns[keep], values[keep]
+
+        order = np.lexsort((columns, rows))
+
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+
+        return SparseTable(values[order], columns[order], indptr, shape, headers, policy)
+
+    @staticmethod
+    def fromDataFrame(table: pd.DataFrame, headers: List[str], policy: GradingPolicy = None) -> "SparseTable":
+        """
+        Разреженная таблица из колонок headers pd.DataFrame. Значения
+        переводятся в числа как в TableHandler: текст, NaN и бесконечности
+        становятся нулями и не хранятся.
+        """
+        values = table[headers].apply(lambda x: pd.to_numeric(x, errors='coerce')).to_numpy(dtype=float)
+        rows, columns = np.nonzero(np.nan_to_num(values, nan=0, posinf=0, neginf=0))
+
+        return SparseTable.fromTriplets(rows, columns, values[rows, columns], values.shape, headers, policy)
+
+    @staticmethod
+    def readExcel(pathToTable: str, headers: List[str], policy: GradingPolicy = None) -> "SparseTable":
+        """
+        Читает колонки headers .xlsx сразу в разреженную таблицу через
+        XlsxReader.readNonzero, без плотного pd.DataFrame.
+        """
+        rows, columns, values, countRows = XlsxReader.readNonzero(pathToTable, headers)
+
+        return SparseTable.fromTriplets(rows, columns, values, (countRows, len(headers)), headers, policy)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.__shape
+
+    @property
+    def headers(self) -> List[str]:
+        return list(self.__headers)
+
+    @property
+    def policy(self) -> GradingPolicy:
+        return self.__policy
+
+    @property
+    def nnz(self) -> int:
+        return len(self.__data)
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.__data
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.__indices
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self.__indptr
+
+    def rowOfValues(self) -> np.ndarray:
+        """
+        Номер строки каждого хранимого значения.
+        """
+        return np.repeat(np.arange(self.__shape[0]), np.diff(self.__indptr))
+
+    def toDense(self) -> np.ndarray:
+        result = np.zeros(self.__shape)
+        result[self.rowOfValues(), self.__indices] = self.__data
+        return result
+
+    def rowSum(self) -> np.ndarray:
+        return np.bincount(self.rowOfValues(), weights=self.__data, minlength=self.__shape[0])
+
+    def columnSum(self) -> np.ndarray:
+        return np.bincount(self.__indices, weights=self.__data, minlength=self.__shape[1])
+
+    def rowCount(self) -> np.ndarray:
+        return np.diff(self.__indptr)
+
+    def columnCount(self) -> np.ndarray:
+        return np.bincount(self.__indices, minlength=self.__shape[1])
+
+    def columnMax(self) -> np.ndarray:
+        """
+        Максимум колонки с учётом неявных нулей, как max() плотной колонки.
+        """
+        result = np.full(self.__shape[1], -np.inf)
+        np.maximum.at(result, self.__indices, self.__data)
+
+        hasZeros = self.columnCount() < self.__shape[0]
+        result[hasZeros] = np.maximum(result[hasZeros], 0)
+
+        return result
+
+    def rowNonzeroMean(self) -> np.ndarray:
+        """
+        Среднее ненулевых значений строки, 0 если их нет
+        (TableHandler.calculateAverage).
+        """
+        count = self.rowCount()
+        return np.divide(self.rowSum(), count, out=np.zeros(self.__shape[0]), where=count != 0)
+
+    def columnNonzeroMean(self) -> np.ndarray:
+        """
+        Среднее ненулевых значений колонки, 0 если их нет.
+        """
+        count = self.columnCount()
+        return np.divide(self.columnSum(), count, out=np.zeros(self.__shape[1]), where=count != 0)
+
+    def averageGrades(self, policy: GradingPolicy) -> np.ndarray:
+        """
+        Average X по строкам как в GradingPolicy.evaluate: сумма x / max
+        колонки, умноженная на gradeConverted / количество вопросов. Вопросы
+        без единого ответа (max = 0) пропускаются, в плотной таблице они
+        дают NaN у всех студентов.
+        """
+        maxValues = self.columnMax()
+
+        maxOfValues = maxValues[self.__indices]
+        terms = np.divide(self.__data, maxOfValues, out=np.zeros(self.nnz), where=maxOfValues != 0) * policy.gradeConverted / self.__shape[1]
+
+        return np.bincount(self.rowOfValues(), weights=terms, minlength=self.__shape[0])
+
+    def divide(self, other: "SparseTable") -> "SparseTable":
+        """
+        Поэлементное self / other только там, где обе таблицы хранят
+        значения. В плотном виде деление на ноль и 0 / 0 заменяются нулём,
+        так что остальные позиции и так нулевые.
+
+        Raise:
+            - Размеры таблиц не совпадают.
+        """
+        if self.__shape != other.shape:
+            raise BadNameHeaders(f"Размеры таблиц не совпадают: {self.__shape} и {other.shape}")
+
+        countColumns = self.__shape[1]
+
+        keysSelf = self.rowOfValues() * countColumns + self.__indices
+        keysOther = other.rowOfValues() * countColumns + other.indices
+
+        keys, positionsSelf, positionsOther = np.intersect1d(keysSelf, keysOther, assume_unique=True, return_indices=True)
+
+        return SparseTable.fromTriplets(keys // countColumns, keys % countColumns,
+                                        self.__data[positionsSelf] / other.data[positionsOther],
+                                        self.__shape, self.__headers, self.__policy)
+
+    def createTableSumAverageRound(self,
+                                   namesStudents: List[str],
+                                   policy: GradingPolicy = None,
+                                   nameColumnStudents: str = "Students",
+                                   nameHeadersColumns_Sum_Average_Round: List[str] = None) -> pd.DataFrame:
+        """
+        Колонки Sum, Average X, Round X по студентам (без колонок вопросов).
+
+        Args:
+            - namesStudents: List[str] - имена студентов.
+            - policy: GradingPolicy = None - политика, по умолчанию политика
+            таблицы.
+            - nameColumnStudents: str = "Students" - имя колонки студентов.
+            - nameHeadersColumns_Sum_Average_Round: List[str] = None - имена
+            колонок, по умолчанию из политики.
+
+        Return:
+            - pd.DataFrame.
+        """
+        policy = self.__policy if policy is None else policy
+
+        if nameHeadersColumns_Sum_Average_Round is None:
+            nameHeadersColumns_Sum_Average_Round = ["Sum", policy.nameAverage, policy.nameRound]
+
+        if len(nameHeadersColumns_Sum_Average_Round) != 3:
+            raise BadNameHeaders("Количество имён заголовков для суммы, среднего и округления должно быть 3")
+
+        averages = self.averageGrades(policy)
+        rounds = GradingPolicy.roundValues(averages, policy.roundFactor)
+
+        return pd.DataFrame({nameColumnStudents: list(namesStudents),
+                             nameHeadersColumns_Sum_Average_Round[0]: self.rowSum(),
+                             nameHeadersColumns_Sum_Average_Round[1]: averages,
+                             nameHeadersColumns_Sum_Average_Round[2]: rounds.astype(np.int64)})
+
+    @staticmethod
+    def createTableLtiLsti(grades: "SparseTable",
+                           tests: "SparseTable",
+                           namesStudents: List[str],
+                           nameColumnStudents: str = "Students",
+                           nameHeaders_LSI_LTI: List[str] = ["LSI", "LTI"]) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        LSI и LTI по отношениям оценок тестов к оценкам студентов, как
+        TableHandler.createTableLtiLsti, но без плотной таблицы отношений
+        студенты x вопросы.
+
+        Args:
+            - grades: SparseTable - оценки студентов.
+            - tests: SparseTable - оценки тестов в том же порядке вопросов.
+            - namesStudents: List[str] - имена студентов.
+            - nameColumnStudents: str = "Students" - имя колонки студентов.
+            - nameHeaders_LSI_LTI: List[str] = ["LSI", "LTI"] - имена.
+
+        Raise:
+            - Количество заголовков не 2.
+        Return:
+            - (pd.DataFrame студенты и LSI, pd.Series LTI по номерам вопросов
+            "1", "2" ... и LTI колонки LSI).
+        """
+        if len(nameHeaders_LSI_LTI) != 2:
+            raise BadNameHeaders("Количество заголовков не верно, нужно 2, у тебя" + str(len(nameHeaders_LSI_LTI)))
+
+        ratios = tests.divide(grades)
+
+        lsi = ratios.rowNonzeroMean()
+        lti = ratios.columnNonzeroMean()
+
+        nonzeroLsi = lsi[lsi != 0]
+        ltiOfLsi = nonzeroLsi.sum() / len(nonzeroLsi) if len(nonzeroLsi) > 0 else 0
+
+        headers = [str(x) for x in range(1, grades.shape[1] + 1)] + [nameHeaders_LSI_LTI[0]]
+
+        tableLsi = pd.DataFrame({nameColumnStudents: list(namesStudents), nameHeaders_LSI_LTI[0]: lsi})
+        seriesLti = pd.Series(np.append(lti, ltiOfLsi), index=headers, name=nameHeaders_LSI_LTI[1])
+
+        return tableLsi, seriesLti
@@ -0,0 +1,187 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
+
+
+class StudentsIndex:
+    """
+    Индекс по итоговым показателям студентов (Sum, Average, Round, LSI,
+    показатели тестов) для повторяющихся запросов: сортировки и корзины
+    оценок строятся один раз, дальше запросы не просматривают таблицу.
+        - top - k лучших (худших) срезом готового порядка за O(k);
+        - range - диапазон значений бинарным поиском по отсортированному
+        массиву;
+        - bucket - студенты с заданной целой оценкой (Round) за O(1);
+        - percentile - процентиль студента бинарным поиском.
+
+    Обычно создаётся через TableHandler.query().
+
+    Пример использования:
+
+    ```python
+    >>> index = handler.query()
+    >>> index.top("Average 5", 20)
+    >>> index.bucket("Round 0.5", 2)
+    >>> index.range("LSI", high=0.5)
+    >>> index.percentile("Average 5", "Иванов")
+    ```
+    """
+
+    def __init__(self,
+                 names: List[str],
+                 columns: Dict[str, np.ndarray],
+                 nameColumnStudents: str = "Students"):
+        """
+        Args:
+            - names: List[str] - имена студентов по строкам.
+            - columns: Dict[str, np.ndarray] - показатель -> значения по строкам.
+            - nameColumnStudents: str = "Students" - имя колонки студентов в
+            ответах.
+
+        Raise:
+            - Длины колонок не совпадают с количеством студентов.
+        """
+        countStudents = len(names)
+
+        self.__nameColumnStudents = nameColumnStudents
+        self.__names = np.array(names, dtype=object)
+        self.__rowsByName = {}
+
+        for row, name in enumerate(names):
+            self.__rowsByName.setdefault(name, row)
+
+        self.__values = {}
+        self.__sorted = {}
+        self.__orders = {}
+        self.__ordersDescending = {}
+        self.__buckets = {}
+
+        for column, values in columns.items():
+            values = np.array(values, dtype=float)
+
+            if len(values) != countStudents:
+                raise BadNameHeaders(f"Длина колонки {column} не совпадает с количеством студентов")
+
+            values.flags.writeable = False
+
+            valid = np.flatnonzero(~np.isnan(values))
+            order = valid[np.argsort(values[valid], kind="stable")]
+            order.flags.writeable = False
+
+            sortedValues = values[order]
+            sortedValues.flags.writeable = False
+
+            # По убыванию, равные - в порядке таблицы, как и в order
+            orderDescending = order[np.argsort(-sortedValues, kind="stable")]
+            orderDescending.flags.writeable = False
+
+            self.__values[column] = values
+            self.__orders[column] = order
+            self.__ordersDescending[column] = orderDescending
+            self.__sorted[column] = sortedValues
+
+            if np.all(np.mod(sortedValues, 1) == 0):
+                starts = np.flatnonzero(np.diff(sortedValues)) + 1
+                groups = np.split(order, starts) if len(order) != 0 else []
+                firsts = np.concatenate([[0], starts]).astype(np.int64)
+
+                self.__buckets[column] = {int(sortedValues[first]): np.sort(group)
+                                          for first, group in zip(firsts, groups)}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.__values)
+
+    def __column(self, column: str) -> np.ndarray:
+        if column not in self.__values:
+            raise BadNameHeaders(f"Показателя {column} нет в индексе, есть: {self.columns}")
+        return self.__values[column]
+
+    def rows(self, rows) -> pd.DataFrame:
+        """
+        Строки индекса в заданном порядке: студенты и все показатели.
+        Индекс pd.DataFrame - номера строк исходной таблицы.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+
+        table = {self.__nameColumnStudents: self.__names[rows]}
+
+        for column, values in self.__values.items():
+            table[column] = values[rows]
+
+        return pd.DataFrame(table, index=rows)
+
+    def top(self, column: str, k: int = 10, largest: bool = True) -> pd.DataFrame:
+        """
+        k студентов с наибольшим (largest=False - наименьшим) значением за
+        O(k): начало порядка, отсортированного при построении индекса. При 
+        равных значениях выше тот, кто раньше в таблице.
+        """
+        self.__column(column)
+
+        order = self.__ordersDescending[column] if largest else self.__orders[column]
+
+        return self.rows(order[:max(0, k)])
+
+    def range(self, column: str, low: float = None, high: float = None) -> pd.DataFrame:
+        """
+        Студенты со значением low <= x <= high (границу можно не указывать)
+        бинарным поиском, по возрастанию значения.
+        """
+        self.__column(column)
+
+        sortedValues = self.__sorted[column]
+
+        start = 0 if low is None else np.searchsorted(sortedValues, low, side="left")
+        end = len(sortedValues) if high is None else np.searchsorted(sortedValues, high, side="right")
+
+        return self.rows(self.__orders[column][start:max(start, end)])
+
+    def bucket(self, column: str, value: int) -> pd.DataFrame:
+        """
+        Студенты с целым значением value (например, Round) за O(1).
+
+        Raise:
+            - Показатель не целочисленный.
+        """
+        self.__column(column)
+
+        if column not in self.__buckets:
+            raise BadNameHeaders(f"Показатель {column} не целочисленный, используй range")
+
+        return self.rows(self.__buckets[column].get(int(value), []))
+
+    def counts(self, column: str) -> Dict[int, int]:
+        """
+        Количество студентов в каждой корзине целочисленного показателя.
+        """
+        self.__column(column)
+
+        if column not in self.__buckets:
+            raise BadNameHeaders(f"Показатель {column} не целочисленный, используй range")
+
+        return {value: len(rows) for value, rows in self.__buckets[column].items()}
+
+    def percentile(self, column: str, student) -> float:
+        """
+        Процент студентов со значением не больше, чем у студента student
+        (имя из колонки студентов).
+
+        Raise:
+            - Студента нет в индексе.
+        """
+        values = self.__column(column)
+
+        if student not in self.__rowsByName:
+            raise BadNameHeaders(f"Студента {student} нет в индексе")
+
+        value = values[self.__rowsByName[student]]
+        sortedValues = self.__sorted[column]
+
+        if np.isnan(value) or len(sortedValues) == 0:
+            return float("nan")
+
+        return 100.0 * np.searchsorted(sortedValues, value, side="right") / len(sortedValues)
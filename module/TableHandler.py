@@ -1,13 +1,27 @@
+import io
 import os
+import re
 import shutil
-from typing import List
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator, List, Tuple
 
-import openpyxl
 import numpy as np
 import pandas as pd
 
-import matplotlib.pyplot as plt
-
+from matplotlib.figure import Figure
+from openpyxl.drawing.image import Image as XlsxImage
+
+from .XlsxReader import XlsxReader as XlsxReader
+from .GradingPolicy import GradingPolicy as GradingPolicy
+from .StudentsIndex import StudentsIndex as StudentsIndex
+from .QuantileSketch import QuantileSketch as QuantileSketch
+from .IntegerHistogram import IntegerHistogram as IntegerHistogram
+from .ReportArtifact import ReportArtifact as ReportArtifact
+from .ReportCard import ReportCard as ReportCard
+from .SparseTable import SparseTable as SparseTable
+from .FileExport import FileExport as FileExport
 from .Exceptions.BadTable import BadTable as BadTable
 from .Exceptions.BadNameHeaders import BadNameHeaders as BadNameHeaders
 
@@ -18,6 +32,10 @@ class TableHandler:
     GRADE_CONVERTED = 5
     #Как происходит округление оценок
     ROUND_FACTOR = 0.5
+    # Ошибка ранга скетчей, которые строятся при загрузке (см. sketches)
+    SKETCH_ERROR = 0.01
+    # Строк за раз при подсчёте LSI в createTableLtiLsti
+    LSI_CHUNK_ROWS = 4096
 
     @staticmethod
     def check_table(path_to_table: str, 
@@ -42,11 +60,35 @@ class TableHandler:
         Return:
             - True: Ошибок нет.
         """
-        workbook = openpyxl.load_workbook(path_to_table, read_only=True)
-        worksheet = workbook.active
-
-        headersTable = [cell.value for cell in next(worksheet.iter_rows())]
+        headersTable = XlsxReader.readHeaders(path_to_table)
         
+        return TableHandler.check_headers(headersTable, headers, 
+                                          headersGrades, headersTestScope)
+
+    @staticmethod
+    def check_headers(headersTable: List[str], 
+                      headers: List[str], 
+                      headersGrades: List[str], 
+                      headersTestScope: List[str]) -> bool:
+        """
+        Проверяет заголовки таблицы на наличие ошибок. Те же проверки, что и 
+        в check_table, но без чтения файла: заголовки таблицы передаются 
+        списком.
+
+        Args:
+            headersTable: List[str] Заголовки из первой строки таблицы.
+            headers: List[str] Заголовки таблицы.
+            headersGrades: List[str] Оценки студентов по тестам.
+            headersTestScope: List[str] Оценки тестов студентами.
+
+        Raise:
+            - 1: Количество вопросов не совпадает с количеством оценок тестов.
+            - 2: Количество вопросов не может быть нулевым, проверь таблицу
+            - 3: Вопросы или оценки тестов не находятся в заголовках.
+            - 4: Заголовки таблицы не совпадают с заголовками header.
+        Return:
+            - True: Ошибок нет.
+        """
         if len(headersGrades) != len(headersTestScope):
             raise BadTable("Количество вопросов не совпадает с количеством оценок тестов")
         elif len(headersGrades) == 0:
@@ -60,23 +102,322 @@ class TableHandler:
 
         return True
 
+    # Допустимый диапазон в заголовке: "... (от 0 до 11)"
+    RANGE_PATTERN = re.compile(r"\(\s*от\s*(-?\d+(?:[.,]\d+)?)\s*до\s*(-?\d+(?:[.,]\d+)?)\s*\)")
+    
+    @staticmethod
+    def parseRange(header: str):
+        """
+        Достаёт допустимый диапазон из суффикса заголовка "(от A до B)".
+
+        Args:
+            - header: str - заголовок вопроса.
+
+        Return:
+            - (A, B) или None, если диапазона в заголовке нет.
+        """
+        match = TableHandler.RANGE_PATTERN.search(str(header))
+        
+        if match is None:
+            return None
+        
+        return tuple(float(x.replace(",", ".")) for x in match.groups())
+    
+    @staticmethod
+    def check_values(tableValues: pd.DataFrame, 
+                     headers: List[str], 
+                     namesStudents: List[str] = None,
+                     strict: bool = False) -> pd.DataFrame:
+        """
+        Проверяет значения ячеек колонок headers за один проход масками по 
+        колонкам, а не по ячейкам. Ошибки:
+            - текст вместо числа;
+            - бесконечность;
+            - отрицательное значение;
+            - значение вне диапазона "(от A до B)" из заголовка.
+        Пустые ячейки ошибкой не считаются (это "нет ответа").
+
+        Args:
+            - tableValues: pd.DataFrame - таблица для проверки.
+            - headers: List[str] - колонки оценок и оценок тестов.
+            - namesStudents: List[str] = None - имена студентов для отчёта.
+            - strict: bool = False - бросить BadTable, если есть ошибки.
+
+        Raise:
+            - Значения таблицы неверны (только при strict).
+        Return:
+            - pd.DataFrame с колонками row (номер строки данных с нуля), 
+            student, column, value, reason. Пустая, если ошибок нет.
+        """
+        reports = []
+        
+        for position, header in enumerate(headers):
+            raw = tableValues[header]
+            
+            if pd.api.types.is_numeric_dtype(raw.dtype):
+                numbers = raw.to_numpy(dtype=float)
+                masks = []
+            else:
+                numbers = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+                masks = [(raw.notna().to_numpy() & np.isnan(numbers), "не число")]
+            
+            limits = TableHandler.parseRange(header)
+            
+            with np.errstate(invalid="ignore"):
+                masks.append((np.isinf(numbers), "бесконечность"))
+                masks.append((numbers < 0, "отрицательное значение"))
+                
+                if limits is not None:
+                    masks.append((numbers < max(limits[0], 0), f"меньше {limits[0]:g}"))
+                    masks.append((np.isfinite(numbers) & (numbers > limits[1]), f"больше {limits[1]:g}"))
+            
+            for mask, reason in masks:
+                rows = np.flatnonzero(mask)
+                
+                if len(rows) != 0:
+                    reports.append(pd.DataFrame({"row": rows, 
+                                                 "order": position,
+                                                 "column": header, 
+                                                 "value": raw.to_numpy()[rows], 
+                                                 "reason": reason}))
+        
+        if len(reports) == 0:
+            report = pd.DataFrame(columns=["row", "student", "column", "value", "reason"])
+        else:
+            report = pd.concat(reports, ignore_index=True)
+            report = report.drop_duplicates(subset=["row", "order"]).sort_values(["row", "order"], kind="stable")
+            names = np.array(namesStudents if namesStudents is not None else range(1, tableValues.shape[0] + 1), dtype=object)
+            report.insert(1, "student", names[report["row"].to_numpy()])
+            report = report.drop(columns="order").reset_index(drop=True)
+        
+        if strict and len(report) != 0:
+            first = "; ".join(f"строка {x.row}, '{x.column}': {x.value!r} - {x.reason}" for x in report.head(5).itertuples())
+            raise BadTable(f"Неверных значений: {len(report)}. {first}")
+        
+        return report
+    
     @staticmethod    
-    def customRound(number:float, cRound: float = ROUND_FACTOR) -> int:
+    def customRound(number:float, cRound: float = None) -> int:
         """
         Округляет число с заданной точностью().
 
         Args:
             - number: float число для округления.
-            - cRound: float глубина округления(по умолчанию 0.5).
+            - cRound: float глубина округления(по умолчанию ROUND_FACTOR).
         Returns:
             - Округлённое число.
         """
+        if cRound is None:
+            cRound = TableHandler.ROUND_FACTOR
+        
         if number - int(number) >= cRound: 
             return int(number) + 1
         else:
             return int(number)
         
     
+    @staticmethod
+    def defaultPolicy() -> GradingPolicy:
+        """
+        Политика оценивания из текущих GRADE_CONVERTED и ROUND_FACTOR с 
+        прежними именами колонок "Average X" и "Round Y".
+        """
+        return GradingPolicy(TableHandler.GRADE_CONVERTED, TableHandler.ROUND_FACTOR, 
+                             nameRound=f"Round {TableHandler.ROUND_FACTOR}")
+    
+    @staticmethod
+    def roundColumn(values: np.ndarray) -> np.ndarray:
+        """
+        Колонка Round: целые int64, если пропусков нет, иначе float с NaN.
+        """
+        if np.isnan(values).any():
+            return values
+        return values.astype(np.int64)
+    
+    @staticmethod
+    def freezeTable(table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Делает таблицу неизменяемой без копирования: каждая колонка 
+        становится отдельным массивом только для чтения. Запись в значения 
+        (loc, iloc, values) бросает ValueError, поэтому общую таблицу 
+        обработчика можно читать из нескольких потоков.
+
+        Args:
+            - table: pd.DataFrame - таблица, которой больше никто не владеет.
+
+        Return:
+            - Таблица pd.DataFrame с колонками только для чтения.
+        """
+        columns = {}
+        
+        for i in range(table.shape[1]):
+            values = table.iloc[:, i].to_numpy()
+            values.flags.writeable = False
+            columns[i] = values
+        
+        frozen = pd.DataFrame(columns, index=table.index, copy=False)
+        frozen.columns = table.columns
+        
+        return frozen
+    
+    @staticmethod
+    def normalizeTable(tableValues: pd.DataFrame,
+                       headers: List[str]) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Один раз приводит колонки headers к числам: пустые ячейки, текст и
+        бесконечности становятся нулями, как раньше в каждом построителе
+        таблиц. Кроме таблицы строится непрерывный блок float64 студенты x
+        вопросы (по колонкам, order="F"): колонки float64 таблицы - это
+        колонки блока, целые колонки сохраняют свой тип. Всё только для
+        чтения, поэтому таблицу и блок можно отдавать построителям без копий;
+        наружу таблицы отдаются через ownedTable.
+
+        Args:
+            - tableValues: pd.DataFrame - исходная таблица.
+            - headers: List[str] - колонки для вычислений.
+
+        Return:
+            - (pd.DataFrame только с колонками headers, np.ndarray блок).
+        """
+        table = tableValues[headers].fillna(0)
+        table = table.apply(lambda x: pd.to_numeric(x, errors='coerce')).fillna(0)
+        table = table.replace([np.inf, -np.inf], 0)
+
+        block = np.empty(table.shape, dtype=float, order="F")
+        columns = {}
+
+        for i in range(table.shape[1]):
+            values = table.iloc[:, i].to_numpy()
+            block[:, i] = values
+
+            if values.dtype == block.dtype:
+                values = block[:, i]
+
+            values.flags.writeable = False
+            columns[i] = values
+
+        block.flags.writeable = False
+
+        normalized = pd.DataFrame(columns, index=table.index, copy=False)
+        normalized.columns = table.columns
+
+        return normalized, block
+
+    @staticmethod
+    def ownedTable(tableValues: pd.DataFrame, block: np.ndarray) -> pd.DataFrame:
+        """
+        Копия таблицы из normalizeTable для возврата пользователю: блок 
+        копируется одним массивом, колонки float64 - его срезы, целые 
+        колонки копируются отдельно. Колонки принадлежат копии и доступны 
+        для записи.
+
+        Args:
+            - tableValues: pd.DataFrame - таблица из normalizeTable.
+            - block: np.ndarray - её блок.
+
+        Return:
+            - pd.DataFrame с теми же колонками и значениями.
+        """
+        owned = np.array(block, order="F", copy=True)
+        columns = {}
+
+        for i in range(tableValues.shape[1]):
+            values = tableValues.iloc[:, i].to_numpy()
+            columns[i] = owned[:, i] if values.dtype == owned.dtype else values.copy()
+
+        table = pd.DataFrame(columns, index=tableValues.index, copy=False)
+        table.columns = tableValues.columns
+
+        return table
+
+    @staticmethod
+    def sumOfBlock(tableValues: pd.DataFrame, block: np.ndarray) -> np.ndarray:
+        """
+        Колонка Sum по таблице из normalizeTable и её блоку: вопросы 
+        складываются слева направо, как в прежнем поколоночном цикле, и 
+        результат в его типе - целый, если все вопросы целые.
+        """
+        total = np.zeros(block.shape[0])
+        
+        for i in range(block.shape[1]):
+            total += block[:, i]
+        
+        return total.astype(np.result_type(np.int64, *tableValues.dtypes))
+
+    @staticmethod
+    def withColumns(table: pd.DataFrame, names: List[str], columns: List[np.ndarray]) -> pd.DataFrame:
+        """
+        Таблица с колонками names справа, собранная за раз из массивов 
+        колонок, как в ownedTable: колонки table и columns не копируются, и 
+        у широких таблиц pandas не предупреждает о фрагментации, как при 
+        добавлении колонок по одной.
+        """
+        arrays = [table.iloc[:, i].to_numpy() for i in range(table.shape[1])] + list(columns)
+        
+        result = pd.DataFrame(dict(enumerate(arrays)), index=table.index, copy=False)
+        result.columns = list(table.columns) + list(names)
+        
+        return result
+
+    @staticmethod
+    def maxOfBlock(block: np.ndarray) -> np.ndarray:
+        """
+        Максимум каждой колонки блока, NaN для пустой таблицы (как max()
+        pd.DataFrame).
+        """
+        if block.shape[0] == 0:
+            return np.full(block.shape[1], np.nan)
+        return block.max(axis=0)
+
+    @staticmethod
+    def readSparse(path_to_table: str, 
+                   headersGrades: List[str], 
+                   headersTestScore: List[str], 
+                   headerNamesStudents: str = "",
+                   policy: GradingPolicy = None) -> tuple:
+        """
+        Разреженный режим для широких анкет: проверяет таблицу как 
+        конструктор (по строке заголовков) и читает оценки и оценки тестов 
+        сразу в SparseTable, без плотного pd.DataFrame. Все колонки (оценки,
+        оценки тестов, имена) читаются одним проходом по листу. Дальше Sum,
+        Average, Round и LSI/LTI считаются методами SparseTable.
+
+        Args:
+            - path_to_table: str - путь к таблице.
+            - headersGrades: List[str] - оценки студентов.
+            - headersTestScore: List[str] - оценки тестов.
+            - headerNamesStudents: str = "" - заголовок имён студентов, если
+            его нет в таблице, имена "1", "2" ...
+            - policy: GradingPolicy = None - политика таблиц, как у 
+            обработчика: по умолчанию defaultPolicy().
+
+        Raise:
+            - Как в конструкторе.
+        Return:
+            - (SparseTable оценок, SparseTable оценок тестов, имена студентов).
+        """
+        TableHandler.check_table(path_to_table, headersGrades + headersTestScore, 
+                                 headersGrades, headersTestScore)
+
+        policy = policy if policy is not None else TableHandler.defaultPolicy()
+        
+        hasNames = headerNamesStudents in XlsxReader.readHeaders(path_to_table)
+        headers = headersGrades + headersTestScore + ([headerNamesStudents] if hasNames else [])
+        
+        cells, strings, countStudents = XlsxReader.readCells(path_to_table, headers)
+        
+        grades = SparseTable.fromTriplets(*XlsxReader.nonzeroOf(cells, strings, headersGrades), 
+                                          (countStudents, len(headersGrades)), headersGrades, policy)
+        tests = SparseTable.fromTriplets(*XlsxReader.nonzeroOf(cells, strings, headersTestScore), 
+                                         (countStudents, len(headersTestScore)), headersTestScore, policy)
+
+        if hasNames:
+            names = XlsxReader.textOf(cells[headerNamesStudents], strings, countStudents)
+        else:
+            names = [str(i) for i in range(1, countStudents + 1)]
+
+        return grades, tests, names
+
     @staticmethod
     def calculateAverage(row):
         """
@@ -101,7 +442,10 @@ class TableHandler:
                  path_to_table: str,
                  headersGrades: List[str], 
                  headersTestScore: List[str], 
-                 headerNamesStudents: str = ""):
+                 headerNamesStudents: str = "",
+                 headersText: List[str] = [],
+                 fastReader: bool = False,
+                 policy: GradingPolicy = None):
         """
         Конструктор для обработки таблицы
 
@@ -109,6 +453,14 @@ class TableHandler:
             path_to_table: str Путь к таблице.
             headersGrades: List[str] Оценки студентов по тестам
             headersTestScore: List[str] Оценки тестов студентами.
+            headerNamesStudents: str Заголовок имён студентов.
+            headersText: List[str] Вопросы со свободным ответом, которые 
+            нужно прочитать при fastReader (например, вопрос пособий).
+            fastReader: bool Читать таблицу через XlsxReader.readColumns: 
+            разбираются только колонки имён, оценок, оценок тестов и 
+            headersText, остальные колонки в dataTable не попадают.
+            policy: GradingPolicy Политика оценивания обработчика. По умолчанию
+            из GRADE_CONVERTED и ROUND_FACTOR на момент создания.
 
         Raise:
             - 1: Количество вопросов не совпадает с количеством оценок тестов.
@@ -120,11 +472,40 @@ class TableHandler:
         
         TableHandler.check_table(path_to_table, headers, 
                                  headersGrades, headersTestScore)
+        
+        if fastReader:
+            textHeaders = list(headersText)
+            if headerNamesStudents in XlsxReader.readHeaders(path_to_table):
+                textHeaders.insert(0, headerNamesStudents)
+            
+            columns = XlsxReader.readColumns(path_to_table, headers, textHeaders)
+            dataTable = columns.toDataFrame()
+        else:
+            dataTable = pd.read_excel(path_to_table)
+        
+        self.__setup(dataTable, headersGrades, headersTestScore, headerNamesStudents, policy)
 
+    def __setup(self, 
+                dataTable: pd.DataFrame,
+                headersGrades: List[str], 
+                headersTestScore: List[str], 
+                headerNamesStudents: str,
+                policy: GradingPolicy) -> None:
+        """
+        Общая часть конструкторов: таблица уже прочитана и проверена.
+        """
         self.__headersGradesStudents = list(headersGrades)
         self.__headersTestScore = list(headersTestScore)
         self.__headerStudentsName = headerNamesStudents
-        self.__data_table = pd.read_excel(path_to_table)
+        self.__policy = TableHandler.defaultPolicy() if policy is None else policy
+        self.__index = None
+        self.__indexLock = threading.Lock()
+        self.__sketches = {}
+        
+        self.__data_table = TableHandler.freezeTable(dataTable)
+        
+        if not isinstance(self.__data_table.index, pd.RangeIndex) or self.__data_table.index.start != 0:
+            self.__data_table.index = pd.RangeIndex(self.__data_table.shape[0])
 
         try:
             self.__names = self.__data_table[headerNamesStudents].to_list()
@@ -133,9 +514,282 @@ class TableHandler:
             for i in range(1, self.__data_table.shape[0] + 1):
                 self.__names.append(str(i))
 
+        # Числовые колонки оценок и тестов приводятся один раз, построители
+        # таблиц берут их без копий
+        self.__gradesTable, self.__gradesBlock = TableHandler.normalizeTable(self.__data_table, self.__headersGradesStudents)
+        self.__testsTable, self.__testsBlock = TableHandler.normalizeTable(self.__data_table, self.__headersTestScore)
+        
+        self.__sketches[TableHandler.SKETCH_ERROR] = self.__buildSketches(TableHandler.SKETCH_ERROR)
+
+    @staticmethod
+    def fromDataFrame(dataTable: pd.DataFrame,
+                      headersGrades: List[str], 
+                      headersTestScore: List[str], 
+                      headerNamesStudents: str = "",
+                      policy: GradingPolicy = None,
+                      copy: bool = True) -> "TableHandler":
+        """
+        Обработчик по таблице в памяти, без записи и чтения .xlsx. Заголовки
+        проверяются как в check_table, но по колонкам dataTable. Таблица 
+        копируется один раз, дальше обработчик работает без копий, и 
+        изменения переданной таблицы его не трогают.
+
+        Args:
+            - dataTable: pd.DataFrame - таблица анкеты, заголовки - колонки.
+            - headersGrades, headersTestScore, headerNamesStudents, policy - 
+            как в конструкторе.
+            - copy: bool = True - скопировать таблицу. copy=False - без 
+            копии: обработчик делает массивы колонок dataTable только для 
+            чтения и читает их, поэтому менять их после передачи нельзя.
+
+        Raise:
+            - Как в check_headers.
+        Return:
+            - TableHandler.
+        """
+        TableHandler.check_headers(list(dataTable.columns), headersGrades + headersTestScore, 
+                                   headersGrades, headersTestScore)
+        
+        if copy:
+            dataTable = dataTable.copy(deep=True)
+        
+        handler = TableHandler.__new__(TableHandler)
+        handler.__setup(dataTable, headersGrades, headersTestScore, headerNamesStudents, policy)
+        
+        return handler
+
+    @staticmethod
+    def fromArrays(grades: np.ndarray,
+                   testScore: np.ndarray,
+                   namesStudents: List[str] = None,
+                   headersGrades: List[str] = None,
+                   headersTestScore: List[str] = None,
+                   headerNamesStudents: str = "Students",
+                   policy: GradingPolicy = None,
+                   copy: bool = True) -> "TableHandler":
+        """
+        Обработчик по матрицам студенты x вопросы оценок и оценок тестов. 
+        Матрицы копируются один раз в порядке Fortran, колонки таблицы - 
+        срезы копий без шага.
+
+        Args:
+            - grades: np.ndarray - оценки студентов.
+            - testScore: np.ndarray - оценки тестов того же размера.
+            - namesStudents: List[str] = None - имена, по умолчанию "1", "2"...
+            - headersGrades: List[str] = None - заголовки оценок, по 
+            умолчанию "Grade 1", "Grade 2" ...
+            - headersTestScore: List[str] = None - заголовки оценок тестов, по
+            умолчанию "Test 1", "Test 2" ...
+            - headerNamesStudents: str = "Students" - заголовок имён.
+            - policy: GradingPolicy = None - как в конструкторе.
+            - copy: bool = True - скопировать матрицы и имена. copy=False - 
+            колонки становятся срезами переданных матриц (для срезов без 
+            шага матрицы нужны в порядке Fortran, np.asfortranarray), матрицы
+            после передачи менять нельзя.
+
+        Raise:
+            - Матрицы не двумерные или разного размера.
+            - Как в check_headers.
+        Return:
+            - TableHandler.
+        """
+        grades = np.array(grades, order="F", copy=True) if copy else np.asarray(grades)
+        testScore = np.array(testScore, order="F", copy=True) if copy else np.asarray(testScore)
+        
+        if grades.ndim != 2 or grades.shape != testScore.shape:
+            raise BadTable(f"Матрицы оценок и оценок тестов должны быть двумерными одного размера: {grades.shape} и {testScore.shape}")
+        
+        countStudents, countQuestions = grades.shape
+        
+        if headersGrades is None:
+            headersGrades = [f"Grade {i}" for i in range(1, countQuestions + 1)]
+        if headersTestScore is None:
+            headersTestScore = [f"Test {i}" for i in range(1, countQuestions + 1)]
+        
+        if len(headersGrades) != countQuestions or len(headersTestScore) != countQuestions:
+            raise BadTable("Количество заголовков не совпадает с количеством колонок матриц")
+        
+        columns = {}
+        
+        if namesStudents is not None:
+            if len(namesStudents) != countStudents:
+                raise BadTable("Количество имён не совпадает с количеством строк матриц")
+            columns[headerNamesStudents] = np.array(namesStudents, dtype=object, copy=copy)
+        
+        for i in range(countQuestions):
+            columns[headersGrades[i]] = grades[:, i]
+            columns[headersTestScore[i]] = testScore[:, i]
+        
+        return TableHandler.fromDataFrame(pd.DataFrame(columns, copy=False), headersGrades, headersTestScore, 
+                                          headerNamesStudents, policy, copy=False)
+
+    @staticmethod
+    def fromRows(rows: Iterable,
+                 headers: List[str],
+                 headersGrades: List[str], 
+                 headersTestScore: List[str], 
+                 headerNamesStudents: str = "",
+                 policy: GradingPolicy = None) -> "TableHandler":
+        """
+        Обработчик по строкам анкеты (списки значений в порядке headers или
+        словари заголовок -> значение), например из курсора базы данных. 
+        Строки проходятся один раз, типы колонок выводятся как у 
+        pd.read_excel: целые - int64, числа - float64, иначе object.
+
+        Args:
+            - rows: Iterable - строки анкеты.
+            - headers: List[str] - заголовки, первая строка таблицы.
+            - headersGrades, headersTestScore, headerNamesStudents, policy - 
+            как в конструкторе.
+
+        Raise:
+            - Как в check_headers.
+        Return:
+            - TableHandler.
+        """
+        TableHandler.check_headers(list(headers), headersGrades + headersTestScore, 
+                                   headersGrades, headersTestScore)
+        
+        dataTable = pd.DataFrame.from_records(rows, columns=headers).infer_objects()
+        
+        handler = TableHandler.__new__(TableHandler)
+        handler.__setup(dataTable, headersGrades, headersTestScore, headerNamesStudents, policy)
+        
+        return handler
+
+
+    def validateValues(self, strict: bool = False) -> pd.DataFrame:
+        """
+        Проверяет значения оценок и оценок тестов обработчика (см. 
+        check_values): текст, отрицательные значения и значения вне 
+        диапазона "(от A до B)" из заголовка. Без проверки такие ячейки 
+        молча становятся нулями и искажают Average, LSI и LTI.
+
+        Args:
+            - strict: bool = False - бросить BadTable, если есть ошибки.
+
+        Return:
+            - pd.DataFrame с колонками row, student, column, value, reason.
+        """
+        return TableHandler.check_values(self.__data_table, 
+                                         self.__headersGradesStudents + self.__headersTestScore, 
+                                         self.__names, strict)
+
+    def query(self) -> StudentsIndex:
+        """
+        Индекс для запросов по студентам (см. StudentsIndex): top, range, 
+        bucket и percentile по колонкам Sum, Average X, Round X, LSI и 
+        "Tests Sum", "Tests Average X", "Tests Round X" по оценкам тестов.
+        Таблицы считаются и сортируются один раз при первом вызове, дальше 
+        возвращается тот же индекс (таблица обработчика только для чтения).
+
+        Return:
+            - StudentsIndex.
+        """
+        if self.__index is None:
+            with self.__indexLock:
+                if self.__index is None:
+                    namesColumns = ["Sum", self.__policy.nameAverage, self.__policy.nameRound]
+
+                    grades = self.__gradesWithSumAverageRound()
+                    tests = self.__testsWithSumAverageRound()
+                    lsi = self.createTableLtiLsti()
+
+                    columns = {x: grades[x].to_numpy() for x in namesColumns}
+                    columns["LSI"] = lsi["LSI"].to_numpy()[:len(self.__names)]
+
+                    for x in namesColumns:
+                        columns["Tests " + x] = tests[x].to_numpy()
+
+                    self.__index = StudentsIndex(self.__names, columns)
+
+        return self.__index
+    
+    @staticmethod
+    def sketchOf(values: np.ndarray, error: float = 0.01):
+        """
+        Точная IntegerHistogram для целых значений небольшого диапазона, 
+        иначе QuantileSketch с ошибкой ранга error.
+        """
+        if IntegerHistogram.fits(values):
+            return IntegerHistogram().update(values)
+        return QuantileSketch(error).update(values)
+    
+    def __buildSketches(self, error: float) -> dict:
+        """
+        Распределения для sketches() по приведённым при загрузке колонкам.
+        """
+        namesColumns = ["Sum", self.__policy.nameAverage, self.__policy.nameRound]
+        
+        grades = self.__gradesWithSumAverageRound()
+        tests = self.__testsWithSumAverageRound()
+        lsi = self.createTableLtiLsti()
+        
+        sketches = {}
+        
+        for headers, block in ((self.__headersGradesStudents, self.__gradesBlock), (self.__headersTestScore, self.__testsBlock)):
+            for i, header in enumerate(headers):
+                sketches[header] = TableHandler.sketchOf(block[:, i], error)
+        
+        sketches["Grades"] = TableHandler.sketchOf(self.__gradesBlock, error)
+        sketches["Tests"] = TableHandler.sketchOf(self.__testsBlock, error)
+        
+        for x in namesColumns:
+            sketches[x] = TableHandler.sketchOf(grades[x].to_numpy(dtype=float), error)
+        
+        sketches["LSI"] = TableHandler.sketchOf(lsi["LSI"].to_numpy()[:len(self.__names)], error)
+        
+        for x in namesColumns:
+            sketches["Tests " + x] = TableHandler.sketchOf(tests[x].to_numpy(dtype=float), error)
+        
+        return sketches
+    
+    def sketches(self, error: float = SKETCH_ERROR) -> dict:
+        """
+        Распределения для медиан и процентилей без сортировки всех значений:
+        по каждому вопросу оценок и оценок тестов, "Grades" и "Tests" - все 
+        оценки вместе, Sum, Average X, Round X, LSI и "Tests Sum", 
+        "Tests Average X", "Tests Round X". Целые оценки - точные 
+        IntegerHistogram, остальное - QuantileSketch (см. sketchOf). Нули 
+        (нет ответа) учитываются, как в строках Max, Sum, Average.
+        
+        Для SKETCH_ERROR строятся при загрузке таблицы, для другой ошибки - 
+        при первом вызове, дальше возвращаются те же объекты. Скетчи разных 
+        групп и частей объединяются mergeSketches без исходных таблиц.
+
+        Args:
+            - error: float = SKETCH_ERROR - ошибка ранга QuantileSketch.
+
+        Return:
+            - Словарь колонка -> IntegerHistogram или QuantileSketch.
+        """
+        if error not in self.__sketches:
+            with self.__indexLock:
+                if error not in self.__sketches:
+                    self.__sketches[error] = self.__buildSketches(error)
+        
+        return self.__sketches[error]
+    
+    @staticmethod
+    def mergeSketches(sketches: List[dict]) -> dict:
+        """
+        Объединяет sketches() разных обработчиков (групп, частей таблицы, 
+        добавленных строк) по именам колонок за O(размер скетчей). Колонка, 
+        которая есть не у всех, объединяется по тем, у кого она есть.
 
+        Return:
+            - Словарь колонка -> IntegerHistogram или QuantileSketch.
+        """
+        result = {}
+        
+        for part in sketches:
+            for name, sketch in part.items():
+                result[name] = sketch if name not in result else result[name].merge(sketch)
+        
+        return result
+    
     def createTableGradesStudents(self, 
-                                  nameHeadersColumns_Sum_Average_Round:List[str] = ["Sum", f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"]
+                                  nameHeadersColumns_Sum_Average_Round:List[str] = None
                                   ) -> pd.DataFrame:
         """
         Создаёт таблицу оценок студентов pd.DataFrame, добавляя к ней колонки Sum,
@@ -154,15 +808,65 @@ class TableHandler:
         Return:
             - Таблица pd.DataFrame с новыми колонками.
         """
-        return TableHandler.createTableWithNewColumns_SumAverageRound(self.__data_table, 
+        return TableHandler.createTableWithNewColumns_SumAverageRound(self.__gradesTable, 
                                                                       self.__headersGradesStudents, 
-                                                                      nameHeadersColumns_Sum_Average_Round)
+                                                                      nameHeadersColumns_Sum_Average_Round,
+                                                                      self.__policy,
+                                                                      self.__gradesBlock)
+
+    
+    def __gradesWithSumAverageRound(self, nameHeadersColumns_Sum_Average_Round: List[str] = None) -> pd.DataFrame:
+        """
+        createTableGradesStudents для построения других таблиц внутри 
+        обработчика: колонки вопросов - массивы обработчика только для 
+        чтения, без копии.
+        """
+        return TableHandler.__withSumAverageRound(self.__gradesTable, self.__headersGradesStudents, 
+                                                  nameHeadersColumns_Sum_Average_Round, self.__policy, self.__gradesBlock)
+    
+    def __testsWithSumAverageRound(self, nameHeadersColumns_Sum_Average_Round: List[str] = None) -> pd.DataFrame:
+        """
+        То же, что __gradesWithSumAverageRound, для оценок тестов.
+        """
+        return TableHandler.__withSumAverageRound(self.__testsTable, self.__headersTestScore, 
+                                                  nameHeadersColumns_Sum_Average_Round, self.__policy, self.__testsBlock)
+    
+    def createTableGradesStudentsPolicies(self, 
+                                          policies: List[GradingPolicy],
+                                          nameHeaderSum: str = "Sum") -> pd.DataFrame:
+        """
+        Создаёт таблицу оценок студентов с колонкой Sum и колонками Average X, 
+        Round X для каждой политики. Все политики считаются за один проход 
+        (см. GradingPolicy.evaluate), состояние класса не меняется.
+
+        Args:
+            - policies: List[GradingPolicy] - политики, например шкалы 5, 10, 100.
+            - nameHeaderSum: str = "Sum" - имя колонки суммы.
+
+        Return:
+            - Таблица pd.DataFrame с новыми колонками.
+        """
+        return TableHandler.createTableWithPolicies(self.__gradesTable, self.__headersGradesStudents, policies, nameHeaderSum, self.__gradesBlock)
+    
+    def createTableGradesTestPolicies(self, 
+                                      policies: List[GradingPolicy],
+                                      nameHeaderSum: str = "Sum") -> pd.DataFrame:
+        """
+        То же, что createTableGradesStudentsPolicies, для оценок тестов.
 
+        Args:
+            - policies: List[GradingPolicy] - политики, например шкалы 5, 10, 100.
+            - nameHeaderSum: str = "Sum" - имя колонки суммы.
+
+        Return:
+            - Таблица pd.DataFrame с новыми колонками.
+        """
+        return TableHandler.createTableWithPolicies(self.__testsTable, self.__headersTestScore, policies, nameHeaderSum, self.__testsBlock)
     
     def createTableGradesStudentsToView(self, 
                                         nameColumnStuneds: str = "Students",
-                                        nameHeadersColumn_Sum_Average_Round:List[str] = ["Sum", f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"],
-                                        nameHeadersString_Max_Sum_Average:List[str] = ['Max', 'Sum', 'Average', f"Average {GRADE_CONVERTED}"]) -> pd.DataFrame:
+                                        nameHeadersColumn_Sum_Average_Round:List[str] = None,
+                                        nameHeadersString_Max_Sum_Average:List[str] = None) -> pd.DataFrame:
         """
         Создаёт таблицу оценок студентов pd.DataFrame, добавляя к ней колонки Sum,
         Average, Round.
@@ -189,10 +893,10 @@ class TableHandler:
         Return:
             - Таблица pd.DataFrame с новыми колонками и строчками.
         """
-        return TableHandler.createTableToViewWith__Sum_Avg_Round(self.__data_table, self.__headersGradesStudents, self.__names, nameColumnStuneds, nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average)
+        return TableHandler.createTableToViewWith__Sum_Avg_Round(self.__gradesTable, self.__headersGradesStudents, self.__names, nameColumnStuneds, nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average, self.__policy, self.__gradesBlock)
     
     def createTableGradesTest(self, 
-                              nameHeadersColumns_Sum_Average_Round:List[str] = ["Sum", f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"]
+                              nameHeadersColumns_Sum_Average_Round:List[str] = None
                               ) -> pd.DataFrame:
         """
         Создаёт таблицу оценок тестов pd.DataFrame, добавляя к ней колонки Sum,
@@ -209,15 +913,17 @@ class TableHandler:
         Return:
             - Таблица pd.DataFrame с новыми колонками.
         """
-        return TableHandler.createTableWithNewColumns_SumAverageRound(self.__data_table, 
+        return TableHandler.createTableWithNewColumns_SumAverageRound(self.__testsTable, 
                                                                       self.__headersTestScore, 
-                                                                      nameHeadersColumns_Sum_Average_Round)
+                                                                      nameHeadersColumns_Sum_Average_Round,
+                                                                      self.__policy,
+                                                                      self.__testsBlock)
 
     
     def createTableGradesTestToView(self, 
                                     nameColumnStuneds: str = "Students",
-                                    nameHeadersColumn_Sum_Average_Round:List[str] = ["Sum", f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"],  
-                                    nameHeadersString_Max_Sum_Average:List[str] = ['Max', 'Sum', 'Average', f"Average {GRADE_CONVERTED}"]
+                                    nameHeadersColumn_Sum_Average_Round:List[str] = None,  
+                                    nameHeadersString_Max_Sum_Average:List[str] = None
                                     ) -> pd.DataFrame:
         """
         Создаёт таблицу оценок студентов pd.DataFrame, добавляя к ней колонки 
@@ -246,7 +952,7 @@ class TableHandler:
         Return:
             - Таблица pd.DataFrame с новыми колонками и строчками.
         """
-        return TableHandler.createTableToViewWith__Sum_Avg_Round(self.__data_table, self.__headersTestScore, self.__names, nameColumnStuneds, nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average)
+        return TableHandler.createTableToViewWith__Sum_Avg_Round(self.__testsTable, self.__headersTestScore, self.__names, nameColumnStuneds, nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average, self.__policy, self.__testsBlock)
     
     
     def export_PngPieBRSO(self, 
@@ -278,25 +984,14 @@ class TableHandler:
         if os.path.isfile(fileToExport):
                 raise FileExistsError(f"Файл {fileToExport} уже существует")
             
-        roundGrades = self.createTableGradesStudents().iloc[:, -1].to_list()
+        roundGrades = self.__gradesWithSumAverageRound().iloc[:, -1].to_list()
 
-        gradesSet = set(roundGrades)
+        fig = Figure()
+        ax = fig.subplots()
         
-        labels = {}
+        TableHandler.drawPie(ax, roundGrades, nameHeader, colors)
         
-        for grade in gradesSet:
-            labels[grade] = roundGrades.count(grade)
-
-        fig, ax = plt.subplots()
-        
-        ax.pie(labels.values(), labels=labels.keys(), colors=colors, autopct='%1.1f%%', startangle=140)
-
-        ax.set_title(nameHeader)
-
-        ax.legend(loc='upper right')
-
-        ax.axis('equal')
-        fig.savefig(fileToExport)
+        TableHandler.saveFigure(fig, fileToExport)
 
         return None
     
@@ -327,26 +1022,14 @@ class TableHandler:
         if os.path.isfile(fileToExport):
             raise FileExistsError(f"Файл {fileToExport} уже существует")
         
-        roundGrades = self.createTableGradesTest().iloc[:, -1].to_list()
+        roundGrades = self.__testsWithSumAverageRound().iloc[:, -1].to_list()
 
-        gradesSet = set(roundGrades)
+        fig = Figure()
+        ax = fig.subplots()
         
-        labels = {}
+        TableHandler.drawPie(ax, roundGrades, nameHeader, colors)
         
-        for grade in gradesSet:
-            labels[grade] = roundGrades.count(grade)
-
-        fig, ax = plt.subplots()
-        
-        ax.pie(labels.values(), labels=labels.keys(), colors=colors, autopct='%1.1f%%', startangle=140)
-
-        ax.set_title(nameHeader)
-
-        ax.legend(loc='upper right')
-
-        ax.axis('equal')
-        
-        fig.savefig(fileToExport)
+        TableHandler.saveFigure(fig, fileToExport)
         
         return None
 
@@ -370,46 +1053,46 @@ class TableHandler:
         if(len(lessimetria) != 2):
             raise BadNameHeaders("Количество заголовков не верно, нужно 2, у тебя" + str(len(lessimetria)))
 
-        table_1 = self.__data_table[self.__headersGradesStudents]
-        table_2 = self.__data_table[self.__headersTestScore]
+        countQuestions = len(self.__headersGradesStudents)
 
-        table_1.fillna(0, inplace=True)
-        table_1 = table_1.apply(lambda x: pd.to_numeric(x, errors='coerce')).fillna(0)
-        table_1 = table_1.replace([np.inf, -np.inf], 0)
+        if self.__testsBlock.shape[1] < countQuestions:
+            raise BadNameHeaders("Вопросов тестов меньше, чем вопросов студентов")
 
-        table_2.fillna(0, inplace=True)
-        table_2 = table_2.apply(lambda x: pd.to_numeric(x, errors='coerce')).fillna(0)
-        table_2 = table_2.replace([np.inf, -np.inf], 0)
-
-
-
-        headersTableLtiLsi = [str(x) for x in range(1, len(self.__headersGradesStudents) + 1)]
-
-        questionsTable1Dict = dict(zip(headersTableLtiLsi, self.__headersGradesStudents))
-
-        questionsTable2Dict = dict(zip( headersTableLtiLsi, self.__headersTestScore))
+        countStudents = self.__gradesBlock.shape[0]
+        
+        # Отношения, LSI и строка LTI пишутся сразу в массив таблицы
+        values = np.empty((countStudents + 1, countQuestions + 1))
+        ratios = values[:countStudents, :countQuestions]
+        lsi = values[:countStudents, countQuestions]
 
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(self.__testsBlock[:, :countQuestions], self.__gradesBlock, out=ratios)
 
-        table_3 = pd.DataFrame()
-        
-        for name in headersTableLtiLsi:
-            table_3[name] = table_2[questionsTable2Dict[name]] / table_1[questionsTable1Dict[name]]
+        ratios[~np.isfinite(ratios)] = 0
+        lsi[:] = 0
 
+        # Среднее ненулевых по строкам: строки с k ненулевыми отношениями 
+        # сжимаются в непрерывный блок k колонок и суммируются одним вызовом,
+        # порядок сложения тот же, что у calculateAverage. Строки берутся 
+        # частями по LSI_CHUNK_ROWS, чтобы сжатые копии были небольшими
+        for start in range(0, countStudents, TableHandler.LSI_CHUNK_ROWS):
+            chunk = ratios[start:start + TableHandler.LSI_CHUNK_ROWS]
+            nonzero = chunk != 0
+            counts = nonzero.sum(axis=1)
 
+            for k in np.unique(counts[counts != 0]):
+                rows = counts == k
+                packed = chunk[rows][nonzero[rows]].reshape(-1, k)
+                lsi[start:start + TableHandler.LSI_CHUNK_ROWS][rows] = packed.sum(axis=1) / k
 
-        table_3.fillna(0, inplace=True)
-        table_3 = table_3.apply(lambda x: pd.to_numeric(x, errors='coerce')).fillna(0)
-        table_3 = table_3.replace([np.inf, -np.inf], 0)
+        for i in range(countQuestions + 1):
+            values[countStudents, i] = TableHandler.calculateAverage(values[:countStudents, i])
 
+        headersTableLtiLsi = [str(x) for x in range(1, countQuestions + 1)] + [lessimetria[0]]
 
-        table_3[lessimetria[0]] = table_3.apply(TableHandler.calculateAverage, axis=1)
-        table_3 = table_3.transpose()
-        table_3[lessimetria[1]] = table_3.apply(TableHandler.calculateAverage, axis=1)
-        table_3 = table_3.transpose()
+        table_3 = pd.DataFrame(values, columns=headersTableLtiLsi)
+        table_3.insert(0, nameColumnStudent, pd.Series(self.__names + [lessimetria[1]], index=table_3.index, dtype=object))
 
-        table_3[nameColumnStudent] =  self.__names + [lessimetria[1]]
-        table_3 = table_3[[table_3.columns[-1]] + list(table_3.columns[:-1])].reset_index(drop=True)        
-        
         return table_3
 
     def export_PngPopularityTests(self, 
@@ -448,19 +1131,12 @@ class TableHandler:
         x = tmpTable.iloc[:, -1]
         x = x.to_list()
         
-        y = [i for i in range(1, len(x) + 1)]
+        fig = Figure()
+        ax = fig.subplots()
         
-        fig, ax = plt.subplots()
-        
-        ax.bar(y, x, width=0.5, color=colorBars)
-
-        ax.set_xlabel(namesHeader[1])
-        ax.set_ylabel(namesHeader[2])
-        ax.set_title(namesHeader[0])
-
-        ax.grid(True, axis='y')
+        TableHandler.drawPopularity(ax, x, namesHeader, colorBars)
 
-        fig.savefig(fileToExport)
+        TableHandler.saveFigure(fig, fileToExport)
         
         return None
     
@@ -492,48 +1168,22 @@ class TableHandler:
         if(len(namesHeaders) != 3):
             raise BadNameHeaders("Количество заголовков не верно, нужно 3, у тебя" + str(len(namesHeaders)))
         
-        data_x = self.createTableGradesStudents().iloc[:, -2].to_list()
-        data_y = self.createTableGradesTest().iloc[:, -2].to_list()
-
+        data_x = self.__gradesWithSumAverageRound().iloc[:, -2].to_list()
+        data_y = self.__testsWithSumAverageRound().iloc[:, -2].to_list()
 
-        x = np.array(data_x)
-        y = np.array(data_y)
-
-        A = np.vstack([x, np.ones(len(x))]).T
-        m, c = np.linalg.lstsq(A, y, rcond=None)[0]
-
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         
-        ax.scatter(x, y, color=colorPoint, label='Точки', marker='D')
-        ax.plot(x, m*x + c, color=colorLine, label='Прямая')
+        TableHandler.drawRegression(ax, data_x, data_y, namesHeaders[0], namesHeaders[2], namesHeaders[1], colorPoint, colorLine)
 
-        ax.set_title(namesHeaders[0])
-        ax.set_xlabel(namesHeaders[2])
-        ax.set_ylabel(namesHeaders[1])
-        ax.legend()
-        ax.grid(True, axis='y')
-
-        fig.savefig(fileToExportEducationMotivation)
-
-        fig, ax = plt.subplots()
-
-        x = np.array(data_y)
-        y = np.array(data_x)
-
-        A = np.vstack([x, np.ones(len(x))]).T
-        m, c = np.linalg.lstsq(A, y, rcond=None)[0]
+        TableHandler.saveFigure(fig, fileToExportEducationMotivation)
 
-        ax.scatter(x, y, color=colorPoint, label='Точки', marker='D')
-        ax.plot(x, m*x + c, color=colorLine, label='Прямая')
+        fig = Figure()
+        ax = fig.subplots()
 
-        ax.set_title(namesHeaders[0])
-        ax.set_xlabel(namesHeaders[1])
-        ax.set_ylabel(namesHeaders[2])
-        
-        ax.legend()
-        ax.grid(True, axis='y')
+        TableHandler.drawRegression(ax, data_y, data_x, namesHeaders[0], namesHeaders[1], namesHeaders[2], colorPoint, colorLine)
 
-        fig.savefig(fileToExportMotivationEducation)
+        TableHandler.saveFigure(fig, fileToExportMotivationEducation)
         
         return None 
     
@@ -583,8 +1233,77 @@ class TableHandler:
         dfBenefits = self.__data_table[headerBenefitsQuestion]
 
 
-        fig, ax = plt.subplots()
+        fig = Figure(figsize=(10, 5))
+        ax = fig.subplots()
+        
+        TableHandler.drawBenefits(ax, dfBenefits, titleAndLabels, typesBenefitsForPng, typesBenefitsInTable)
+
+        TableHandler.saveFigure(fig, fileToExport)
+        
+        return None
+        
+
+    @staticmethod
+    def drawPie(ax, roundGrades: list, nameHeader: str, colors: List[str]) -> None:
+        """
+        Рисует пирожковую диаграмму округлённых оценок (BRSO, OTS) на ax.
+        """
+        gradesSet = set(roundGrades)
+        
+        labels = {}
+        
+        for grade in gradesSet:
+            labels[grade] = roundGrades.count(grade)
+
+        ax.pie(labels.values(), labels=labels.keys(), colors=colors, autopct='%1.1f%%', startangle=140)
+
+        ax.set_title(nameHeader)
+
+        ax.legend(loc='upper right')
+
+        ax.axis('equal')
+    
+    @staticmethod
+    def drawPopularity(ax, averages: list, namesHeader: List[str], colorBars: str) -> None:
+        """
+        Рисует столбцы популярности заданий на ax.
+        """
+        y = [i for i in range(1, len(averages) + 1)]
+        
+        ax.bar(y, averages, width=0.5, color=colorBars)
+
+        ax.set_xlabel(namesHeader[1])
+        ax.set_ylabel(namesHeader[2])
+        ax.set_title(namesHeader[0])
+
+        ax.grid(True, axis='y')
+    
+    @staticmethod
+    def drawRegression(ax, data_x: list, data_y: list, title: str, xlabel: str, ylabel: str, colorPoint: str, colorLine: str) -> None:
+        """
+        Рисует точки и прямую наименьших квадратов (графики мотивации) на ax.
+        """
+        x = np.array(data_x)
+        y = np.array(data_y)
+
+        A = np.vstack([x, np.ones(len(x))]).T
+        m, c = np.linalg.lstsq(A, y, rcond=None)[0]
+
+        ax.scatter(x, y, color=colorPoint, label='Точки', marker='D')
+        ax.plot(x, m*x + c, color=colorLine, label='Прямая')
+
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
         
+        ax.legend()
+        ax.grid(True, axis='y')
+    
+    @staticmethod
+    def drawBenefits(ax, dfBenefits, titleAndLabels: List[str], typesBenefitsForPng: List[str], typesBenefitsInTable: List[str]) -> None:
+        """
+        Считает ответы по пособиям и рисует столбцы на ax.
+        """
         benefitsDict = dict(zip(typesBenefitsInTable, typesBenefitsForPng))
         benefitsDict2 = dict()
         
@@ -602,7 +1321,6 @@ class TableHandler:
         x = list(benefitsDict2.keys())
         y = list(benefitsDict2.values())
 
-        fig.set_size_inches(10, 5)
         ax.bar(x, y, width=0.5)
         
         ax.set_yticks(range( max(y) + TableHandler.CONST_STEP)[::TableHandler.CONST_STEP])
@@ -612,19 +1330,16 @@ class TableHandler:
         ax.set_title(titleAndLabels[0])
 
         ax.grid(True, axis='y')
-
-        fig.savefig(fileToExport)
-        
-        return None
-        
-
+    
     @staticmethod
     def createTableToViewWith__Sum_Avg_Round(tableValues: pd.DataFrame, 
                                              headersForCalculation: List[str],
                                              namesStudents: List[str],
                                              nameColumnStuneds: str = "Students",
-                                             nameHeadersColumn_Sum_Average_Round:List[str] = ["Sum",  f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"],  
-                                             nameHeadersString_Max_Sum_Average:List[str] = ['Max', 'Sum', 'Average', f"Average {GRADE_CONVERTED}"]) -> pd.DataFrame:
+                                             nameHeadersColumn_Sum_Average_Round:List[str] = None,  
+                                             nameHeadersString_Max_Sum_Average:List[str] = None,
+                                             policy: GradingPolicy = None,
+                                             block: np.ndarray = None) -> pd.DataFrame:
         """
         Создаёт таблицу pd.DataFrame, добавляя к ней колонки Sum, Average, Round.
         - Sum - сумма всех чисел строки
@@ -650,14 +1365,59 @@ class TableHandler:
             - nameHeadersString_Max_Sum_Average:List[str] = ['Max', 'Sum', 
             'Average', 'AverageInFive']) - названия для 'Max', 'Sum', 'Average', 
             'AverageInFive'.
+            - policy: GradingPolicy = None - политика оценивания, по умолчанию
+            GRADE_CONVERTED и ROUND_FACTOR.
+            - block: np.ndarray = None - см. 
+            createTableWithNewColumns_SumAverageRound.
         Return:
             - Таблица pd.DataFrame с новыми колонками и строчками.
         """
+        policy = TableHandler.defaultPolicy() if policy is None else policy
+        
+        if nameHeadersColumn_Sum_Average_Round is None:
+            nameHeadersColumn_Sum_Average_Round = ["Sum", policy.nameAverage, policy.nameRound]
+        
+        if nameHeadersString_Max_Sum_Average is None:
+            nameHeadersString_Max_Sum_Average = ['Max', 'Sum', 'Average', policy.nameAverage]
+        
         if len(nameHeadersString_Max_Sum_Average) != 4:
             raise BadNameHeaders("Количество имён заголовков для суммы, среднего и округления должно быть 4, а у тебя" + len(nameHeadersString_Max_Sum_Average))
         
-        gradeStudents = TableHandler.createTableWithNewColumns_SumAverageRound(tableValues, headersForCalculation, nameHeadersColumn_Sum_Average_Round)
+        if block is None:
+            tableValues, block = TableHandler.normalizeTable(tableValues, headersForCalculation)
+        
+        # Строки Max, Sum, Average собираются pd.concat в новые колонки, 
+        # поэтому промежуточная таблица без копии
+        gradeStudents = TableHandler.__withSumAverageRound(tableValues, headersForCalculation, nameHeadersColumn_Sum_Average_Round, policy, block)
+
+        return TableHandler.createTableToViewFromTable(gradeStudents, headersForCalculation, namesStudents, nameColumnStuneds, 
+                                                       nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average, policy)
+    
+    @staticmethod
+    def createTableToViewFromTable(gradeStudents: pd.DataFrame, 
+                                   headersForCalculation: List[str],
+                                   namesStudents: List[str],
+                                   nameColumnStuneds: str,
+                                   nameHeadersColumn_Sum_Average_Round: List[str],
+                                   nameHeadersString_Max_Sum_Average: List[str],
+                                   policy: GradingPolicy) -> pd.DataFrame:
+        """
+        Добавляет строки 'Max' 'Sum' 'Average' 'Average X' и колонку студентов 
+        к уже посчитанной таблице из createTableWithNewColumns_SumAverageRound,
+        не пересчитывая её. Имена передаются явно.
 
+        Args:
+            - gradeStudents: pd.DataFrame - таблица с колонками Sum, Average, Round.
+            - headersForCalculation: List[str] - список вопросов.
+            - namesStudents: List[str] - Колонка студенты.
+            - nameColumnStuneds: str - Имя колонки 'Студенты'.
+            - nameHeadersColumn_Sum_Average_Round: List[str] - имена Sum, Average, Round.
+            - nameHeadersString_Max_Sum_Average: List[str] - имена строк.
+            - policy: GradingPolicy - политика для строки 'Average X'.
+
+        Return:
+            - Таблица pd.DataFrame с новыми колонками и строчками.
+        """
         gradeStudentsResult_Headers = headersForCalculation + nameHeadersColumn_Sum_Average_Round
 
         gradeStudents_MaxSumAverage = pd.DataFrame(columns=nameHeadersString_Max_Sum_Average)
@@ -668,23 +1428,28 @@ class TableHandler:
             max_val = max(col_values)
             sum_val = sum(col_values)
             avg_val = sum_val / len(col_values)
-            avg_five = TableHandler.GRADE_CONVERTED * avg_val / max_val
+            avg_five = policy.gradeConverted * avg_val / max_val
             gradeStudents_MaxSumAverage.loc[column] = [max_val, sum_val, avg_val, avg_five]
 
         gradeStudents_MaxSumAverage = gradeStudents_MaxSumAverage.transpose()
 
         gradeStudentsResult = pd.concat([gradeStudents, gradeStudents_MaxSumAverage])
         
-        gradeStudentsResult[nameColumnStuneds] = namesStudents + nameHeadersString_Max_Sum_Average
-        
-        gradeStudentsResult = gradeStudentsResult[[gradeStudentsResult.columns[-1]] + list(gradeStudentsResult.columns[:-1])].reset_index(drop=True)
+        # Индекс заменяется и колонка студентов вставляется первой на месте:
+        # таблица копируется только в concat. Тип object задан явно, иначе
+        # pandas перебирает имена, выводя их тип
+        gradeStudentsResult.index = pd.RangeIndex(gradeStudentsResult.shape[0])
+        gradeStudentsResult.insert(0, nameColumnStuneds, pd.Series(namesStudents + nameHeadersString_Max_Sum_Average, 
+                                                                   index=gradeStudentsResult.index, dtype=object))
         
         return gradeStudentsResult
     
     @staticmethod
     def createTableWithNewColumns_SumAverageRound(tableValues: pd.DataFrame, 
                                                   headersForCalculation: List[str],
-                                                  nameHeadersColumns_Sum_Average_Round:List[str] = ["Sum",  f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"]) -> pd.DataFrame:
+                                                  nameHeadersColumns_Sum_Average_Round:List[str] = None,
+                                                  policy: GradingPolicy = None,
+                                                  block: np.ndarray = None) -> pd.DataFrame:
         """
         Создаёт таблицу pd.DataFrame, добавляя к ней колонки Sum, Average, Round.
         - Sum - сумма всех чисел строки
@@ -699,43 +1464,88 @@ class TableHandler:
             - nameHeadersColumns_Sum_Average_Round:List[str] = ["Sum", 
             "Average Grade", "Round Grade"] - названия для Sum, Average Grade,
             Round Grade.
+            - policy: GradingPolicy = None - политика оценивания, по умолчанию
+            GRADE_CONVERTED и ROUND_FACTOR.
+            - block: np.ndarray = None - блок из normalizeTable. Если указан,
+            tableValues - уже приведённая таблица из normalizeTable, и 
+            приведение не повторяется.
 
         Return:
-            - Таблица pd.DataFrame с новыми колонками.
+            - Таблица pd.DataFrame с новыми колонками. Колонки вопросов -
+            копия (ownedTable), их можно менять.
         """
+        if block is None:
+            tableValues, block = TableHandler.normalizeTable(tableValues, headersForCalculation)
+
+        return TableHandler.__withSumAverageRound(TableHandler.ownedTable(tableValues, block), headersForCalculation, 
+                                                  nameHeadersColumns_Sum_Average_Round, policy, block)
+    
+    @staticmethod
+    def __withSumAverageRound(tableValues: pd.DataFrame, 
+                              headersForCalculation: List[str],
+                              nameHeadersColumns_Sum_Average_Round: List[str],
+                              policy: GradingPolicy,
+                              block: np.ndarray) -> pd.DataFrame:
+        """
+        Колонки Sum, Average, Round к таблице из normalizeTable (или 
+        ownedTable) и её блоку. Колонки вопросов не копируются.
+        """
+        policy = TableHandler.defaultPolicy() if policy is None else policy
+        
+        if nameHeadersColumns_Sum_Average_Round is None:
+            nameHeadersColumns_Sum_Average_Round = ["Sum", policy.nameAverage, policy.nameRound]
+        
         if len(nameHeadersColumns_Sum_Average_Round) != 3:
             raise BadNameHeaders("Количество имён заголовков для суммы, среднего и округления должно быть 3, а у тебя" + len(nameHeadersColumns_Sum_Average_Round))
 
-        gradesStudents = tableValues[headersForCalculation]
-
-        gradesStudents.fillna(0, inplace=True)
-        gradesStudents = gradesStudents.apply(lambda x: pd.to_numeric(x, errors='coerce')).fillna(0)
-        gradesStudents = gradesStudents.replace([np.inf, -np.inf], 0)
+        averages, rounds = GradingPolicy.evaluate([policy], block, TableHandler.maxOfBlock(block))
 
-        gradesStudents[nameHeadersColumns_Sum_Average_Round[0]] = 0
+        return TableHandler.withColumns(tableValues, nameHeadersColumns_Sum_Average_Round, 
+                                        [TableHandler.sumOfBlock(tableValues, block), averages[:, 0], TableHandler.roundColumn(rounds[:, 0])])
     
-        for question in headersForCalculation:
-            gradesStudents[nameHeadersColumns_Sum_Average_Round[0]] += gradesStudents[question]
-
-        max_values = {}
     
-        for column in headersForCalculation:
-            col_values = gradesStudents[column]
-            max_val = max(col_values)
-            max_values[column] = max_val
+    @staticmethod
+    def createTableWithPolicies(tableValues: pd.DataFrame, 
+                                headersForCalculation: List[str],
+                                policies: List[GradingPolicy],
+                                nameHeaderSum: str = "Sum",
+                                block: np.ndarray = None) -> pd.DataFrame:
+        """
+        Создаёт таблицу pd.DataFrame с колонкой Sum и парой колонок Average X,
+        Round X на каждую политику. Значения совпадают с 
+        createTableWithNewColumns_SumAverageRound для каждой политики, но Sum
+        считается один раз по блоку, а все политики - одним вызовом 
+        GradingPolicy.evaluate.
 
-        countQuestions = len(headersForCalculation)
-    
-        gradesStudents[nameHeadersColumns_Sum_Average_Round[1]] = 0
-    
-    
-        for question in headersForCalculation:
-            gradesStudents[nameHeadersColumns_Sum_Average_Round[1]] += gradesStudents[question] / max_values[question] * TableHandler.GRADE_CONVERTED / countQuestions
-    
-        gradesStudents[nameHeadersColumns_Sum_Average_Round[2]] = gradesStudents[nameHeadersColumns_Sum_Average_Round[1]].apply(TableHandler.customRound)
+        Args:
+            - tableValues: pd.DataFrame - таблица для обработки.
+            - headersForCalculation: List[str] - список вопросов для вычислений.
+            - policies: List[GradingPolicy] - политики оценивания.
+            - nameHeaderSum: str = "Sum" - имя колонки суммы.
+            - block: np.ndarray = None - см. 
+            createTableWithNewColumns_SumAverageRound.
 
-        return gradesStudents
-    
+        Raise:
+            - Политик нет или имена их колонок повторяются.
+        Return:
+            - Таблица pd.DataFrame с новыми колонками.
+        """
+        names = [nameHeaderSum] + [name for x in policies for name in (x.nameAverage, x.nameRound)]
+        
+        if len(policies) == 0 or len(set(names)) != len(names):
+            raise BadNameHeaders("Нужна хотя бы одна политика, имена колонок политик должны быть уникальны")
+        
+        if block is None:
+            tableValues, block = TableHandler.normalizeTable(tableValues, headersForCalculation)
+        
+        averages, rounds = GradingPolicy.evaluate(policies, block, TableHandler.maxOfBlock(block))
+        
+        columns = [TableHandler.sumOfBlock(tableValues, block)]
+        
+        for i in range(len(policies)):
+            columns += [averages[:, i], TableHandler.roundColumn(rounds[:, i])]
+        
+        return TableHandler.withColumns(TableHandler.ownedTable(tableValues, block), names, columns)
     
     def export_TableGradesStudent(self, 
                                   pathForExport: str = "StudentsGrades.xlsx") -> pd.DataFrame:
@@ -747,11 +1557,14 @@ class TableHandler:
         Args:
             - pathForExport: str = "StudentsGrades.xlsx" - файл для экспорта таблицы.
 
+        Raise:
+            - FileExistsError, если файл уже существует.
+
         Return:
             Таблица pd.DataFrame с колонками и строчками.
         """
         table = self.createTableGradesStudentsToView()
-        table.to_excel(pathForExport, index=False)
+        FileExport.writeExclusive(pathForExport, lambda file: table.to_excel(file, index=False, engine="openpyxl"))
         return table
         
     def export_TableGradesTest(self, 
@@ -763,11 +1576,14 @@ class TableHandler:
         Args:
             - pathForExport: str = "TestGrades.xlsx" - файл для экспорта таблицы.
 
+        Raise:
+            - FileExistsError, если файл уже существует.
+
         Return:
             - Таблица pd.DataFrame с колонками и строчками.
         """
         table = self.createTableGradesTestToView()
-        table.to_excel(pathForExport, index=False)
+        FileExport.writeExclusive(pathForExport, lambda file: table.to_excel(file, index=False, engine="openpyxl"))
         return table
         
     def export_TableLtiLsi(self, 
@@ -780,20 +1596,38 @@ class TableHandler:
         Args:
             - pathForExport: str = "LsiLti.xlsx" - файл для экспорта таблицы.
 
+        Raise:
+            - FileExistsError, если файл уже существует.
+
         Return:
             - Таблица pd.DataFrame с колонками и строчками.
         """
         table = self.createTableLtiLsti()
-        table.to_excel(pathForExport, index=False)
+        FileExport.writeExclusive(pathForExport, lambda file: table.to_excel(file, index=False, engine="openpyxl"))
         return table
     
+    @staticmethod
+    def createTableConclusionFromTables(tables: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Собирает таблицу выводов из готовых таблиц (оценки, оценки тестов, 
+        LSI LTI) рядом через пустую колонку, как export_TableConclusion.
+        """
+        empty_df = pd.DataFrame(columns=[' '])
+        
+        parts = []
+        
+        for table in tables:
+            parts += [table, empty_df]
+        
+        return pd.concat(parts[:-1], axis=1)
+    
     def export_TableConclusion(self, 
                                nameFileForExport: str = "Сonclusion.xlsx", 
                                pathForExport: str = "./",
                                nameOriginalForExport: str = "original.xlsx", 
                                exportOriginal: bool = True,
-                               nameHeadersColumn_Sum_Average_Round: List[str] = ["Sum", f"Average {GRADE_CONVERTED}", f"Round {ROUND_FACTOR}"],
-                               nameHeadersString_Max_Sum_Average: List[str] = ['Max', 'Sum', 'Average', f"Average {GRADE_CONVERTED}"],
+                               nameHeadersColumn_Sum_Average_Round: List[str] = None,
+                               nameHeadersString_Max_Sum_Average: List[str] = None,
                                nameHeaders_LSI_LTI: List[str] = ["LSI", "LTI"]
                                ) -> pd.DataFrame:
         """
@@ -838,7 +1672,7 @@ class TableHandler:
             
             if os.path.isfile(fileOriginal):
                 raise FileExistsError(f"Файл {fileOriginal} уже существует")
-            self.__data_table.to_excel(fileOriginal, index=False)
+            FileExport.writeExclusive(fileOriginal, lambda excel: self.__data_table.to_excel(excel, index=False, engine="openpyxl"))
         
         file = os.path.join(pathForExport, nameFileForExport)
         
@@ -849,11 +1683,9 @@ class TableHandler:
         df2 = self.createTableGradesTestToView(nameColumnStudents, nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average)
         df3 = self.createTableLtiLsti(nameColumnStudents, nameHeaders_LSI_LTI)
 
-        empty_df = pd.DataFrame(columns=[' '])
-
-        combined_df = pd.concat([df1, empty_df, df2, empty_df, df3], axis=1)
+        combined_df = TableHandler.createTableConclusionFromTables([df1, df2, df3])
 
-        combined_df.to_excel(file, index=False)
+        FileExport.writeExclusive(file, lambda excel: combined_df.to_excel(excel, index=False, engine="openpyxl"))
         
         return combined_df
     
@@ -953,15 +1785,448 @@ class TableHandler:
         
         return None
         
+    def __reportCharts(self, 
+                       exportBenefits: bool,
+                       headerBenefitsQuestionInDataTable: str,
+                       typesBenefitsForPng: List[str],
+                       typesBenefitsInDataTable: List[str],
+                       titleAndLabelsBenefits: List[str]) -> dict:
+        """
+        Графики отчёта для export_ReportBundle и export_Stream в порядке 
+        листа Charts: имя -> (зависимости, функция от готовых результатов, 
+        которая рисует график в .png). Результаты: "_grades", "_tests" - 
+        таблицы createTableGradesStudents и createTableGradesTest, "Tests" - 
+        таблица оценок тестов для просмотра.
+        """
+        colors = ['c', 'moccasin', 'sienna', 'silver', 'gold']
+        namesMotivation = ['Соотношение успеваемости к мотивации в группе', 'Успеваемость', 'Мотивация']
+        namesPopularity = ['Оценка популярности заданий', 'Виды заданий', 'Средние баллы']
+        
+        def chart(draw, figsize=None):
+            fig = Figure(figsize=figsize)
+            draw(fig.subplots())
+            return TableHandler.figureToPng(fig)
+        
+        charts = {
+            "BRSO": (["_grades"], lambda r: chart(lambda ax: TableHandler.drawPie(ax, r["_grades"].iloc[:, -1].to_list(), 'Средняя успеваемость по БРСО', colors))),
+            "OTS": (["_tests"], lambda r: chart(lambda ax: TableHandler.drawPie(ax, r["_tests"].iloc[:, -1].to_list(), 'Оценка тестов ОТС', colors))),
+        }
+        
+        if exportBenefits:
+            charts["Benefits"] = ([], lambda r: chart(lambda ax: TableHandler.drawBenefits(ax, self.__data_table[headerBenefitsQuestionInDataTable], titleAndLabelsBenefits, 
+                                                                                            typesBenefitsForPng, typesBenefitsInDataTable), (10, 5)))
+        
+        charts["Popularity"] = (["Tests"], lambda r: chart(lambda ax: TableHandler.drawPopularity(ax, r["Tests"][self.__headersTestScore].iloc[-1].to_list(), 
+                                                                                               namesPopularity, 'green')))
+        charts["Motivation"] = (["_grades", "_tests"], lambda r: chart(lambda ax: TableHandler.drawRegression(ax, r["_grades"].iloc[:, -2].to_list(), r["_tests"].iloc[:, -2].to_list(), 
+                                                                                                           namesMotivation[0], namesMotivation[2], namesMotivation[1], "salmon", "k")))
+        charts["Education"] = (["_grades", "_tests"], lambda r: chart(lambda ax: TableHandler.drawRegression(ax, r["_tests"].iloc[:, -2].to_list(), r["_grades"].iloc[:, -2].to_list(), 
+                                                                                                          namesMotivation[0], namesMotivation[1], namesMotivation[2], "salmon", "k")))
+        
+        return charts
+    
+    def export_ReportBundle(self, 
+                            fileToExport: str = "Report.xlsx",
+                            exportOriginal: bool = True,
+                            exportBenefits: bool = False,
+                            namesSheets: List[str] = ["Original", "Grades", "Tests", "LSI LTI", "Charts"],
+                            nameHeadersColumn_Sum_Average_Round: List[str] = None,
+                            nameHeadersString_Max_Sum_Average: List[str] = None,
+                            nameHeaders_LSI_LTI: List[str] = ["LSI", "LTI"],
+                            headerBenefitsQuestionInDataTable: str = "17. Какими средствами обучения вы преимущественно пользовались?",
+                            typesBenefitsForPng: List[str] = ['Электронные учебники', 'Рабочие тетради', 'Видеолекции', 'Печатные учебники'],
+                            typesBenefitsInDataTable: List[str] = ['Электронными учебниками', 'Рабочими тетрадями', 'Видеолекциями', 'Печатными учебниками'],
+                            titleAndLabelsBenefits: List[str] = ["Пособия", "Количество", "Пособие"]
+                            ) -> dict:
+        """
+        Экспортирует весь отчёт одним файлом .xlsx за одну запись: листы 
+        оригинальной таблицы, оценок студентов, оценок тестов, LSI/LTI и лист
+        с графиками (BRSO, OTS, Benefits, Popularity, Motivation, Education), 
+        вставленными картинками. Таблицы считаются один раз, графики строятся 
+        по ним же и рисуются в память, файлы .png на диск не пишутся.
+        
+        Args:
+            - fileToExport: str = "Report.xlsx" - файл отчёта.
+            - exportOriginal: bool = True - добавить лист оригинальной таблицы.
+            - exportBenefits: bool = False - добавить график пособий.
+            - namesSheets: List[str] - имена пяти листов.
+            - nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average,
+            nameHeaders_LSI_LTI - как в export_TableConclusion.
+            - headerBenefitsQuestionInDataTable, typesBenefitsForPng, 
+            typesBenefitsInDataTable - как в export_PngConslission.
+            - titleAndLabelsBenefits: List[str] - как titleAndLabels в
+            export_PngBenefits.
+        Raise:
+            - 1. Файл уже существует.
+            - 2. Имена листов не уникальны или их не пять.
+        Return:
+            - Словарь имя листа -> pd.DataFrame.
+        """
+        if os.path.isfile(fileToExport):
+            raise FileExistsError(f"Файл {fileToExport} уже существует")
+        
+        if len(set(namesSheets)) != len(namesSheets) or len(namesSheets) != 5:
+            raise BadNameHeaders("Имена листов не уникальны или их количество не равно пяти")
+        
+        policy = self.__policy
+        
+        if nameHeadersColumn_Sum_Average_Round is None:
+            nameHeadersColumn_Sum_Average_Round = ["Sum", policy.nameAverage, policy.nameRound]
+        
+        if nameHeadersString_Max_Sum_Average is None:
+            nameHeadersString_Max_Sum_Average = ['Max', 'Sum', 'Average', policy.nameAverage]
+        
+        nameColumnStudents = self.__headerStudentsName
+        
+        grades = self.__gradesWithSumAverageRound(nameHeadersColumn_Sum_Average_Round)
+        tests = self.__testsWithSumAverageRound(nameHeadersColumn_Sum_Average_Round)
+        
+        tables = {}
+        
+        if exportOriginal:
+            tables[namesSheets[0]] = self.__data_table.copy(deep=False)
+        
+        tables[namesSheets[1]] = TableHandler.createTableToViewFromTable(grades, self.__headersGradesStudents, self.__names, nameColumnStudents, 
+                                                                         nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average, policy)
+        tables[namesSheets[2]] = TableHandler.createTableToViewFromTable(tests, self.__headersTestScore, self.__names, nameColumnStudents, 
+                                                                         nameHeadersColumn_Sum_Average_Round, nameHeadersString_Max_Sum_Average, policy)
+        tables[namesSheets[3]] = self.createTableLtiLsti(nameColumnStudents, nameHeaders_LSI_LTI)
+        
+        charts = self.__reportCharts(exportBenefits, headerBenefitsQuestionInDataTable, typesBenefitsForPng, 
+                                     typesBenefitsInDataTable, titleAndLabelsBenefits)
+        results = {"_grades": grades, "_tests": tests, "Tests": tables[namesSheets[2]]}
+        
+        images = [draw(results) for _, draw in charts.values()]
+        
+        def write(excel):
+            with pd.ExcelWriter(excel, engine="openpyxl") as writer:
+                for name, table in tables.items():
+                    table.to_excel(writer, sheet_name=name, index=False)
+                
+                worksheet = writer.book.create_sheet(namesSheets[4])
+                row = 1
+                
+                for image in images:
+                    # Буфер перематывается: книгу могут записать повторно
+                    image.seek(0)
+                    picture = XlsxImage(image)
+                    worksheet.add_image(picture, f"A{row}")
+                    # Высота строки по умолчанию 20 пикселей
+                    row += int(picture.height // 20) + 2
+        
+        FileExport.writeExclusive(fileToExport, write)
+        
+        return tables
+    
+    def export_Stream(self, 
+                      pathForExport: str = None,
+                      exportOriginal: bool = False,
+                      exportBenefits: bool = False,
+                      countWorkers: int = 4,
+                      nameHeaders_LSI_LTI: List[str] = ["LSI", "LTI"],
+                      headerBenefitsQuestionInDataTable: str = "17. Какими средствами обучения вы преимущественно пользовались?",
+                      typesBenefitsForPng: List[str] = ['Электронные учебники', 'Рабочие тетради', 'Видеолекции', 'Печатные учебники'],
+                      typesBenefitsInDataTable: List[str] = ['Электронными учебниками', 'Рабочими тетрадями', 'Видеолекциями', 'Печатными учебниками'],
+                      titleAndLabelsBenefits: List[str] = ["Пособия", "Количество", "Пособие"],
+                      names: List[str] = None
+                      ) -> Iterator[ReportArtifact]:
+        """
+        Генератор отчёта по частям: каждая таблица (Original, Grades, Tests, 
+        LSI LTI) и каждый график (BRSO, OTS, Benefits, Popularity, Motivation,
+        Education) отдаётся как ReportArtifact сразу, как только готов, в 
+        порядке готовности. Независимые этапы идут параллельно в countWorkers 
+        потоках, зависимые (графики от таблиц оценок) запускаются, как только 
+        готово то, от чего они зависят. Ошибка этапа не бросается, а отдаётся в
+        ReportArtifact.error, остальные этапы продолжаются; этапы, зависящие 
+        от упавшего, отдаются с ошибкой BadTable.
+
+        Пример использования:
+
+        ```python
+        >>> for artifact in handler.export_Stream("resource/IBASS"):
+        ...     print(artifact.name, artifact.ok, artifact.seconds)
+        ```
+        
+        Args:
+            - pathForExport: str = None - папка для экспорта: таблицы в 
+            "<имя>.xlsx", графики в "<имя>.png". None - только в память.
+            - exportOriginal: bool = False - отдать оригинальную таблицу.
+            - exportBenefits: bool = False - строить график пособий.
+            - countWorkers: int = 4 - количество потоков.
+            - nameHeaders_LSI_LTI - как в export_TableConclusion.
+            - headerBenefitsQuestionInDataTable, typesBenefitsForPng, 
+            typesBenefitsInDataTable - как в export_PngConslission.
+            - titleAndLabelsBenefits: List[str] - как titleAndLabels в
+            export_PngBenefits.
+            - names: List[str] = None - строить только эти этапы (и то, от 
+            чего они зависят), None - все.
+        Raise:
+            - Неизвестный этап в names.
+        Return:
+            - Iterator[ReportArtifact].
+        """
+        policy = self.__policy
+        nameColumnStudents = self.__headerStudentsName
+        namesColumns = ["Sum", policy.nameAverage, policy.nameRound]
+        namesRows = ['Max', 'Sum', 'Average', policy.nameAverage]
+        
+        # Этап: (зависимости, функция от готовых результатов). Этапы с "_" 
+        # внутренние и не отдаются.
+        stages = {
+            "_grades": ([], lambda r: self.__gradesWithSumAverageRound(namesColumns)),
+            "_tests": ([], lambda r: self.__testsWithSumAverageRound(namesColumns)),
+            "Grades": (["_grades"], lambda r: TableHandler.createTableToViewFromTable(r["_grades"], self.__headersGradesStudents, self.__names, 
+                                                                                      nameColumnStudents, namesColumns, namesRows, policy)),
+            "Tests": (["_tests"], lambda r: TableHandler.createTableToViewFromTable(r["_tests"], self.__headersTestScore, self.__names, 
+                                                                                    nameColumnStudents, namesColumns, namesRows, policy)),
+            "LSI LTI": ([], lambda r: self.createTableLtiLsti(nameColumnStudents, nameHeaders_LSI_LTI)),
+        }
+        
+        if exportOriginal:
+            stages["Original"] = ([], lambda r: self.__data_table.copy(deep=False))
+        
+        stages.update(self.__reportCharts(exportBenefits, headerBenefitsQuestionInDataTable, typesBenefitsForPng, 
+                                          typesBenefitsInDataTable, titleAndLabelsBenefits))
+        
+        if names is not None:
+            unknown = [x for x in names if x.startswith("_") or x not in stages]
+            
+            if unknown:
+                raise BadNameHeaders(f"Неизвестные этапы {unknown}, возможные: {[x for x in stages if not x.startswith('_')]}")
+            
+            needed = set()
+            pending = list(names)
+            
+            while pending:
+                name = pending.pop()
+                if name not in needed:
+                    needed.add(name)
+                    pending += stages[name][0]
+            
+            stages = {name: stage for name, stage in stages.items() if name in needed}
+        
+        if pathForExport is not None:
+            os.makedirs(pathForExport, exist_ok=True)
+        
+        def fileOf(name, value):
+            if pathForExport is None or name.startswith("_"):
+                return None
+            return os.path.join(pathForExport, name + (".xlsx" if isinstance(value, pd.DataFrame) else ".png"))
+        
+        def run(name, function, results):
+            value = function(results)
+            file = fileOf(name, value)
+            
+            if file is not None:
+                if isinstance(value, pd.DataFrame):
+                    FileExport.writeExclusive(file, lambda output: value.to_excel(output, index=False, engine="openpyxl"))
+                else:
+                    FileExport.writeExclusive(file, lambda output: output.write(value.getbuffer()))
+            
+            return value, file
+        
+        start = time.perf_counter()
+        results = {}
+        failed = {}
+        waiting = dict(stages)
+        running = {}
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, countWorkers))
+        
+        try:
+            while waiting or running:
+                for name in list(waiting):
+                    dependencies, function = waiting[name]
+                    
+                    broken = [x for x in dependencies if x in failed]
+                    
+                    if broken:
+                        del waiting[name]
+                        failed[name] = failed[broken[0]]
+                        if not name.startswith("_"):
+                            error = BadTable(f"{name} не построен, не готово {broken[0].strip('_')}: {failed[broken[0]]}")
+                            yield ReportArtifact(name, None, None, error, time.perf_counter() - start)
+                    elif all(x in results for x in dependencies):
+                        del waiting[name]
+                        running[executor.submit(run, name, function, dict(results))] = name
+                
+                if not running:
+                    continue
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name = running.pop(future)
+                    
+                    try:
+                        value, file = future.result()
+                    except Exception as error:
+                        failed[name] = error
+                        artifact = ReportArtifact(name, None, None, error, time.perf_counter() - start)
+                    else:
+                        results[name] = value
+                        artifact = ReportArtifact(name, value, file, None, time.perf_counter() - start)
+                    
+                    if not name.startswith("_"):
+                        yield artifact
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def export_StudentsReports(self, 
+                               pathForExport: str = "./",
+                               fileFormat: str = "png",
+                               nameDocument: str = None,
+                               countJobs: int = 1,
+                               dpi: int = 100) -> dict:
+        """
+        Экспортирует индивидуальный отчёт каждого студента (см. ReportCard): 
+        оценки по вопросам рядом с Max и Average группы из 
+        createTableGradesStudentsToView, Average, Round, LSI из 
+        createTableLtiLsti и оценки тестов. Все отчёты рисуются одним 
+        шаблоном, в котором меняются только столбцы и текст студента. 
+        Студенты делятся на countJobs частей, части рисуются в отдельных 
+        процессах.
+        
+        Args:
+            - pathForExport: str = "./" - папка для экспорта.
+            - fileFormat: str = "png" - "png" или "pdf", файл на студента 
+            "<номер> <имя>.<формат>".
+            - nameDocument: str = None - вместо файлов на студента один 
+            многостраничный .pdf. Документ пишется одним процессом, поэтому
+            только с countJobs = 1.
+            - countJobs: int = 1 - количество процессов.
+            - dpi: int = 100 - разрешение отчётов.
+        Raise:
+            - 1. Формат не png и не pdf.
+            - 2. nameDocument вместе с countJobs > 1.
+            - 3. Какой-нибудь файл уже существует.
+        Return:
+            - Словарь "students" - количество отчётов, "seconds" - время, 
+            "studentsPerSecond" - скорость.
+        """
+        if fileFormat not in ("png", "pdf"):
+            raise BadNameHeaders(f"Формат отчётов должен быть png или pdf, а у тебя {fileFormat}")
+        
+        if nameDocument is not None and countJobs > 1:
+            raise BadNameHeaders(f"Документ {nameDocument} пишется одним процессом, countJobs должен быть 1, а у тебя {countJobs}")
+        
+        start = time.perf_counter()
+        
+        os.makedirs(pathForExport, exist_ok=True)
+        
+        policy = self.__policy
+        namesColumns = ["Sum", policy.nameAverage, policy.nameRound]
+        namesRows = ['Max', 'Sum', 'Average', policy.nameAverage]
+        countStudents = len(self.__names)
+        
+        grades = self.__gradesWithSumAverageRound(namesColumns)
+        tests = self.__testsWithSumAverageRound(namesColumns)
+        view = TableHandler.createTableToViewFromTable(grades, self.__headersGradesStudents, self.__names, 
+                                                      self.__headerStudentsName, namesColumns, namesRows, policy)
+        lsi = self.createTableLtiLsti()["LSI"].to_numpy(dtype=float)[:countStudents]
+        
+        gradesValues = grades[self.__headersGradesStudents].to_numpy(dtype=float)
+        testsValues = tests[self.__headersTestScore].to_numpy(dtype=float)
+        
+        template = {"maxGrades": view[self.__headersGradesStudents].iloc[countStudents].to_numpy(dtype=float),
+                    "averageGrades": view[self.__headersGradesStudents].iloc[countStudents + 2].to_numpy(dtype=float),
+                    "maxTests": float(np.max(testsValues, initial=0)),
+                    "dpi": dpi}
+        
+        summaries = [f"{policy.nameAverage}: {average:.2f}    {policy.nameRound}: {grade:g}    LSI: {x:.2f}" 
+                     for average, grade, x in zip(grades[namesColumns[1]], grades[namesColumns[2]], lsi)]
+        
+        chunks = [x for x in np.array_split(np.arange(countStudents), max(1, countJobs)) if len(x) != 0]
+        
+        tasks = []
+        
+        for rows in chunks:
+            chunk = {"numbers": (rows + 1).tolist(),
+                     "names": [self.__names[x] for x in rows],
+                     "grades": gradesValues[rows],
+                     "tests": testsValues[rows],
+                     "summaries": [summaries[x] for x in rows]}
+            
+            fileDocument = None
+            
+            if nameDocument is not None:
+                fileDocument = os.path.join(pathForExport, os.path.splitext(nameDocument)[0] + ".pdf")
+            
+            tasks.append((template, chunk, pathForExport, fileFormat, fileDocument))
+        
+        if len(tasks) <= 1:
+            count = sum(ReportCard.renderChunk(*task) for task in tasks)
+        else:
+            with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+                count = sum(executor.map(ReportCard.renderChunk, *zip(*tasks)))
+        
+        seconds = time.perf_counter() - start
+        
+        return {"students": count, "seconds": seconds, "studentsPerSecond": count / seconds if seconds else float("inf")}
+    
+    @staticmethod
+    def saveFigure(fig: Figure, fileToExport: str) -> None:
+        """
+        Сохраняет график в файл через FileExport.writeExclusive: если файл
+        уже есть (или его успел создать другой поток), бросает 
+        FileExistsError и ничего не перезаписывает, при ошибке отрисовки 
+        файла не остаётся. Формат - по расширению.
+        """
+        extension = os.path.splitext(fileToExport)[1][1:].lower()
+        
+        FileExport.writeExclusive(fileToExport, lambda file: fig.savefig(file, format=extension or None))
+    
+    @staticmethod
+    def figureToPng(fig: Figure) -> io.BytesIO:
+        """
+        Рисует график в память в формате .png.
+        """
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        buffer.seek(0)
+        return buffer
+    
     @staticmethod
     def getHeadrsExcelToList(pathToFile: str) -> List[str]:
+        """
+        Возвращает заголовки таблицы так же, как их назвал бы pd.read_excel:
+        пустые - "Unnamed: N", повторы - "имя.1", "имя.2". Читается только 
+        первая строка листа (см. XlsxReader.readHeaders), результат кешируется
+        по времени изменения и размеру файла.
+
+        Args:
+            - pathToFile: str - путь к таблице .xlsx.
+
+        Return:
+            - Список заголовков.
+        """
+        headers = []
+        counts = {}
         
-        df = pd.read_excel(pathToFile)
-        headers = df.columns.tolist()
+        for i, header in enumerate(XlsxReader.readHeaders(pathToFile)):
+            if header is None:
+                header = f"Unnamed: {i}"
+            
+            if header in counts:
+                counts[header] += 1
+                header = f"{header}.{counts[header]}"
+            else:
+                counts[header] = 0
+            
+            headers.append(header)
         
         return headers
          
     
+    @property
+    def policy(self) -> GradingPolicy:
+        return self.__policy
+    
     @property
     def dataTable(self) -> pd.DataFrame:
-        return self.__data_table
+        """
+        Исходная таблица. Возвращается неглубокая копия с теми же массивами 
+        только для чтения: добавление колонок не меняет обработчик, а запись
+        в значения бросает ValueError.
+        """
+        return self.__data_table.copy(deep=False)
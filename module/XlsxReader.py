@@ -0,0 +1,590 @@
+import os
+import sys
+import threading
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .Exceptions.BadTable import BadTable as BadTable
+
+
+class XlsxColumns:
+    """
+    Колонки, прочитанные XlsxReader.readColumns.
+
+    Атрибуты:
+        - rows: int - количество строк данных (без строки заголовков).
+        - headers: List[str] - прочитанные заголовки в порядке листа.
+        - numeric: Dict[str, np.ndarray] - числовые колонки float64, NaN там,
+        где числа нет.
+        - missing: Dict[str, np.ndarray] - маски пустых ячеек числовых колонок.
+        - rejected: Dict[str, Dict[int, str]] - текстовые ячейки числовых 
+        колонок, в том числе похожие на число ("5"): номер строки -> текст.
+        Число из текста делает только toDataFrame, как pd.read_excel: если
+        весь текст колонки - числа. Иначе текст остаётся строкой, и его 
+        переводит TableHandler.normalizeTable.
+        - text: Dict[str, list] - остальные колонки значениями Python, 
+        строки интернированы, None для пустых ячеек.
+    """
+
+    # Текст, который pd.read_excel по умолчанию считает пропуском
+    NA_VALUES = {"", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", 
+                 "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"}
+
+    def __init__(self, rows: int, headers: List[str]):
+        self.rows = rows
+        self.headers = headers
+        self.numeric = {}
+        self.missing = {}
+        self.rejected = {}
+        self.text = {}
+
+    def toDataFrame(self) -> pd.DataFrame:
+        """
+        Собирает pd.DataFrame с теми же значениями и типами колонок, что дал
+        бы pd.read_excel для этих колонок. Текст из NA_VALUES - пропуск. 
+        Если весь текст колонки переводится в число, колонка числовая: целые 
+        без пропусков - int64, иначе float64. Если нет - колонка object, 
+        где текст остаётся строкой ("5" не становится 5), числа без дробной 
+        части - int.
+        """
+        columns = {}
+
+        for header in self.headers:
+            if header in self.numeric:
+                values = self.numeric[header]
+                missing = self.missing[header]
+                rejected = self.rejected[header]
+
+                text = {row: value for row, value in rejected.items() if value not in XlsxColumns.NA_VALUES}
+
+                if len(text) != len(rejected):
+                    missing = missing.copy()
+                    for row in rejected.keys() - text.keys():
+                        missing[row] = True
+
+                if len(text) != 0:
+                    numbers = values.copy()
+                    try:
+                        for row, value in text.items():
+                            numbers[row] = float(value)
+                        values, text = numbers, {}
+                    except ValueError:
+                        pass
+
+                if len(text) != 0:
+                    integral = np.mod(values, 1) == 0
+                    values = values.astype(object)
+                    values[integral] = [int(x) for x in values[integral]]
+                    values[missing] = np.nan
+                    for row, value in text.items():
+                        values[row] = value
+                elif not missing.any() and np.all(np.mod(values, 1) == 0):
+                    values = values.astype(np.int64)
+
+                columns[header] = values
+            else:
+                columns[header] = pd.Series([np.nan if x is None else x for x in self.text[header]])
+
+        return pd.DataFrame(columns)
+
+
+class XlsxReader:
+    """
+    Чтение .xlsx напрямую из zip архива потоковым разбором XML листа, без
+    построения объектов ячеек openpyxl.
+
+    Пример использования:
+
+    ```python
+    >>> headers = XlsxReader.readHeaders("resource/Selection/Научениеметрия (ОТС)_образец.xlsx")
+    ```
+    """
+
+    NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    NS_RELATIONSHIPS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    NS_PACKAGE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+    # Кеш заголовков: путь -> (mtime, размер, заголовки), от давно 
+    # прочитанных к недавним. Запись пути заменяется при изменении файла, 
+    # сверх HEADERS_CACHE_SIZE путей вытесняются давно прочитанные
+    HEADERS_CACHE_SIZE = 128
+    __headersCache: "OrderedDict[str, Tuple[int, int, list]]" = OrderedDict()
+    __headersLock = threading.Lock()
+
+    @staticmethod
+    def columnIndex(reference: str) -> int:
+        """
+        Переводит ссылку на ячейку ("C12") в номер колонки с нуля (2).
+        """
+        index = 0
+
+        for letter in reference:
+            if letter.isdigit():
+                break
+            index = index * 26 + (ord(letter.upper()) - 64)
+
+        return index - 1
+
+    @staticmethod
+    def rowIndex(reference: str) -> int:
+        """
+        Переводит ссылку на ячейку ("C12") в номер строки с единицы (12).
+        """
+        for position, letter in enumerate(reference):
+            if letter.isdigit():
+                return int(reference[position:])
+
+        return 0
+
+    @staticmethod
+    def locateParts(archive: zipfile.ZipFile) -> Tuple[str, str]:
+        """
+        Находит в архиве XML активного листа и таблицу общих строк.
+
+        Args:
+            - archive: zipfile.ZipFile - открытый .xlsx.
+
+        Return:
+            - (путь к листу, путь к sharedStrings или None).
+        """
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+
+        activeTab = 0
+        view = workbook.find(f"{XlsxReader.NS_MAIN}bookViews/{XlsxReader.NS_MAIN}workbookView")
+        if view is not None:
+            activeTab = int(view.get("activeTab", 0))
+
+        sheets = workbook.findall(f"{XlsxReader.NS_MAIN}sheets/{XlsxReader.NS_MAIN}sheet")
+        sheetId = sheets[min(activeTab, len(sheets) - 1)].get(f"{XlsxReader.NS_RELATIONSHIPS}id")
+
+        relationships = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+
+        sheetPath = None
+        sharedStringsPath = None
+
+        for relationship in relationships.iter(f"{XlsxReader.NS_PACKAGE}Relationship"):
+            target = relationship.get("Target")
+            target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+            if relationship.get("Id") == sheetId:
+                sheetPath = target
+            elif relationship.get("Type", "").endswith("/sharedStrings"):
+                sharedStringsPath = target
+
+        return sheetPath, sharedStringsPath
+
+    @staticmethod
+    def readSharedStrings(archive: zipfile.ZipFile, path: str, needed: set) -> Dict[int, str]:
+        """
+        Читает из sharedStrings только нужные строки, останавливаясь после
+        последнего нужного номера.
+
+        Args:
+            - archive: zipfile.ZipFile - открытый .xlsx.
+            - path: str - путь к sharedStrings в архиве.
+            - needed: set - номера нужных строк.
+
+        Return:
+            - Словарь номер -> строка.
+        """
+        result = {}
+
+        if path is None or len(needed) == 0:
+            return result
+
+        last = max(needed)
+        index = 0
+
+        with archive.open(path) as stream:
+            for _, element in ElementTree.iterparse(stream):
+                if element.tag != f"{XlsxReader.NS_MAIN}si":
+                    continue
+
+                if index in needed:
+                    result[index] = XlsxReader.elementText(element)
+
+                element.clear()
+
+                if index >= last:
+                    break
+
+                index += 1
+
+        return result
+
+    @staticmethod
+    def elementText(element) -> str:
+        """
+        Текст строки <si> или <is>: все <t>, кроме фонетических <rPh>.
+        """
+        text = []
+
+        for child in element:
+            if child.tag == f"{XlsxReader.NS_MAIN}t":
+                text.append(child.text or "")
+            elif child.tag == f"{XlsxReader.NS_MAIN}r":
+                for part in child.iter(f"{XlsxReader.NS_MAIN}t"):
+                    text.append(part.text or "")
+
+        return "".join(text)
+
+    @staticmethod
+    def cellValue(element):
+        """
+        Разбирает ячейку <c>.
+
+        Return:
+            - (тип, значение): тип "s" - номер общей строки, "str" - строка,
+            "n" - число, "b" - логическое, None - пустая ячейка. Ячейки 
+            других типов (например, "d" - дата ISO 8601) отдаются текстом 
+            "str" как есть.
+        """
+        cellType = element.get("t", "n")
+
+        if cellType == "inlineStr":
+            inline = element.find(f"{XlsxReader.NS_MAIN}is")
+            return ("str", XlsxReader.elementText(inline)) if inline is not None else (None, None)
+
+        value = element.find(f"{XlsxReader.NS_MAIN}v")
+
+        if value is None or value.text is None:
+            return None, None
+
+        if cellType == "s":
+            return "s", int(value.text)
+        elif cellType in ("str", "e"):
+            return "str", value.text
+        elif cellType == "b":
+            return "b", value.text == "1"
+        elif cellType != "n":
+            return "str", value.text
+
+        number = float(value.text)
+        return "n", int(number) if number.is_integer() else number
+
+    @staticmethod
+    def isEmptyCell(element) -> bool:
+        """
+        Пустая ли ячейка <c>, как у cellValue, но без разбора значения.
+        """
+        if element.get("t") == "inlineStr":
+            return element.find(f"{XlsxReader.NS_MAIN}is") is None
+
+        value = element.find(f"{XlsxReader.NS_MAIN}v")
+        return value is None or value.text is None
+
+    @staticmethod
+    def readHeaders(pathToTable: str) -> list:
+        """
+        Читает первую строку активного листа. Разбор XML листа прекращается
+        на конце строки 1 или на первой строке с номером больше 1 (строки 
+        заголовков в листе нет - пустой список), из sharedStrings читаются 
+        только строки заголовков. Прочитанная строка заголовков кешируется 
+        по времени изменения и размеру файла, в кеше не больше 
+        HEADERS_CACHE_SIZE последних путей.
+
+        Args:
+            - pathToTable: str - путь к таблице .xlsx.
+
+        Return:
+            - Значения первой строки (None для пустых ячеек).
+        """
+        key = os.path.abspath(pathToTable)
+        stat = os.stat(key)
+
+        with XlsxReader.__headersLock:
+            cached = XlsxReader.__headersCache.get(key)
+            if cached is not None:
+                XlsxReader.__headersCache.move_to_end(key)
+
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return list(cached[2])
+
+        with zipfile.ZipFile(key) as archive:
+            sheetPath, sharedStringsPath = XlsxReader.locateParts(archive)
+
+            cells = []
+            # Кешируется только прочитанная строка заголовков или лист без 
+            # строк, а не лист, первая строка которого не записана
+            complete = True
+            row = 0
+
+            with archive.open(sheetPath) as stream:
+                for _, element in ElementTree.iterparse(stream):
+                    if element.tag != f"{XlsxReader.NS_MAIN}row":
+                        continue
+
+                    row = int(element.get("r", row + 1))
+
+                    if row == 1:
+                        for position, cell in enumerate(element.iter(f"{XlsxReader.NS_MAIN}c")):
+                            reference = cell.get("r")
+                            column = XlsxReader.columnIndex(reference) if reference else position
+                            cellType, value = XlsxReader.cellValue(cell)
+                            if cellType is not None:
+                                cells.append((column, cellType, value))
+                        break
+
+                    complete = False
+                    break
+
+            strings = XlsxReader.readSharedStrings(archive, sharedStringsPath,
+                                                   {value for _, cellType, value in cells if cellType == "s"})
+
+        headers = [None] * (max(column for column, _, _ in cells) + 1 if cells else 0)
+
+        for column, cellType, value in cells:
+            headers[column] = strings.get(value) if cellType == "s" else value
+
+        if complete:
+            with XlsxReader.__headersLock:
+                XlsxReader.__headersCache[key] = (stat.st_mtime_ns, stat.st_size, headers)
+                XlsxReader.__headersCache.move_to_end(key)
+                while len(XlsxReader.__headersCache) > XlsxReader.HEADERS_CACHE_SIZE:
+                    XlsxReader.__headersCache.popitem(last=False)
+
+        return list(headers)
+
+    @staticmethod
+    def scanSheet(archive: zipfile.ZipFile, sheetPath: str, columns: set) -> Tuple[Dict[int, list], int]:
+        """
+        Один проход по XML листа. Разбираются только ячейки колонок columns,
+        у остальных проверяется лишь, пустые ли они (чтобы знать последнюю
+        строку данных, как pd.read_excel). Строка заголовков пропускается.
+
+        Args:
+            - archive: zipfile.ZipFile - открытый .xlsx.
+            - sheetPath: str - путь к листу в архиве.
+            - columns: set - номера нужных колонок с нуля.
+
+        Return:
+            - (колонка -> список (строка с единицы, тип, значение), последняя 
+            непустая строка).
+        """
+        cells = {column: [] for column in columns}
+        lastRow = 1
+        row = 0
+
+        tagRow = f"{XlsxReader.NS_MAIN}row"
+        tagValue = f"{XlsxReader.NS_MAIN}v"
+        digits = "0123456789"
+        # Номера колонок по буквам ссылки: "AB" -> 27
+        letters = {}
+
+        with archive.open(sheetPath) as stream:
+            for _, element in ElementTree.iterparse(stream):
+                if element.tag != tagRow:
+                    continue
+
+                row = int(element.get("r", row + 1))
+
+                if row == 1:
+                    element.clear()
+                    continue
+
+                filled = False
+
+                for position, cell in enumerate(element):
+                    reference = cell.get("r")
+
+                    if reference:
+                        letter = reference.rstrip(digits)
+                        column = letters.get(letter)
+                        if column is None:
+                            column = letters[letter] = XlsxReader.columnIndex(letter)
+                    else:
+                        column = position
+
+                    if column in columns:
+                        cellType = cell.get("t")
+
+                        if cellType is None:
+                            value = cell.find(tagValue)
+                            if value is None or value.text is None:
+                                continue
+                            number = float(value.text)
+                            cells[column].append((row, "n", int(number) if number.is_integer() else number))
+                        else:
+                            cellType, value = XlsxReader.cellValue(cell)
+                            if cellType is None:
+                                continue
+                            cells[column].append((row, cellType, value))
+
+                        filled = True
+                    elif not filled and len(cell) != 0:
+                        filled = not XlsxReader.isEmptyCell(cell)
+
+                if filled:
+                    lastRow = row
+
+                element.clear()
+
+        return cells, lastRow
+
+    @staticmethod
+    def readColumns(pathToTable: str, 
+                    numericHeaders: List[str], 
+                    textHeaders: List[str] = []) -> XlsxColumns:
+        """
+        Читает только нужные колонки активного листа одним проходом по XML, 
+        без openpyxl и pd.read_excel. Числовые колонки (оценки, оценки 
+        тестов) сразу пишутся в массивы NumPy с маской пустых ячеек, текстовые
+        (имена, вопросы со свободным ответом) - списками интернированных строк.
+        Остальные колонки не разбираются.
+
+        Args:
+            - pathToTable: str - путь к таблице .xlsx.
+            - numericHeaders: List[str] - заголовки числовых колонок.
+            - textHeaders: List[str] = [] - заголовки текстовых колонок.
+
+        Raise:
+            - Заголовка нет в таблице.
+        Return:
+            - XlsxColumns.
+        """
+        cells, strings, rows = XlsxReader.readCells(pathToTable, list(numericHeaders) + list(textHeaders))
+
+        headersTable = XlsxReader.readHeaders(pathToTable)
+        headers = sorted(cells, key=headersTable.index)
+        result = XlsxColumns(rows, headers)
+
+        for header in numericHeaders:
+            values = np.full(rows, np.nan)
+            missing = np.ones(rows, dtype=bool)
+            rejected = {}
+
+            for row, cellType, value in cells[header]:
+                row -= 2
+                missing[row] = False
+
+                if cellType == "n":
+                    values[row] = value
+                elif cellType == "b":
+                    values[row] = float(value)
+                else:
+                    rejected[row] = strings.get(value) if cellType == "s" else value
+
+            result.numeric[header] = values
+            result.missing[header] = missing
+            result.rejected[header] = rejected
+
+        for header in textHeaders:
+            result.text[header] = XlsxReader.textOf(cells[header], strings, rows)
+
+        return result
+
+    @staticmethod
+    def readCells(pathToTable: str, headers: List[str]) -> Tuple[Dict[str, list], Dict[int, str], int]:
+        """
+        Один проход scanSheet по всем колонкам headers и чтение только 
+        нужных общих строк. Ячейки не переводятся в значения, это делают 
+        readColumns, textOf и nonzeroOf, так что колонки разного назначения 
+        (оценки, оценки тестов, имена) читаются за один проход.
+
+        Raise:
+            - Заголовка нет в таблице.
+        Return:
+            - (заголовок -> список (строка с единицы, тип, значение) как в 
+            scanSheet, номер общей строки -> интернированная строка, 
+            количество строк данных).
+        """
+        headersTable = XlsxReader.readHeaders(pathToTable)
+
+        indexes = {}
+
+        for header in headers:
+            if header not in headersTable:
+                raise BadTable(f"Заголовка '{header}' нет в таблице")
+            indexes[header] = headersTable.index(header)
+
+        with zipfile.ZipFile(pathToTable) as archive:
+            sheetPath, sharedStringsPath = XlsxReader.locateParts(archive)
+
+            cells, lastRow = XlsxReader.scanSheet(archive, sheetPath, set(indexes.values()))
+
+            needed = {value for column in cells.values() for _, cellType, value in column if cellType == "s"}
+            strings = XlsxReader.readSharedStrings(archive, sharedStringsPath, needed)
+
+        strings = {key: sys.intern(value) for key, value in strings.items()}
+
+        return {header: cells[index] for header, index in indexes.items()}, strings, lastRow - 1
+
+    @staticmethod
+    def textOf(cells: list, strings: Dict[int, str], rows: int) -> list:
+        """
+        Текстовая колонка из ячеек readCells: значения Python, строки 
+        интернированы, None для пустых ячеек.
+        """
+        values = [None] * rows
+
+        for row, cellType, value in cells:
+            if cellType == "s":
+                value = strings.get(value)
+            elif cellType == "str":
+                value = sys.intern(value)
+            values[row - 2] = value
+
+        return values
+
+    @staticmethod
+    def nonzeroOf(cells: Dict[str, list], strings: Dict[int, str], headers: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ненулевые числовые ячейки колонок headers из ячеек readCells 
+        тройками (строка с нуля, номер колонки в headers, значение). Текст,
+        который не переводится в число, NaN, бесконечности и нули 
+        отбрасываются.
+        """
+        rows = []
+        columns = []
+        values = []
+
+        for position, header in enumerate(headers):
+            for row, cellType, value in cells[header]:
+                if cellType == "n":
+                    number = value
+                elif cellType == "b":
+                    number = float(value)
+                else:
+                    try:
+                        number = float(strings.get(value) if cellType == "s" else value)
+                    except (TypeError, ValueError):
+                        continue
+
+                if number != 0 and np.isfinite(number):
+                    rows.append(row - 2)
+                    columns.append(position)
+                    values.append(number)
+
+        return (np.array(rows, dtype=np.int64), 
+                np.array(columns, dtype=np.int64), 
+                np.array(values, dtype=float))
+
+    @staticmethod
+    def readNonzero(pathToTable: str, headers: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Читает ненулевые числовые ячейки колонок headers тройками (строка, 
+        колонка, значение) для SparseTable. Пустые ячейки в XML листа не 
+        хранятся, поэтому время и память зависят от количества ответов, а не 
+        от размеров таблицы. Текст, который не переводится в число, NaN, 
+        бесконечности и нули отбрасываются - как fillna(0) и to_numeric в 
+        TableHandler.
+
+        Args:
+            - pathToTable: str - путь к таблице .xlsx.
+            - headers: List[str] - заголовки колонок.
+
+        Raise:
+            - Заголовка нет в таблице.
+        Return:
+            - (строки с нуля, номера колонок в headers, значения, количество 
+            строк данных).
+        """
+        cells, strings, rows = XlsxReader.readCells(pathToTable, headers)
+
+        return XlsxReader.nonzeroOf(cells, strings, headers) + (rows,)
@@ -0,0 +1,73 @@
+"""
+Запуск заданий научениеметрии из командной строки:
+
+```
+python -m module jobs.json --jobs 4
+python -m module jobs.toml --validate
+python -m module jobs.json --pipeline --readers 2 --writers 2
+```
+"""
+import sys
+import argparse
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from .JobRunner import JobRunner as JobRunner
+from .Pipeline import Pipeline as Pipeline
+from .Exceptions.BadTable import BadTable as BadTable
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m module",
+                                     description="Научениеметрия по файлу заданий (.json или .toml)")
+    parser.add_argument("jobFile", help="файл заданий .json или .toml")
+    parser.add_argument("--jobs", type=int, default=1, dest="countJobs",
+                        help="количество заданий, выполняемых параллельно")
+    parser.add_argument("--validate", action="store_true",
+                        help="только проверить задания по строке заголовков таблиц")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="выполнять задания конвейером: чтение, вычисления и запись одновременно")
+    parser.add_argument("--readers", type=int, default=2, dest="countReaders",
+                        help="потоки чтения таблиц для --pipeline")
+    parser.add_argument("--writers", type=int, default=2, dest="countWriters",
+                        help="потоки записи файлов для --pipeline")
+    parser.add_argument("--queue", type=int, default=2, dest="queueSize",
+                        help="размер очередей между этапами для --pipeline")
+
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = JobRunner.loadJobs(args.jobFile)
+    except (BadTable, OSError, ValueError) as error:
+        print(f"FAIL {args.jobFile}: {error}")
+        return 2
+
+    pipeline = None
+
+    if args.pipeline and not args.validate:
+        pipeline = Pipeline(args.countReaders, args.countWriters, args.queueSize)
+        results = pipeline.run(jobs)
+    else:
+        results = JobRunner.run(jobs, args.countJobs, args.validate)
+
+    for name, error in results:
+        if error is None:
+            print(f"OK   {name}")
+        else:
+            print(f"FAIL {name}: {error}")
+
+    if pipeline is not None:
+        stats = pipeline.stats
+        for stage in Pipeline.STAGES:
+            x = stats[stage]
+            print(f"{stage:8} threads {x['threads']}  items {x['items']}  busy {x['busy']:.2f}s  "
+                  f"blocked {x['blocked']:.2f}s  utilization {x['utilization']:.0%}")
+        print(f"total    {stats['seconds']:.2f}s")
+
+    return 1 if any(error is not None for _, error in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from module.TableHandler import TableHandler
+from module.GradingPolicy import GradingPolicy
+
+
+COUNT_QUESTIONS = 7
+
+# Пик памяти построителя в блоках студенты x вопросы float64. Построители
+# оценок: копия колонок вопросов (1 блок) и новые колонки с временными
+# массивами размера колонки. Таблицы для просмотра: таблица после concat и
+# колонки Sum, Average, Round. LSI/LTI: массив таблицы и части строк. Лишняя
+# копия блока выводит за бюджет.
+BUDGETS_TABLES = {"createTableGradesStudents": 2,
+                  "createTableGradesTest": 2,
+                  "createTableGradesStudentsPolicies": 2,
+                  "createTableGradesStudentsToView": 3,
+                  "createTableGradesTestToView": 3,
+                  "createTableLtiLsti": 2}
+
+# Три политики: ещё 4 колонки результата
+BUDGET_THREE_POLICIES = 3
+
+# Пик памяти экспорта в байтах на записанную ячейку .xlsx: в основном объекты
+# ячеек openpyxl, около 300 байт на ячейку
+BUDGETS_EXPORTS = {"export_TableGradesStudent": 400,
+                   "export_TableGradesTest": 400,
+                   "export_TableLtiLsi": 400}
+
+BUDGET_CONCLUSION = 400
+
+
+def createHandler(countStudents):
+    rng = np.random.default_rng(0)
+    grades = rng.integers(0, 11, (countStudents, COUNT_QUESTIONS)).astype(float)
+    tests = rng.integers(0, 6, (countStudents, COUNT_QUESTIONS)).astype(float)
+    return TableHandler.fromArrays(grades, tests, [f"Студент {i}" for i in range(countStudents)])
+
+
+def measurePeak(function):
+    # Первый вызов без замера: кеши pandas и matplotlib не считаются
+    function()
+
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return result, peak
+
+
+@pytest.fixture(scope="module")
+def bigHandler():
+    return createHandler(20000)
+
+
+@pytest.fixture(scope="module")
+def smallHandler():
+    return createHandler(300)
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS_TABLES))
+def test_table_peak_within_budget(bigHandler, name):
+    if name.endswith("Policies"):
+        function = lambda: getattr(bigHandler, name)([bigHandler.policy])
+    else:
+        function = getattr(bigHandler, name)
+
+    _, peak = measurePeak(function)
+
+    block = 20000 * COUNT_QUESTIONS * 8
+
+    assert peak <= BUDGETS_TABLES[name] * block, f"{name}: {peak / block:.2f} блоков"
+
+
+def test_three_policies_peak_within_budget(bigHandler):
+    policies = [GradingPolicy(5, 0.5), GradingPolicy(10, 0.5), GradingPolicy(100, 0.7)]
+
+    _, peak = measurePeak(lambda: bigHandler.createTableGradesStudentsPolicies(policies))
+
+    block = 20000 * COUNT_QUESTIONS * 8
+
+    assert peak <= BUDGET_THREE_POLICIES * block, f"{peak / block:.2f} блоков"
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS_EXPORTS))
+def test_export_peak_within_budget(smallHandler, name, tmp_path):
+    files = iter(range(2))
+    table, peak = measurePeak(lambda: getattr(smallHandler, name)(str(tmp_path / f"{next(files)}.xlsx")))
+
+    cells = table.size + table.shape[1]
+
+    assert peak <= BUDGETS_EXPORTS[name] * cells, f"{name}: {peak / cells:.0f} байт на ячейку"
+
+
+def test_conclusion_peak_within_budget(smallHandler, tmp_path):
+    folders = iter(["first", "second"])
+    table, peak = measurePeak(lambda: smallHandler.export_TableConclusion("Conclusion.xlsx", str(tmp_path / next(folders)), exportOriginal=False))
+
+    cells = table.size + table.shape[1]
+
+    assert peak <= BUDGET_CONCLUSION * cells, f"{peak / cells:.0f} байт на ячейку"
@@ -0,0 +1,104 @@
+import os
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from module.TableHandler import TableHandler
+from module.CohortArchive import CohortArchive
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+COUNT_PROCESSES = 4
+
+
+def createHandler():
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    return TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+@pytest.fixture(scope="module")
+def handler():
+    return createHandler()
+
+
+def appendInProcess(root, semester):
+    try:
+        CohortArchive(root).append(createHandler(), "ОТС", semester)
+        return True
+    except FileExistsError:
+        return False
+
+
+def test_trend_question_by_header_number(handler, tmp_path):
+    archive = CohortArchive(str(tmp_path))
+    record = archive.append(handler, "ОТС", "2024-1")
+
+    view = handler.createTableGradesStudentsToView()
+    tests = handler.createTableGradesTestToView()
+    policy = handler.policy
+
+    assert record["questions"][0].startswith("2.")
+    assert record["questionsTests"][0].startswith("3.")
+
+    trend = archive.trend(policy.nameAverage, question=4, cohort="ОТС")
+    assert trend[policy.nameAverage].tolist() == [view[record["questions"][1]].iloc[-1]]
+
+    trend = archive.trend("Tests " + policy.nameAverage, question=3, cohort="ОТС")
+    assert trend["Tests " + policy.nameAverage].tolist() == [tests[record["questionsTests"][0]].iloc[-1]]
+
+    # Вопроса 1 нет среди оценок, а позиции колонок номером не считаются
+    assert archive.trend(policy.nameAverage, question=1).empty
+
+
+def test_orphan_partition_is_recovered(handler, tmp_path):
+    root = str(tmp_path)
+    archive = CohortArchive(root)
+    archive.append(handler, "ОТС", "2024-1")
+    archive.append(handler, "ОТС", "2024-2")
+
+    index = os.path.join(root, CohortArchive.INDEX_FILE)
+
+    with open(index, "rb") as file:
+        lines = file.read().splitlines(keepends=True)
+
+    # Упали после переименования раздела, на середине строки индекса
+    with open(index, "wb") as file:
+        file.write(lines[0] + lines[1][:len(lines[1]) // 2])
+
+    reopened = CohortArchive(root)
+
+    assert [x["semester"] for x in reopened.partitions()] == ["2024-1", "2024-2"]
+
+    with open(index, encoding="utf-8") as file:
+        assert [json.loads(x)["semester"] for x in file] == ["2024-1", "2024-2"]
+
+    with pytest.raises(FileExistsError):
+        reopened.append(handler, "ОТС", "2024-2")
+
+
+def test_temporary_partition_is_ignored(handler, tmp_path):
+    root = str(tmp_path)
+    CohortArchive(root).append(handler, "ОТС", "2024-1")
+
+    shutil.copytree(os.path.join(root, "ОТС", "2024-1"), os.path.join(root, "ОТС", "2024-2.tmp-1-1"))
+
+    assert [x["semester"] for x in CohortArchive(root).partitions()] == ["2024-1"]
+
+
+def test_concurrent_appends_from_processes(tmp_path):
+    root = str(tmp_path)
+    semesters = ["2024-1", "2024-2", "2024-1", "2024-2", "2025-1", "2025-1"]
+
+    with ProcessPoolExecutor(max_workers=COUNT_PROCESSES) as executor:
+        results = list(executor.map(appendInProcess, [root] * len(semesters), semesters))
+
+    assert results.count(True) == 3
+
+    with open(os.path.join(root, CohortArchive.INDEX_FILE), encoding="utf-8") as file:
+        indexed = sorted(json.loads(x)["semester"] for x in file)
+
+    assert indexed == ["2024-1", "2024-2", "2025-1"]
+    assert sorted(os.listdir(os.path.join(root, "ОТС"))) == ["2024-1", "2024-2", "2025-1"]
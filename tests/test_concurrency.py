@@ -0,0 +1,166 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.FileExport import FileExport
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+COUNT_THREADS = 8
+COUNT_ROUNDS = 4
+
+
+@pytest.fixture(scope="module")
+def handler():
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    return TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+TABLES = ["createTableGradesStudents",
+          "createTableGradesTest",
+          "createTableGradesStudentsToView",
+          "createTableGradesTestToView",
+          "createTableLtiLsti"]
+
+CHARTS = ["export_PngPieBRSO",
+          "export_PngPieOTS",
+          "export_PngPopularityTests"]
+
+
+def runTask(handler, task, folder):
+    kind, name = task
+
+    if kind == "table":
+        return getattr(handler, name)()
+
+    file = os.path.join(folder, f"{name}_{threading.get_ident()}_{os.urandom(4).hex()}.png")
+    getattr(handler, name)(file)
+
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def test_mixed_workload_matches_single_thread(handler, tmp_path):
+    tasks = [("table", name) for name in TABLES] + [("chart", name) for name in CHARTS]
+
+    reference = {task: runTask(handler, task, tmp_path) for task in tasks}
+
+    workload = tasks * COUNT_ROUNDS
+    with ThreadPoolExecutor(max_workers=COUNT_THREADS) as executor:
+        results = list(executor.map(lambda task: (task, runTask(handler, task, tmp_path)), workload))
+
+    assert len(results) == len(workload)
+
+    for task, value in results:
+        if task[0] == "table":
+            pd.testing.assert_frame_equal(value, reference[task], check_exact=True)
+        else:
+            assert value == reference[task]
+
+
+def test_data_table_is_read_only(handler):
+    table = handler.dataTable
+    before = handler.dataTable.copy(deep=True)
+
+    with pytest.raises(ValueError):
+        table.iloc[0, 2] = -1
+
+    with pytest.raises(ValueError):
+        table.loc[0, table.columns[0]] = -1
+
+    with pytest.raises(ValueError):
+        table[table.columns[2]].values[0] = -1
+
+    with pytest.raises(ValueError):
+        table.iloc[:, 2].to_numpy()[0] = -1
+
+    pd.testing.assert_frame_equal(handler.dataTable, before)
+
+
+def test_one_thread_wins_same_output_path(handler, tmp_path):
+    file = str(tmp_path / "BRSOpie.png")
+    barrier = threading.Barrier(COUNT_THREADS)
+
+    def export():
+        barrier.wait()
+        try:
+            handler.export_PngPieBRSO(file)
+            return True
+        except FileExistsError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=COUNT_THREADS) as executor:
+        results = list(executor.map(lambda _: export(), range(COUNT_THREADS)))
+
+    assert results.count(True) == 1
+    assert os.listdir(tmp_path) == ["BRSOpie.png"]
+    assert os.path.getsize(file) > 0
+
+
+def test_one_thread_wins_same_table_path(handler, tmp_path):
+    file = str(tmp_path / "StudentsGrades.xlsx")
+    barrier = threading.Barrier(COUNT_THREADS)
+
+    def export():
+        barrier.wait()
+        try:
+            handler.export_TableGradesStudent(file)
+            return True
+        except FileExistsError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=COUNT_THREADS) as executor:
+        results = list(executor.map(lambda _: export(), range(COUNT_THREADS)))
+
+    assert results.count(True) == 1
+    assert os.listdir(tmp_path) == ["StudentsGrades.xlsx"]
+    assert pd.read_excel(file).shape == handler.createTableGradesStudentsToView().shape
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    file = str(tmp_path / "broken.xlsx")
+
+    def write(output):
+        output.write(b"partial")
+        raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError):
+        FileExport.writeExclusive(file, write)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_existing_file_is_not_overwritten(handler, tmp_path):
+    file = tmp_path / "LsiLti.xlsx"
+    file.write_bytes(b"keep")
+
+    with pytest.raises(FileExistsError):
+        handler.export_TableLtiLsi(str(file))
+
+    assert file.read_bytes() == b"keep"
+    assert os.listdir(tmp_path) == ["LsiLti.xlsx"]
+
+
+def test_original_artifacts_do_not_change_handler(handler, tmp_path):
+    before = handler.dataTable.copy(deep=True)
+    column = before.columns[1]
+
+    tables = handler.export_ReportBundle(str(tmp_path / "Report.xlsx"), exportOriginal=True)
+    original = tables["Original"]
+    original["Injected"] = 1
+    original.rename(columns={column: "Renamed"}, inplace=True)
+
+    artifact = next(x for x in handler.export_Stream(exportOriginal=True, names=["Original"]) if x.name == "Original")
+    artifact.value.drop(columns=[column], inplace=True)
+
+    pd.testing.assert_frame_equal(handler.dataTable, before)
+
+    handler.export_ReportBundle(str(tmp_path / "Second.xlsx"), exportOriginal=True)
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "Second.xlsx", sheet_name="Original"),
+                                  pd.read_excel(PATH_TO_TABLE))
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+TABLES = ["createTableGradesStudents",
+          "createTableGradesTest",
+          "createTableGradesStudentsToView",
+          "createTableGradesTestToView",
+          "createTableLtiLsti"]
+
+
+@pytest.fixture(scope="module")
+def headers():
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    return headers[2:16:2], headers[3:16:2], headers[0]
+
+
+def results(handler):
+    return [getattr(handler, name)() for name in TABLES]
+
+
+def assertSameResults(left, right):
+    for a, b in zip(left, right):
+        pd.testing.assert_frame_equal(a, b, check_exact=True)
+
+
+def test_from_data_frame_matches_file(headers):
+    grades, tests, names = headers
+    table = pd.read_excel(PATH_TO_TABLE)
+
+    assertSameResults(results(TableHandler(PATH_TO_TABLE, grades, tests, names)), 
+                      results(TableHandler.fromDataFrame(table, grades, tests, names)))
+
+
+def test_from_data_frame_owns_its_copy(headers):
+    grades, tests, names = headers
+    table = pd.read_excel(PATH_TO_TABLE)
+
+    handler = TableHandler.fromDataFrame(table, grades, tests, names)
+    expected = results(handler)
+
+    for header in grades + tests:
+        assert not np.shares_memory(table[header].to_numpy(), handler.dataTable[header].to_numpy())
+
+    table.loc[:, grades + tests] = 0
+    table.iloc[0, 0] = -1
+
+    assertSameResults(results(handler), expected)
+
+
+def test_from_arrays_owns_its_copy():
+    rng = np.random.default_rng(0)
+    grades = rng.integers(0, 11, (50, 4)).astype(float)
+    tests = rng.integers(0, 6, (50, 4)).astype(float)
+    names = np.array([f"Студент {i}" for i in range(50)], dtype=object)
+
+    handler = TableHandler.fromArrays(grades, tests, names)
+    expected = results(handler)
+
+    grades[:] = 1
+    tests[:] = 1
+    names[:] = "Другой"
+
+    assertSameResults(results(handler), expected)
+    assert handler.dataTable["Students"].iloc[0] == "Студент 0"
+
+
+def test_from_arrays_without_copy_shares_fortran_arrays():
+    grades = np.asfortranarray(np.arange(12, dtype=float).reshape(4, 3))
+    tests = np.asfortranarray(np.ones((4, 3)))
+
+    handler = TableHandler.fromArrays(grades, tests, copy=False)
+
+    assert np.shares_memory(grades, handler.dataTable["Grade 1"].to_numpy())
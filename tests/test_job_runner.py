@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from module.JobRunner import JobRunner
+from module.TableHandler import TableHandler
+from module.Exceptions.BadTable import BadTable
+from module.Exceptions.BadNameHeaders import BadNameHeaders
+
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+PATH_TO_TABLE = os.path.abspath(os.path.join(ROOT, "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx"))
+
+HEADERS = ["N", "1. Группа", "2. Оценка", "3. Тест", "4. Оценка", "5. Тест", "Комментарий"]
+
+
+def job(name, path, **options):
+    return dict({"name": name,
+                 "table": PATH_TO_TABLE,
+                 "names": "headers[0]",
+                 "grades": "headers[2:16:2]",
+                 "tests": "headers[3:16:2]",
+                 "export": {"path": path},
+                 "charts": ["BRSO", "Motivation"]}, **options)
+
+
+def writeJobs(folder, jobs, name="jobs.json"):
+    path = os.path.join(folder, name)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"jobs": jobs}, file, ensure_ascii=False)
+    return path
+
+
+def runCli(*args):
+    return subprocess.run([sys.executable, "-m", "module", *args], cwd=ROOT, capture_output=True, text=True, timeout=300)
+
+
+@pytest.mark.parametrize("selectors, expected", [("headers[0]", ["N"]),
+                                                 ("headers[-1]", ["Комментарий"]),
+                                                 ("headers[ 2 ]", ["2. Оценка"]),
+                                                 ("headers[2:6:2]", ["2. Оценка", "4. Оценка"]),
+                                                 ("headers[3::2]", ["3. Тест", "5. Тест"]),
+                                                 ("headers[:2]", ["N", "1. Группа"]),
+                                                 ("headers[-2:]", ["5. Тест", "Комментарий"]),
+                                                 (4, ["4. Оценка"]),
+                                                 ("Комментарий", ["Комментарий"]),
+                                                 (["headers[2]", 5, "N"], ["2. Оценка", "5. Тест", "N"])])
+def test_select_headers(selectors, expected):
+    assert JobRunner.selectHeaders(HEADERS, selectors) == expected
+
+
+@pytest.mark.parametrize("selectors", ["headers[10]", "headers[5:2]", "headers[]", "headers[a]",
+                                       "Нет такого", 9, True, ["headers[2]", "headers[-10]"]])
+def test_select_headers_errors(selectors):
+    with pytest.raises(BadNameHeaders):
+        JobRunner.selectHeaders(HEADERS, selectors)
+
+
+def test_load_jobs(tmp_path):
+    path = writeJobs(str(tmp_path), [{"table": "tables/group.xlsx", "grades": [2], "tests": [3]}])
+
+    jobs = JobRunner.loadJobs(path)
+
+    assert jobs[0]["name"] == "group"
+    assert jobs[0]["table"] == os.path.join(str(tmp_path), "tables/group.xlsx")
+    assert jobs[0]["export"]["path"] == os.path.join(str(tmp_path), "./")
+
+    toml = tmp_path / "jobs.toml"
+    toml.write_text('[[jobs]]\nname = "A"\ntable = "a.xlsx"\ngrades = [2]\ntests = [3]\n'
+                    '[jobs.export]\npath = "out"\n', encoding="utf-8")
+
+    jobs = JobRunner.loadJobs(str(toml))
+
+    assert jobs[0]["name"] == "A"
+    assert jobs[0]["export"]["path"] == os.path.join(str(tmp_path), "out")
+
+
+@pytest.mark.parametrize("content, name", [({"jobs": []}, "jobs.json"),
+                                           ({"jobs": [{"table": "a.xlsx", "grades": [2]}]}, "jobs.json"),
+                                           ({"jobs": [{"table": "a.xlsx", "grades": [2], "tests": [3]}]}, "jobs.yaml")])
+def test_load_jobs_errors(tmp_path, content, name):
+    path = tmp_path / name
+    path.write_text(json.dumps(content), encoding="utf-8")
+
+    with pytest.raises(BadTable):
+        JobRunner.loadJobs(str(path))
+
+
+def test_validate(tmp_path):
+    good = job("good", str(tmp_path / "good"))
+    badHeader = job("badHeader", str(tmp_path / "bad"), grades=["headers[2:16:2]", "Нет такого"])
+    badChart = job("badChart", str(tmp_path / "bad"), charts=["Pie"])
+    noBenefits = job("noBenefits", str(tmp_path / "bad"), charts=["Benefits"], benefits={"question": "17. Другой вопрос"})
+
+    existing = job("existing", str(tmp_path))
+    (tmp_path / "BRSO.png").write_bytes(b"keep")
+
+    results = dict(JobRunner.run([good, badHeader, badChart, noBenefits, existing], validate=True))
+
+    assert results["good"] is None
+    assert isinstance(results["badHeader"], BadNameHeaders)
+    assert isinstance(results["badChart"], BadNameHeaders)
+    assert isinstance(results["noBenefits"], BadNameHeaders)
+    assert isinstance(results["existing"], FileExistsError)
+    assert sorted(os.listdir(tmp_path)) == ["BRSO.png"]
+
+
+def test_run_in_parallel_matches_sequential(tmp_path):
+    jobs = [job(f"group{i}", str(tmp_path / f"group{i}")) for i in range(3)]
+
+    results = JobRunner.run(jobs, countJobs=2)
+
+    assert results == [(x["name"], None) for x in jobs]
+
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    handler = TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+    for x in jobs:
+        assert sorted(os.listdir(x["export"]["path"])) == sorted(["Сonclusion.xlsx", "original.xlsx", "BRSO.png",
+                                                                  "Motivation.png", "Education.png"])
+
+    handler.export_PngPieBRSO(str(tmp_path / "BRSO.png"))
+
+    for x in jobs:
+        with open(os.path.join(x["export"]["path"], "BRSO.png"), "rb") as file:
+            assert file.read() == (tmp_path / "BRSO.png").read_bytes()
+
+
+def test_cli_validate_and_run(tmp_path):
+    path = writeJobs(str(tmp_path), [job("A", "A"), job("B", "B")])
+
+    result = runCli(path, "--validate")
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.splitlines() == ["OK   A", "OK   B"]
+    assert sorted(os.listdir(tmp_path)) == ["jobs.json"]
+
+    result = runCli(path, "--jobs", "2")
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.splitlines() == ["OK   A", "OK   B"]
+    assert os.path.isfile(tmp_path / "A" / "Сonclusion.xlsx")
+    assert os.path.isfile(tmp_path / "B" / "Education.png")
+
+    # Второй запуск: файлы уже есть
+    result = runCli(path, "--validate")
+
+    assert result.returncode == 1
+    assert all(x.startswith("FAIL ") for x in result.stdout.splitlines())
+
+
+def test_cli_exit_codes(tmp_path):
+    path = writeJobs(str(tmp_path), [job("A", "A"), job("B", "B", tests=["Нет такого"])])
+
+    result = runCli(path, "--validate")
+
+    assert result.returncode == 1
+    assert result.stdout.splitlines()[0] == "OK   A"
+    assert result.stdout.splitlines()[1].startswith("FAIL B: ")
+
+    result = runCli(str(tmp_path / "missing.json"))
+
+    assert result.returncode == 2
+    assert result.stdout.startswith("FAIL ")
+
+    result = runCli(writeJobs(str(tmp_path), [], "empty.json"), "--validate")
+
+    assert result.returncode == 2
+
+    result = runCli()
+
+    assert result.returncode == 2
+    assert "usage" in result.stderr
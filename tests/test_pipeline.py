@@ -0,0 +1,131 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from module.Pipeline import Pipeline
+from module.JobRunner import JobRunner
+from module.TableHandler import TableHandler
+
+
+PATH_TO_TABLE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx"))
+
+FILES = ["Сonclusion.xlsx", "original.xlsx", "BRSO.png", "OTS.png", "Popularity.png", "Motivation.png", "Education.png"]
+
+
+class Stop(BaseException):
+    """
+    Прерывание конвейера извне (как KeyboardInterrupt).
+    """
+
+
+def job(name, path, **options):
+    return dict({"name": name,
+                 "table": PATH_TO_TABLE,
+                 "names": "headers[0]",
+                 "grades": "headers[2:16:2]",
+                 "tests": "headers[3:16:2]",
+                 "export": {"path": path}}, **options)
+
+
+def pipelineThreads():
+    return [x for x in threading.enumerate() if x is not threading.main_thread() and x.daemon]
+
+
+def test_pipeline_matches_job_runner(tmp_path):
+    jobs = [job(f"group{i}", str(tmp_path / f"group{i}")) for i in range(3)]
+    reference = job("reference", str(tmp_path / "reference"))
+
+    pipeline = Pipeline(countReaders=2, countWriters=2, queueSize=1)
+
+    assert pipeline.run(jobs) == [(x["name"], None) for x in jobs]
+    assert JobRunner.run([reference]) == [("reference", None)]
+
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    handler = TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+    handler.export_TableConclusion("Сonclusion.xlsx", str(tmp_path / "handler"))
+
+    for x in jobs:
+        folder = x["export"]["path"]
+
+        assert sorted(os.listdir(folder)) == sorted(FILES)
+
+        pd.testing.assert_frame_equal(pd.read_excel(os.path.join(folder, "Сonclusion.xlsx")),
+                                      pd.read_excel(tmp_path / "handler" / "Сonclusion.xlsx"))
+        pd.testing.assert_frame_equal(pd.read_excel(os.path.join(folder, "original.xlsx")),
+                                      pd.read_excel(PATH_TO_TABLE))
+
+        for file in FILES[2:]:
+            with open(os.path.join(folder, file), "rb") as output, open(tmp_path / "reference" / file, "rb") as expected:
+                assert output.read() == expected.read(), file
+
+    stats = pipeline.stats
+
+    assert stats["read"]["items"] == 3
+    assert stats["compute"]["items"] == 3
+    assert stats["write"]["items"] == 3 * len(FILES)
+    assert all(0 <= stats[x]["utilization"] <= 1 for x in Pipeline.STAGES)
+
+
+def test_errors_of_stages_are_results(tmp_path):
+    existing = tmp_path / "existing"
+    existing.mkdir()
+    (existing / "BRSO.png").write_bytes(b"keep")
+
+    jobs = [job("ok", str(tmp_path / "ok")),
+            job("read", str(tmp_path / "read"), table=str(tmp_path / "missing.xlsx")),
+            job("compute", str(tmp_path / "compute"), charts=["Benefits"], benefits={"question": "17. Другой вопрос"}),
+            job("write", str(existing))]
+
+    before = len(pipelineThreads())
+
+    results = dict(Pipeline(countReaders=2, countWriters=2, queueSize=1).run(jobs))
+
+    assert results["ok"] is None
+    assert isinstance(results["read"], OSError)
+    assert isinstance(results["compute"], KeyError)
+    assert isinstance(results["write"], FileExistsError)
+
+    assert sorted(os.listdir(tmp_path / "ok")) == sorted(FILES)
+    assert not os.path.exists(tmp_path / "read")
+    assert not os.path.exists(tmp_path / "compute")
+    assert (existing / "BRSO.png").read_bytes() == b"keep"
+    assert len(os.listdir(existing)) == len(FILES)
+
+    assert len(pipelineThreads()) == before
+
+
+@pytest.mark.parametrize("queueSize", [1, 2])
+def test_interrupted_compute_stops_readers_and_writers(tmp_path, monkeypatch, queueSize):
+    jobs = [job(f"group{i}", str(tmp_path / f"group{i}")) for i in range(8)]
+    loaded = []
+    computed = []
+    computeJob = Pipeline.computeJob
+    loadJob = JobRunner.loadJob
+
+    def countedLoad(job):
+        loaded.append(job["name"])
+        return loadJob(job)
+
+    def interrupted(job, handler):
+        computed.append(job["name"])
+        if len(computed) > 1:
+            raise Stop()
+        return computeJob(job, handler)
+
+    monkeypatch.setattr(JobRunner, "loadJob", countedLoad)
+    monkeypatch.setattr(Pipeline, "computeJob", interrupted)
+
+    before = len(pipelineThreads())
+
+    with pytest.raises(Stop):
+        Pipeline(countReaders=2, countWriters=2, queueSize=queueSize).run(jobs)
+
+    assert len(pipelineThreads()) == before
+    # Очередь ограничена: прочитано не больше, чем в ней помещается, плюс
+    # таблицы в руках потоков чтения
+    assert len(loaded) <= 2 + queueSize + 2
+    # Файлы задания, посчитанного до прерывания, дописаны
+    assert os.listdir(tmp_path) == [computed[0]]
+    assert sorted(os.listdir(tmp_path / computed[0])) == sorted(FILES)
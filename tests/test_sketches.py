@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pytest
+
+from module.TableHandler import TableHandler
+from module.QuantileSketch import QuantileSketch
+from module.IntegerHistogram import IntegerHistogram
+from module.Exceptions.BadNameHeaders import BadNameHeaders
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+ERROR = 0.01
+COUNT_VALUES = 50_000
+COUNT_PARTS = 200
+
+
+def rankError(sketch, values):
+    values = np.sort(values)
+    probes = np.quantile(values, np.linspace(0, 1, 1001))
+    expected = np.searchsorted(values, probes, side="right") / len(values)
+    return np.max(np.abs(sketch.rank(probes) - expected))
+
+
+def datasets():
+    rng = np.random.default_rng(7)
+    return [rng.normal(size=COUNT_VALUES), rng.lognormal(size=COUNT_VALUES), rng.uniform(size=COUNT_VALUES)]
+
+
+@pytest.mark.parametrize("values", datasets())
+def test_sketch_rank_error_is_bounded(values):
+    sketch = QuantileSketch(ERROR).update(values)
+
+    assert sketch.count == len(values)
+    assert sketch.size < len(values) // 20
+    assert rankError(sketch, values) <= ERROR
+
+
+@pytest.mark.parametrize("values", datasets())
+def test_merged_sketch_rank_error_is_bounded(values):
+    parts = [QuantileSketch(ERROR, seed=i).update(x) for i, x in enumerate(np.array_split(values, COUNT_PARTS))]
+
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+
+    assert merged.count == len(values)
+    assert merged.min == values.min() and merged.max == values.max()
+    assert rankError(merged, values) <= ERROR
+
+
+def test_small_sketch_is_exact():
+    values = datasets()[1][:QuantileSketch(ERROR).k]
+    sketch = QuantileSketch(ERROR).update(values)
+
+    q = np.linspace(0, 1, 101)
+    assert sketch.size == len(values)
+    np.testing.assert_array_equal(sketch.quantile(q), np.quantile(values, q, method="inverted_cdf"))
+
+
+def test_sketch_round_trips_through_dict():
+    values = datasets()[0]
+    sketch = QuantileSketch(ERROR).update(values)
+    restored = QuantileSketch.fromDict(sketch.toDict())
+
+    q = np.linspace(0, 1, 101)
+    np.testing.assert_array_equal(restored.quantile(q), sketch.quantile(q))
+    assert restored.count == sketch.count
+
+
+def test_histogram_merge_is_exact():
+    rng = np.random.default_rng(3)
+    left, right = rng.integers(0, 6, 1000), rng.integers(3, 11, 700)
+
+    merged = IntegerHistogram().update(left).merge(IntegerHistogram().update(right))
+    expected = IntegerHistogram().update(np.concatenate([left, right]))
+
+    assert merged.counts() == expected.counts()
+
+    values = np.concatenate([left, right])
+    q = np.linspace(0, 1, 21)
+    np.testing.assert_array_equal(merged.quantile(q), np.quantile(values, q, method="inverted_cdf"))
+    np.testing.assert_array_equal(merged.rank(np.arange(12)), [np.mean(values <= x) for x in range(12)])
+
+
+def test_histogram_merge_with_sketch_gives_sketch():
+    histogram = IntegerHistogram().update([1, 2, 2, 3])
+    sketch = QuantileSketch(ERROR).update([2.5, 4.5])
+
+    for merged in (histogram.merge(sketch), sketch.merge(histogram)):
+        assert isinstance(merged, QuantileSketch)
+        assert merged.count == 6
+        assert merged.quantile(0.5) == 2
+
+
+def test_histogram_range_is_bounded():
+    with pytest.raises(BadNameHeaders):
+        IntegerHistogram().update([0, IntegerHistogram.MAX_RANGE])
+
+    histogram = IntegerHistogram().update([0])
+
+    with pytest.raises(BadNameHeaders):
+        histogram.update([3 * 10 ** 8])
+
+    assert histogram.counts() == {0: 1}
+    assert IntegerHistogram().update([0, IntegerHistogram.MAX_RANGE - 1]).size == IntegerHistogram.MAX_RANGE
+
+    merged = IntegerHistogram().update([0]).merge(IntegerHistogram().update([3 * 10 ** 8]))
+
+    assert isinstance(merged, QuantileSketch)
+    assert merged.count == 2
+    assert merged.min == 0 and merged.max == 3 * 10 ** 8
+
+
+def test_handler_sketches_are_built_at_load():
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    handler = TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+    sketches = handler.sketches()
+
+    assert handler.sketches(TableHandler.SKETCH_ERROR) is sketches
+    assert handler.sketches(0.05) is handler.sketches(0.05)
+
+    grades = handler.createTableGradesStudents()
+    for name in ["Sum", handler.policy.nameAverage, handler.policy.nameRound]:
+        values = grades[name].to_numpy(dtype=float)
+        np.testing.assert_array_equal(sketches[name].quantile([0.25, 0.5, 0.75]),
+                                      np.quantile(values, [0.25, 0.5, 0.75], method="inverted_cdf"))
+
+    merged = TableHandler.mergeSketches([sketches, sketches])
+
+    name = handler.policy.nameRound
+
+    assert isinstance(merged[name], IntegerHistogram)
+    assert merged[name].counts() == {x: 2 * y for x, y in sketches[name].counts().items()}
+    assert merged["Grades"].count == 2 * sketches["Grades"].count
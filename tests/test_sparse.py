@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.SparseTable import SparseTable
+from module.GradingPolicy import GradingPolicy
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+
+@pytest.fixture(scope="module")
+def headers():
+    return TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+
+
+@pytest.mark.parametrize("policy", [None, GradingPolicy(10, 0.7)])
+def test_sparse_matches_dense(headers, policy):
+    headersGrades, headersTestScore = headers[2:16:2], headers[3:16:2]
+
+    handler = TableHandler(PATH_TO_TABLE, headersGrades, headersTestScore, headers[0], policy=policy)
+    grades, tests, names = TableHandler.readSparse(PATH_TO_TABLE, headersGrades, headersTestScore, headers[0], policy)
+
+    assert names == handler.dataTable[headers[0]].tolist()
+    for sparse in (grades, tests):
+        assert (sparse.policy.gradeConverted, sparse.policy.roundFactor, sparse.policy.nameRound) == \
+               (handler.policy.gradeConverted, handler.policy.roundFactor, handler.policy.nameRound)
+
+    for sparse, dense in ((grades, handler.createTableGradesStudents()), (tests, handler.createTableGradesTest())):
+        table = sparse.createTableSumAverageRound(names)
+        namesColumns = ["Sum", handler.policy.nameAverage, handler.policy.nameRound]
+
+        assert table.columns.tolist() == ["Students"] + namesColumns
+        np.testing.assert_allclose(table["Sum"], dense["Sum"], rtol=1e-12)
+        np.testing.assert_allclose(table[namesColumns[1]], dense[namesColumns[1]], rtol=1e-12)
+        np.testing.assert_array_equal(table[namesColumns[2]], dense[namesColumns[2]])
+        np.testing.assert_array_equal(sparse.toDense(), dense[sparse.headers].to_numpy(dtype=float))
+
+    tableLsi, seriesLti = SparseTable.createTableLtiLsti(grades, tests, names)
+    dense = handler.createTableLtiLsti()
+
+    np.testing.assert_allclose(tableLsi["LSI"], dense["LSI"].to_numpy(dtype=float)[:len(names)], rtol=1e-12)
+    assert seriesLti.index.tolist() == dense.columns[1:].tolist()
+    np.testing.assert_allclose(seriesLti, dense.iloc[-1, 1:].to_numpy(dtype=float), rtol=1e-12)
+
+
+def test_unanswered_question_is_skipped_in_sparse_mode(tmp_path):
+    path = str(tmp_path / "wide.xlsx")
+    headersGrades, headersTestScore = ["1. Оценка", "2. Оценка"], ["1. Тест", "2. Тест"]
+
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(["ФИО", "1. Оценка", "1. Тест", "2. Оценка", "2. Тест"])
+    # На второй вопрос оценок никто не ответил
+    sheet.append(["Иванов", 4, 3, None, 2])
+    sheet.append(["Петров", 2, 5, None, None])
+    sheet.append(["Сидоров", None, 4, None, 1])
+    book.save(path)
+
+    handler = TableHandler(path, headersGrades, headersTestScore, "ФИО")
+    grades, _, names = TableHandler.readSparse(path, headersGrades, headersTestScore, "ФИО")
+
+    policy = handler.policy
+    dense = handler.createTableGradesStudents()
+    sparse = grades.createTableSumAverageRound(names)
+
+    assert dense[policy.nameAverage].isna().all()
+    assert dense[policy.nameRound].isna().all()
+
+    # Пропущенный вопрос даёт ноль, делитель - все вопросы
+    expected = np.array([4, 2, 0]) / 4 * policy.gradeConverted / 2
+
+    np.testing.assert_allclose(sparse[policy.nameAverage], expected, rtol=1e-12)
+    np.testing.assert_array_equal(sparse[policy.nameRound], GradingPolicy.roundValues(expected, policy.roundFactor))
+    np.testing.assert_array_equal(sparse["Sum"], dense["Sum"])
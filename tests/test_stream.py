@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.Exceptions.BadTable import BadTable
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+HEADER_BENEFITS = "17. Какими средствами обучения вы преимущественно пользовались?"
+
+TABLES = ["Original", "Grades", "Tests", "LSI LTI"]
+CHARTS = ["BRSO", "OTS", "Benefits", "Popularity", "Motivation", "Education"]
+
+# Публичные зависимости этапов: график популярности строится по таблице тестов
+DEPENDENCIES = {"Popularity": ["Tests"]}
+
+
+@pytest.fixture(scope="module")
+def headers():
+    return TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+
+
+@pytest.fixture(scope="module")
+def handler(headers):
+    return TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+@pytest.fixture(scope="module")
+def handlerWithoutBenefits(headers):
+    # Как таблица ФИИТ: вопроса про пособия нет, график пособий падает
+    dataTable = pd.read_excel(PATH_TO_TABLE).drop(columns=[HEADER_BENEFITS])
+    return TableHandler.fromDataFrame(dataTable, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+def test_all_artifacts(handler, headers, tmp_path):
+    artifacts = list(handler.export_Stream(str(tmp_path), exportOriginal=True, exportBenefits=True))
+    names = [x.name for x in artifacts]
+
+    assert sorted(names) == sorted(TABLES + CHARTS)
+    assert all(x.ok for x in artifacts)
+    assert sorted(os.listdir(tmp_path)) == sorted([x + ".xlsx" for x in TABLES] + [x + ".png" for x in CHARTS])
+
+    for artifact in artifacts:
+        assert artifact.file == os.path.join(str(tmp_path), os.path.basename(artifact.file))
+        assert os.path.getsize(artifact.file) > 0
+
+    tables = {x.name: x.value for x in artifacts}
+    pd.testing.assert_frame_equal(tables["Grades"], handler.createTableGradesStudentsToView(headers[0]))
+    pd.testing.assert_frame_equal(tables["Tests"], handler.createTableGradesTestToView(headers[0]))
+    pd.testing.assert_frame_equal(tables["LSI LTI"], handler.createTableLtiLsti(headers[0]))
+
+
+def test_artifacts_come_in_order_of_readiness(handler):
+    artifacts = list(handler.export_Stream(exportOriginal=True, exportBenefits=True, countWorkers=3))
+    positions = {x.name: i for i, x in enumerate(artifacts)}
+
+    assert [x.seconds for x in artifacts] == sorted(x.seconds for x in artifacts)
+
+    for name, dependencies in DEPENDENCIES.items():
+        for dependency in dependencies:
+            assert positions[dependency] < positions[name]
+
+
+def test_failed_stage_is_an_artifact(handlerWithoutBenefits, tmp_path):
+    artifacts = {x.name: x for x in handlerWithoutBenefits.export_Stream(str(tmp_path), exportBenefits=True)}
+
+    assert sorted(artifacts) == sorted(["Grades", "Tests", "LSI LTI"] + CHARTS)
+
+    benefits = artifacts.pop("Benefits")
+
+    assert not benefits.ok
+    assert isinstance(benefits.error, KeyError)
+    assert benefits.value is None and benefits.file is None
+    assert all(x.ok for x in artifacts.values())
+    assert "Benefits.png" not in os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path)) == len(artifacts)
+
+
+def test_dependents_of_failed_stage_are_errors(handler, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("таблица не строится")
+
+    monkeypatch.setattr(TableHandler, "createTableToViewFromTable", broken)
+
+    artifacts = {x.name: x for x in handler.export_Stream()}
+
+    assert isinstance(artifacts["Grades"].error, ValueError)
+    assert isinstance(artifacts["Tests"].error, ValueError)
+    assert isinstance(artifacts["Popularity"].error, BadTable)
+    assert all(artifacts[x].ok for x in ["LSI LTI", "BRSO", "OTS", "Motivation", "Education"])
+
+
+def test_only_requested_stages(handler):
+    names = [x.name for x in handler.export_Stream(names=["Popularity"])]
+
+    assert sorted(names) == ["Popularity", "Tests"]
+
+
+@pytest.mark.parametrize("countWorkers", [1, 2, 3])
+def test_worker_count_is_bounded(handler, monkeypatch, countWorkers):
+    lock = threading.Lock()
+    active = [0, 0]
+    threads = set()
+    figureToPng = TableHandler.figureToPng
+
+    def tracked(figure):
+        with lock:
+            active[0] += 1
+            active[1] = max(active)
+            threads.add(threading.get_ident())
+        time.sleep(0.05)
+        try:
+            return figureToPng(figure)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(TableHandler, "figureToPng", tracked)
+
+    artifacts = list(handler.export_Stream(exportBenefits=True, countWorkers=countWorkers))
+
+    assert all(x.ok for x in artifacts)
+    assert active[1] == countWorkers
+    assert len(threads) <= countWorkers
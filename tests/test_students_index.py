@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.StudentsIndex import StudentsIndex
+from module.Exceptions.BadNameHeaders import BadNameHeaders
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+
+@pytest.fixture(scope="module")
+def handler():
+    headers = TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+    return TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+@pytest.fixture(scope="module")
+def table(handler):
+    """
+    Те же показатели, что в индексе, обычной таблицей pandas.
+    """
+    names = ["Sum", handler.policy.nameAverage, handler.policy.nameRound]
+    grades = handler.createTableGradesStudents()
+    tests = handler.createTableGradesTest()
+    lsi = handler.createTableLtiLsti()
+
+    table = pd.DataFrame({"Students": handler.dataTable[TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)[0]]})
+
+    for x in names:
+        table[x] = grades[x].astype(float)
+
+    table["LSI"] = lsi["LSI"].to_numpy()[:len(table)]
+
+    for x in names:
+        table["Tests " + x] = tests[x].astype(float)
+
+    return table
+
+
+@pytest.fixture
+def synthetic():
+    rng = np.random.default_rng(5)
+    values = rng.integers(0, 6, 200).astype(float)
+    values[rng.choice(200, 15, replace=False)] = np.nan
+
+    table = pd.DataFrame({"Students": [f"Студент {i}" for i in range(200)],
+                          "Round": values,
+                          "Average": np.round(rng.uniform(0, 5, 200), 1)})
+
+    return table, StudentsIndex(table["Students"].tolist(), {"Round": table["Round"], "Average": table["Average"]})
+
+
+def assertSameRows(actual, expected, columns):
+    assert actual.index.tolist() == expected.index.tolist()
+    pd.testing.assert_frame_equal(actual[columns], expected[columns], check_exact=True, check_dtype=False)
+
+
+def checkIndex(index, table, columns):
+    for column in columns:
+        valid = table[table[column].notna()]
+
+        for k in (0, 1, 5, len(table), len(table) + 3):
+            for largest in (True, False):
+                expected = valid.sort_values(column, ascending=not largest, kind="stable").head(k)
+                assertSameRows(index.top(column, k, largest), expected, ["Students", column])
+
+        values = valid[column].to_numpy()
+        for low, high in ((None, None), (np.median(values), None), (None, np.median(values)),
+                          (values.min(), values.min()), (values.max() + 1, None), (3, 2)):
+            mask = pd.Series(True, index=valid.index)
+            if low is not None:
+                mask &= valid[column] >= low
+            if high is not None:
+                mask &= valid[column] <= high
+            expected = valid[mask].sort_values(column, kind="stable")
+            assertSameRows(index.range(column, low, high), expected, ["Students", column])
+
+        for student, value in zip(table["Students"].drop_duplicates(), table[column][table["Students"].drop_duplicates().index]):
+            if np.isnan(value):
+                assert np.isnan(index.percentile(column, student))
+            else:
+                assert index.percentile(column, student) == pytest.approx(100.0 * np.mean(values <= value))
+
+
+def checkBuckets(index, table, column):
+    valid = table[table[column].notna()]
+
+    assert index.counts(column) == {int(x): int(y) for x, y in valid[column].value_counts().items()}
+
+    for value in range(-1, 12):
+        assertSameRows(index.bucket(column, value), valid[valid[column] == value], ["Students", column])
+
+
+def test_handler_index_matches_pandas(handler, table):
+    index = handler.query()
+
+    assert index is handler.query()
+    assert set(index.columns) == set(table.columns[1:])
+
+    checkIndex(index, table, index.columns)
+    checkBuckets(index, table, handler.policy.nameRound)
+    checkBuckets(index, table, "Tests " + handler.policy.nameRound)
+
+
+def test_index_with_ties_and_missing_values_matches_pandas(synthetic):
+    table, index = synthetic
+
+    checkIndex(index, table, ["Round", "Average"])
+    checkBuckets(index, table, "Round")
+
+
+def test_index_errors(synthetic):
+    table, index = synthetic
+
+    with pytest.raises(BadNameHeaders):
+        index.top("Нет такого")
+
+    with pytest.raises(BadNameHeaders):
+        index.bucket("Average", 2)
+
+    with pytest.raises(BadNameHeaders):
+        index.percentile("Round", "Нет такого")
+
+    with pytest.raises(BadNameHeaders):
+        StudentsIndex(["А", "Б"], {"Round": [1]})
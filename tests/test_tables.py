@@ -0,0 +1,161 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.GradingPolicy import GradingPolicy
+from module.Exceptions.BadTable import BadTable
+
+
+PATH_TO_TABLE = os.path.join(os.path.dirname(__file__), "..", "resource", "Selection", "Научениеметрия (ОТС)_образец.xlsx")
+
+
+@pytest.fixture(scope="module")
+def headers():
+    return TableHandler.getHeadrsExcelToList(PATH_TO_TABLE)
+
+
+@pytest.fixture(scope="module")
+def handler(headers):
+    return TableHandler(PATH_TO_TABLE, headers[2:16:2], headers[3:16:2], headers[0])
+
+
+BUILDERS = [lambda handler: handler.createTableGradesStudents(),
+            lambda handler: handler.createTableGradesTest(),
+            lambda handler: handler.createTableGradesStudentsToView(),
+            lambda handler: handler.createTableGradesTestToView(),
+            lambda handler: handler.createTableGradesStudentsPolicies([handler.policy]),
+            lambda handler: handler.createTableGradesTestPolicies([handler.policy]),
+            lambda handler: handler.createTableLtiLsti()]
+
+
+@pytest.mark.parametrize("build", BUILDERS)
+def test_returned_tables_are_writable_and_owned(handler, build):
+    expected = build(handler)
+    table = build(handler)
+
+    for column in table.columns:
+        assert table[column].to_numpy().flags.writeable, column
+
+    question = table.columns[1]
+    table.loc[0, question] = -1
+    table.iloc[:, 1] = 0
+
+    pd.testing.assert_frame_equal(build(handler), expected, check_exact=True)
+
+
+POLICIES = [GradingPolicy(5, 0.5), GradingPolicy(10, 0.7), GradingPolicy(100, 0.3)]
+
+
+def assertMatchesPerPolicy(table, tableValues, questions):
+    for policy in POLICIES:
+        names = ["Sum", policy.nameAverage, policy.nameRound]
+        expected = TableHandler.createTableWithNewColumns_SumAverageRound(tableValues, questions, names, policy)
+        pd.testing.assert_frame_equal(table[questions + names], expected, check_exact=True)
+
+
+@pytest.mark.parametrize("questions", [slice(2, 16, 2), slice(3, 16, 2)])
+def test_policies_match_per_policy_tables(headers, questions):
+    questions = headers[questions]
+    tableValues = pd.read_excel(PATH_TO_TABLE)
+
+    table = TableHandler.createTableWithPolicies(tableValues, questions, POLICIES)
+
+    assertMatchesPerPolicy(table, tableValues, questions)
+
+
+def test_policies_match_per_policy_tables_with_float_and_text():
+    tableValues = pd.DataFrame({"A": [1.5, np.nan, 3.25, 0.0],
+                                "B": [2, 4, 1, 0],
+                                "C": ["5", "x", None, 7]})
+
+    table = TableHandler.createTableWithPolicies(tableValues, ["A", "B", "C"], POLICIES)
+
+    assertMatchesPerPolicy(table, tableValues, ["A", "B", "C"])
+
+
+def test_handler_policies_match_per_policy_tables(handler, headers):
+    grades = handler.createTableGradesStudentsPolicies(POLICIES)
+    tests = handler.createTableGradesTestPolicies(POLICIES)
+
+    assertMatchesPerPolicy(grades, handler.dataTable, headers[2:16:2])
+    assertMatchesPerPolicy(tests, handler.dataTable, headers[3:16:2])
+
+
+@pytest.mark.parametrize("header, expected", [("1. Оценка (от 0 до 5)", (0, 5)),
+                                              ("2. Оценка (от 1,5 до 10.5)", (1.5, 10.5)),
+                                              ("3. Оценка ( от -2 до 3 )", (-2, 3)),
+                                              ("4. Оценка(от 0до 100)", (0, 100)),
+                                              ("5. Оценка", None),
+                                              ("6. Оценка (от 0)", None),
+                                              ("7. Оценка (до 5)", None),
+                                              ("8. Оценка (от a до b)", None),
+                                              ("9. Оценка (от 0 до 5", None),
+                                              ("10. Оценка от 0 до 5", None),
+                                              (15, None)])
+def test_parse_range(header, expected):
+    assert TableHandler.parseRange(header) == expected
+
+
+def validationTable():
+    return pd.DataFrame({"ФИО": ["А", "Б", "В", "Г"],
+                         "1. Оценка (от 0 до 5)": [5, 7, None, -1],
+                         "2. Оценка": ["3", "x", np.inf, None],
+                         "3. Оценка (от 2 до 10)": [1.5, 2, 10, 10.5],
+                         "4. Оценка (от 0 до)": [100, None, 0, 1]})
+
+
+def test_check_values_report():
+    table = validationTable()
+
+    report = TableHandler.check_values(table, list(table.columns[1:]), table["ФИО"].tolist())
+
+    assert list(report.columns) == ["row", "student", "column", "value", "reason"]
+    assert report[["row", "student", "column", "reason"]].values.tolist() == [
+        [0, "А", "3. Оценка (от 2 до 10)", "меньше 2"],
+        [1, "Б", "1. Оценка (от 0 до 5)", "больше 5"],
+        [1, "Б", "2. Оценка", "не число"],
+        [2, "В", "2. Оценка", "бесконечность"],
+        [3, "Г", "1. Оценка (от 0 до 5)", "отрицательное значение"],
+        [3, "Г", "3. Оценка (от 2 до 10)", "больше 10"]]
+    assert report["value"].tolist() == [1.5, 7, "x", np.inf, -1, 10.5]
+
+
+def test_check_values_empty_cells_are_not_errors():
+    table = pd.DataFrame({"1. Оценка (от 0 до 5)": [None, 3, np.nan], "2. Оценка": [None, "", "4"]})
+
+    report = TableHandler.check_values(table, ["1. Оценка (от 0 до 5)"])
+
+    assert report.empty
+    assert list(report.columns) == ["row", "student", "column", "value", "reason"]
+
+    report = TableHandler.check_values(table, ["2. Оценка"])
+
+    assert report[["row", "student", "value", "reason"]].values.tolist() == [[1, 2, "", "не число"]]
+
+
+def test_check_values_strict():
+    table = validationTable()
+
+    with pytest.raises(BadTable):
+        TableHandler.check_values(table, list(table.columns[1:]), strict=True)
+
+    assert TableHandler.check_values(table, ["4. Оценка (от 0 до)"], strict=True).empty
+
+
+def test_validate_values(handler):
+    table = validationTable()
+    checked = TableHandler.fromDataFrame(table, list(table.columns[1:3]), list(table.columns[3:]), "ФИО")
+
+    pd.testing.assert_frame_equal(checked.validateValues(), 
+                                  TableHandler.check_values(table, list(table.columns[1:]), table["ФИО"].tolist()))
+
+    with pytest.raises(BadTable):
+        checked.validateValues(strict=True)
+
+    report = handler.validateValues()
+
+    assert report["row"].tolist() == [4, 4, 4, 8, 13, 13]
+    assert report["reason"].tolist() == ["не число"] * 3 + ["больше 5"] + ["не число"] * 2
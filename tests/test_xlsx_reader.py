@@ -0,0 +1,134 @@
+import datetime
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from module.TableHandler import TableHandler
+from module.XlsxReader import XlsxReader
+
+
+HEADERS = ["ФИО", "1. Первый вопрос", "1. Оценка", "2. Второй вопрос", "2. Оценка"]
+
+# "1. Первый вопрос" - весь текст похож на число, "2. Второй вопрос" - 
+# есть текст, который не число
+ROWS = [["Иванов", 5, 4, 3, 2],
+        ["Петров", "5", 3, "4.5", 1],
+        ["Сидоров", "NA", 2, "нет", "NA"],
+        ["Кузнецов", 4, 5, 2.5, 4],
+        ["Смирнов", 3, 4, "NA", "3"]]
+
+
+@pytest.fixture
+def pathToTable(tmp_path):
+    path = str(tmp_path / "table.xlsx")
+
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(HEADERS)
+    for row in ROWS:
+        sheet.append(row)
+    book.save(path)
+
+    return path
+
+
+def test_text_cells_stay_text(pathToTable):
+    columns = XlsxReader.readColumns(pathToTable, HEADERS[1:], HEADERS[:1])
+
+    assert columns.rejected["1. Первый вопрос"] == {1: "5", 2: "NA"}
+    assert columns.rejected["2. Второй вопрос"] == {1: "4.5", 2: "нет", 4: "NA"}
+    assert columns.rejected["2. Оценка"] == {2: "NA", 4: "3"}
+    assert columns.rejected["1. Оценка"] == {}
+
+
+def test_to_data_frame_matches_read_excel(pathToTable):
+    expected = pd.read_excel(pathToTable)
+    actual = XlsxReader.readColumns(pathToTable, HEADERS[1:], HEADERS[:1]).toDataFrame()
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    for header in HEADERS:
+        assert [type(x) for x in actual[header]] == [type(x) for x in expected[header]]
+
+    assert actual["2. Второй вопрос"].tolist()[:4] == [3, "4.5", "нет", 2.5]
+    assert pd.isna(actual["2. Второй вопрос"].iloc[4])
+
+
+def test_fast_reader_matches_read_excel(pathToTable):
+    headersGrades, headersTestScore = HEADERS[1::2], HEADERS[2::2]
+
+    fast = TableHandler(pathToTable, headersGrades, headersTestScore, HEADERS[0], fastReader=True)
+    slow = TableHandler(pathToTable, headersGrades, headersTestScore, HEADERS[0])
+
+    pd.testing.assert_frame_equal(fast.dataTable, slow.dataTable, check_exact=True)
+    pd.testing.assert_frame_equal(fast.createTableGradesStudents(), slow.createTableGradesStudents(), check_exact=True)
+    pd.testing.assert_frame_equal(fast.createTableGradesTest(), slow.createTableGradesTest(), check_exact=True)
+
+
+def test_unrequested_date_cells_are_skipped(tmp_path):
+    path = str(tmp_path / "dates.xlsx")
+
+    book = openpyxl.Workbook()
+    book.iso_dates = True
+    sheet = book.active
+    sheet.append(HEADERS + ["Дата"])
+    for i, row in enumerate(ROWS):
+        sheet.append(row + [datetime.datetime(2024, 9, i + 1)])
+    # Строка только с датой - последняя строка данных, как у pd.read_excel
+    sheet.append([None] * len(HEADERS) + [datetime.datetime(2024, 10, 1)])
+    book.save(path)
+
+    with zipfile.ZipFile(path) as archive:
+        assert 't="d"' in archive.read("xl/worksheets/sheet1.xml").decode()
+
+    expected = pd.read_excel(path)[HEADERS]
+    actual = XlsxReader.readColumns(path, HEADERS[1:], HEADERS[:1]).toDataFrame()
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    assert len(actual) == len(ROWS) + 1
+
+
+def test_unknown_cell_types_are_text(tmp_path):
+    path = str(tmp_path / "dates.xlsx")
+
+    book = openpyxl.Workbook()
+    book.iso_dates = True
+    sheet = book.active
+    sheet.append(["Дата", "1. Оценка"])
+    sheet.append([datetime.datetime(2024, 9, 1), 5])
+    book.save(path)
+
+    columns = XlsxReader.readColumns(path, ["1. Оценка"], ["Дата"])
+
+    assert columns.toDataFrame()["Дата"].tolist() == ["2024-09-01T00:00:00"]
+
+
+def test_headers_cache_keeps_recent_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(XlsxReader, "HEADERS_CACHE_SIZE", 2)
+    cache = XlsxReader._XlsxReader__headersCache
+
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"{i}.xlsx")
+        book = openpyxl.Workbook()
+        book.active.append(["ФИО", f"{i}. Оценка"])
+        book.save(path)
+        paths.append(path)
+
+    assert XlsxReader.readHeaders(paths[0]) == ["ФИО", "0. Оценка"]
+    assert XlsxReader.readHeaders(paths[1]) == ["ФИО", "1. Оценка"]
+    assert XlsxReader.readHeaders(paths[0]) == ["ФИО", "0. Оценка"]
+    assert XlsxReader.readHeaders(paths[2]) == ["ФИО", "2. Оценка"]
+
+    assert len(cache) <= 2
+    assert str(tmp_path / "0.xlsx") in cache
+    assert str(tmp_path / "1.xlsx") not in cache
+
+    book = openpyxl.Workbook()
+    book.active.append(["ФИО", "Новая оценка", "Ещё"])
+    book.save(paths[2])
+
+    assert XlsxReader.readHeaders(paths[2]) == ["ФИО", "Новая оценка", "Ещё"]
+    assert len(cache) <= 2